@@ -45,6 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Paling luar agar durasi mencakup seluruh stack (no-op bila nonaktif)
+    'produksi_monitoring.instrumentasi.InstrumentasiORMMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,17 +77,57 @@ TEMPLATES = [
 WSGI_APPLICATION = 'monitoring_produksi.wsgi.application'
 ASGI_APPLICATION = "monitoring_produksi.asgi.application"
 
+# Channel layer untuk papan monitoring realtime (ws/monitoring/<slug>/).
+# In-memory: cukup untuk satu proses ASGI (lokal / satu server). Push dari
+# proses lain (konsumen jurnal "push", penjadwal) butuh layer bersama, mis.:
+#   "BACKEND": "channels_redis.core.RedisChannelLayer",
+#   "CONFIG": {"hosts": [("127.0.0.1", 6379)]},
+CHANNEL_LAYERS = {
+    "default": {
+        "BACKEND": "channels.layers.InMemoryChannelLayer",
+    },
+}
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# SQLite mode produksi: WAL + pragma, BEGIN IMMEDIATE untuk view tulis
+# (lihat produksi_monitoring/sqlite_produksi & konkurensi.py)
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'produksi_monitoring.sqlite_produksi',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {'timeout': 20},       # busy_timeout (detik) sebelum "database is locked"
+        'CONN_MAX_AGE': 600,              # koneksi persisten per thread worker
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+
+# Cache bersama antar worker (render papan ruangan, lihat papan_cache.py)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "cache",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
     }
 }
 
+# Instrumentasi ORM per request — lihat produksi_monitoring/instrumentasi.py
+# Aktifkan dengan env INSTRUMENTASI_AKTIF=1; request >= ambang masuk log.
+INSTRUMENTASI_AKTIF = os.environ.get("INSTRUMENTASI_AKTIF") == "1"
+INSTRUMENTASI_AMBANG_MS = int(os.environ.get("INSTRUMENTASI_AMBANG_MS", 500))
+INSTRUMENTASI_LOG = BASE_DIR / "logs" / "request_lambat.log"
+
+# Idempotensi request (rid) — lihat produksi_monitoring/idempotency.py
+IDEMPOTENCY_TTL_DETIK = 60 * 60 * 24          # key lebih tua dari ini boleh di-purge
+IDEMPOTENCY_CACHE_KAPASITAS = 10_000          # ukuran LRU per proses worker
+
+# Arsip hot/cold — lihat produksi_monitoring/arsip.py
+# Batch tertutup & riwayat lebih tua dari ini dipindah ke tabel arsip.
+ARSIP_UMUR_HARI = int(os.environ.get("ARSIP_UMUR_HARI", 180))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
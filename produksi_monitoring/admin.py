@@ -6,10 +6,19 @@ from django.utils import timezone
 from django import forms
 from django.contrib import messages
 from django.core.exceptions import ValidationError
-from produksi_monitoring.models import ItemDescription, ProsesProduksi, Ruangan, Mesin, Operator
+from django.core.paginator import Paginator
+from django.db.models import Case, IntegerField, When
+from django.utils.functional import cached_property
+from produksi_monitoring.models import ItemDescription, ProsesProduksi, Ruangan, Mesin, Operator, EventBatch
+from produksi_monitoring.pemindahan import pindahkan_batch
+from produksi_monitoring import katalog, pencarian
+from produksi_monitoring.topology import topologi, TAHAP_PENIMBANGAN
 
 admin.site.index_title = "Manajemen Proses Produksi"
 
+# hasil cari master item (urut relevansi) yang ditampilkan admin/autocomplete
+BATAS_CARI_KATALOG = 200
+
 
 @admin.register(Operator)
 class OperatorAdmin(admin.ModelAdmin):
@@ -41,11 +50,9 @@ class ProsesProduksiForm(forms.ModelForm):
 
         # Set default ruangan ke Penimbangan saat create
         if not self.instance.pk:
-            try:
-                ruang_penimbangan = Ruangan.objects.get(nama__icontains="penimbangan")
-                self.fields['ruangan'].initial = ruang_penimbangan
-            except Ruangan.DoesNotExist:
-                pass
+            ruang_penimbangan = topologi().pertama(TAHAP_PENIMBANGAN)
+            if ruang_penimbangan:
+                self.fields['ruangan'].initial = ruang_penimbangan.id
 
         if not self.instance.pk:
             self.fields['status'].initial = "Menunggu"
@@ -65,6 +72,25 @@ class ProsesProduksiForm(forms.ModelForm):
 class ItemDescriptionAdmin(admin.ModelAdmin):
     search_fields = ['description', 'barcode']
 
+    def get_search_results(self, request, queryset, search_term):
+        # Changelist & autocomplete (ProsesProduksiAdmin.nama) → index katalog
+        # in-memory, bukan LIKE '%...%' atas seluruh master. Hasil diikat
+        # sebagai parameter id__in, jadi dibatasi BATAS_CARI_KATALOG: kata
+        # kunci yang lebih luas di changelist jatuh ke search_fields biasa
+        # (tanpa batas variabel SQLite), autocomplete cukup top-N.
+        if not search_term.strip():
+            return queryset, False
+        ids = [p.id for p in katalog.cari(search_term, limit=BATAS_CARI_KATALOG + 1)]
+        if len(ids) > BATAS_CARI_KATALOG:
+            if "autocomplete" not in request.path:
+                return super().get_search_results(request, queryset, search_term)
+            ids = ids[:BATAS_CARI_KATALOG]
+        urutan = Case(
+            *[When(id=pk, then=pos) for pos, pk in enumerate(ids)],
+            default=len(ids), output_field=IntegerField(),
+        )
+        return queryset.filter(id__in=ids).order_by(urutan, 'description'), False
+
 
 ### ✅ Aksi Kustom
 @admin.action(description="Pilih Ruangan & Operator Berikutnya")
@@ -77,7 +103,7 @@ def pilih_ruangan_dan_operator(modeladmin, request, queryset):
             return
         
         # ✅ Tambahkan validasi untuk ruang proses dan hasil akhir
-        if "proses" in proses.ruangan.nama.lower() and proses.hasil_akhir != "Release":
+        if topologi(proses.ruangan_id).butuh_hasil_akhir(proses.ruangan_id) and proses.hasil_akhir != "Release":
             modeladmin.message_user(request, f"Batch {proses.nomor_batch} tidak bisa dipindahkan karena hasil akhirnya bukan 'Release'.", level="error")
             return
 
@@ -109,23 +135,48 @@ def pilih_ruangan_proses(request):
         ruangan_tujuan = get_object_or_404(Ruangan, id=ruangan_id)
         operator_tujuan = get_object_or_404(Operator, id=operator_id)
 
-        for produksi in batch_list:
-            produksi.ruangan = ruangan_tujuan
-            produksi.operator = operator_tujuan
-            produksi.status = "Menunggu"
-            produksi.waktu_mulai_produksi = None
-            produksi.save()
+        hasil = pindahkan_batch(batch_ids, ruangan_tujuan.id, operator_tujuan.id)
+        request.session.pop('batch_to_move', None)
 
-        messages.success(request, f"{len(batch_list)} batch berhasil dipindahkan ke {ruangan_tujuan.nama}.")
+        if hasil.dipindahkan:
+            messages.success(request, f"{len(hasil.dipindahkan)} batch berhasil dipindahkan ke {ruangan_tujuan.nama}.")
+        for nomor_batch, alasan in hasil.ditolak:
+            messages.error(request, f"Batch {nomor_batch} tidak dipindahkan: {alasan}.")
         return redirect("admin:produksi_monitoring_prosesproduksi_changelist")
 
     return render(request, "admin/pilih_ruangan.html", {
         "batch_list": batch_list,
-        "ruangan_list": Ruangan.objects.exclude(nama__icontains="penimbangan"),
+        "ruangan_list": Ruangan.objects.exclude(id__in=topologi().ids(TAHAP_PENIMBANGAN)),
         "operator_list": Operator.objects.all(),
     })
 
 
+### ✅ Paginator changelist: COUNT(*) dibatasi, di atas batas pakai estimasi
+class PaginatorEstimasi(Paginator):
+    BATAS_HITUNG = 10_000
+
+    @cached_property
+    def count(self):
+        qs = self.object_list.order_by().values("pk")
+        # SELECT COUNT(*) FROM (... LIMIT n) → biaya maksimal BATAS_HITUNG baris
+        jumlah = qs[: self.BATAS_HITUNG + 1].count()
+        if jumlah <= self.BATAS_HITUNG:
+            return jumlah
+
+        # Estimasi dari kerapatan id: BATAS_HITUNG baris terbaru tersebar di
+        # rentang id [id_ke_n, id_maks] → skalakan ke rentang id seluruh hasil
+        ids = qs.order_by("-pk").values_list("pk", flat=True)
+        id_maks = ids[0]
+        id_ke_n = ids[self.BATAS_HITUNG]
+        id_min = qs.order_by("pk").values_list("pk", flat=True)[0]
+        kerapatan = self.BATAS_HITUNG / max(id_maks - id_ke_n, 1)
+        return max(int(kerapatan * (id_maks - id_min + 1)), self.BATAS_HITUNG + 1)
+
+
+# Label status dihitung sekali, bukan dict(...) per baris
+LABEL_STATUS = dict(ProsesProduksi.STATUS_CHOICES)
+
+
 ### ✅ Admin: ProsesProduksi
 @admin.register(ProsesProduksi)
 class ProsesProduksiAdmin(admin.ModelAdmin):
@@ -137,6 +188,10 @@ class ProsesProduksiAdmin(admin.ModelAdmin):
         'nomor_batch', 'nama', 'ruangan', 'status_display', 'estimasi_jumlah_kemasan', 'jumlah','satuan', 'waktu_dibuat', 'get_waktu_selesai', 'tahap_berikutnya', 'tombol_pindah'
     )
     list_filter = ('status', 'ruangan')
+    # nama & ruangan ditampilkan per baris → JOIN sekali; tahap berikutnya dari topologi
+    list_select_related = ('nama', 'ruangan')
+    paginator = PaginatorEstimasi
+    show_full_result_count = False
     ordering = ('-waktu_dibuat',)
     readonly_fields = ('waktu_selesai',)
     actions = [pilih_ruangan_dan_operator]
@@ -148,15 +203,26 @@ class ProsesProduksiAdmin(admin.ModelAdmin):
         ]
         return custom_urls + urls
 
+    def get_search_results(self, request, queryset, search_term):
+        # nomor batch / produk / barcode / ruangan / operator lewat index FTS5
+        # (pencarian.py), bukan LIKE '%...%' atas JOIN; tanpa FTS → ORM biasa
+        if not search_term.strip() or not pencarian.tersedia():
+            return super().get_search_results(request, queryset, search_term)
+        # subquery MATCH tanpa batas → jumlah hasil & paging changelist benar
+        subquery = pencarian.subquery_id_proses(search_term)
+        if subquery is None:
+            return queryset.none(), False
+        return queryset.filter(id__in=subquery), False
+
     def tombol_pindah(self, obj):
-        if obj.status.startswith("Selesai Diproses di") and obj.ruangan.tahap_berikutnya:
-            pindah_url = reverse('admin:pindahkan_batch_ke_ruangan', args=[obj.nomor_batch])
+        if obj.status.startswith("Selesai Diproses di") and topologi(obj.ruangan_id).berikutnya(obj.ruangan_id):
+            pindah_url = reverse('pindahkan_batch_ke_ruangan', args=[obj.nomor_batch])
             return format_html('<a href="{}" class="btn btn-success">Pindahkan</a>', pindah_url)
         return "-"
     tombol_pindah.short_description = "Pindahkan Ke Ruangan Berikutnya"
 
     def status_display(self, obj):
-        return dict(ProsesProduksi.STATUS_CHOICES).get(obj.status, obj.status)
+        return LABEL_STATUS.get(obj.status, obj.status)
     status_display.short_description = "Status"
 
     def get_waktu_selesai(self, obj):
@@ -164,5 +230,26 @@ class ProsesProduksiAdmin(admin.ModelAdmin):
     get_waktu_selesai.short_description = "Waktu Selesai"
 
     def tahap_berikutnya(self, obj):
-        return obj.ruangan.tahap_berikutnya.nama if obj.ruangan.tahap_berikutnya else "Tahap Akhir"
+        berikutnya = topologi(obj.ruangan_id).berikutnya(obj.ruangan_id)
+        return berikutnya.nama if berikutnya else "Tahap Akhir"
     tahap_berikutnya.short_description = "Tahap Berikutnya"
+
+
+@admin.register(EventBatch)
+class EventBatchAdmin(admin.ModelAdmin):
+    """Jurnal append-only: hanya baca."""
+    list_display = ('id', 'waktu', 'nomor_batch', 'jenis', 'ruangan_id', 'data')
+    list_filter = ('jenis',)
+    search_fields = ('=nomor_batch',)
+    ordering = ('-id',)
+    paginator = PaginatorEstimasi
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,281 @@
+# produksi_monitoring/analitik.py
+"""
+Analitik waktu siklus (cycle time) & lead time berbasis NumPy.
+
+- Waktu antrian  : ProsesProduksi.waktu_dibuat → waktu_mulai_produksi
+- Waktu proses   : RiwayatProduksi.waktu_mulai_produksi → waktu_selesai
+                   (satu baris riwayat per batch per ruangan)
+- Lead time      : per nomor_batch, mulai paling awal → selesai paling akhir
+                   di seluruh ruangan (dari RiwayatProduksi). Filter ruangan
+                   / periode hanya memilih BATCH-nya; lead time dihitung dari
+                   semua stint batch itu, bukan hanya stint yang lolos filter
+
+Kolom timestamp diambil sekaligus lewat values_list() lalu dijadikan array;
+persentil & histogram per kelompok (ruangan / produk) dihitung vektor,
+tanpa loop per kelompok. Hasil di-cache per watermark data, jadi request
+berikutnya gratis sampai ada riwayat/proses baru. Data dibaca dari tabel
+hot + arsip (arsip.gabungan).
+"""
+import hashlib
+import time
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.utils.timezone import make_aware
+
+from .arsip import gabungan
+from .models import ArsipRiwayatProduksi, ProsesProduksi, RiwayatProduksi, ItemDescription
+from .topology import topologi
+
+PERSENTIL = (50, 90, 95, 99)
+# Batas bin histogram (menit): 0–5, 5–15, ..., > 1 minggu
+BIN_MENIT = (0, 5, 15, 30, 60, 120, 240, 480, 1440, 2880, 10080)
+KELOMPOK = ("ruangan", "produk", "ruangan_produk")
+TTL_CACHE = 60 * 60
+
+
+def _np():
+    import numpy as np
+    return np
+
+
+def watermark():
+    """Sidik jari data sumber; berubah bila ada riwayat/proses baru atau diubah."""
+    r = RiwayatProduksi.objects.aggregate(n=Count("id"), m=Max("diperbarui_pada"))
+    p = ProsesProduksi.objects.aggregate(
+        n=Count("waktu_mulai_produksi"), m=Max("waktu_mulai_produksi"), i=Max("id"),
+    )
+    a = ArsipRiwayatProduksi.objects.aggregate(n=Count("id"))
+    mentah = f"{r['n']}|{r['m']}|{p['n']}|{p['m']}|{p['i']}|{a['n']}"
+    return hashlib.blake2b(mentah.encode(), digest_size=8).hexdigest()
+
+
+def _detik(kolom):
+    np = _np()
+    return np.fromiter((d.timestamp() for d in kolom), dtype=np.float64, count=len(kolom))
+
+
+def _kunci_kelompok(ruangan, produk, kelompok):
+    """Kode kelompok int64 per baris (ruangan, produk, atau pasangan keduanya)."""
+    np = _np()
+    if kelompok == "ruangan":
+        return ruangan.astype(np.int64)
+    if kelompok == "produk":
+        return produk.astype(np.int64)
+    return ruangan.astype(np.int64) * (1 << 32) + produk.astype(np.int64)
+
+
+def statistik_kelompok(kunci, nilai, persentil=PERSENTIL, bins=BIN_MENIT):
+    """
+    Persentil (interpolasi linear, sama dengan np.percentile) + histogram
+    untuk setiap kelompok sekaligus.
+
+    Return: (kelompok_unik, jumlah, rata2, {p: array}, histogram[k, bin])
+    """
+    np = _np()
+    kelompok, inv = np.unique(kunci, return_inverse=True)
+    inv = inv.ravel()
+    g = len(kelompok)
+
+    # urutkan per (kelompok, nilai) → tiap kelompok jadi potongan terurut
+    urut = np.lexsort((nilai, inv))
+    nilai_urut = nilai[urut]
+    jumlah = np.bincount(inv, minlength=g)
+    awal = np.concatenate(([0], np.cumsum(jumlah)[:-1]))
+    rata2 = np.bincount(inv, weights=nilai, minlength=g) / np.maximum(jumlah, 1)
+
+    hasil_p = {}
+    for p in persentil:
+        posisi = awal + (jumlah - 1) * (p / 100.0)
+        bawah = np.floor(posisi).astype(np.int64)
+        atas = np.minimum(bawah + 1, awal + jumlah - 1)
+        frac = posisi - bawah
+        hasil_p[p] = nilai_urut[bawah] * (1 - frac) + nilai_urut[atas] * frac
+
+    # bin terakhir menampung semua di atas batas tertinggi
+    tepi = np.asarray(bins, dtype=np.float64)
+    idx_bin = np.clip(np.searchsorted(tepi, nilai, side="right") - 1, 0, len(tepi) - 1)
+    hist = np.bincount(inv * len(tepi) + idx_bin, minlength=g * len(tepi)).reshape(g, len(tepi))
+
+    return kelompok, jumlah, rata2, hasil_p, hist
+
+
+def _baris_statistik(i, jumlah, rata2, pers, hist):
+    return {
+        "n": int(jumlah[i]),
+        "rata2_menit": round(float(rata2[i]), 2),
+        **{f"p{p}_menit": round(float(pers[p][i]), 2) for p in PERSENTIL},
+        "histogram": hist[i].tolist(),
+    }
+
+
+def _ringkas(kunci, nilai_menit, kelompok, nama_ruangan, nama_produk):
+    if not len(nilai_menit):
+        return []
+    grup, *stat = statistik_kelompok(kunci, nilai_menit)
+    hasil = []
+    for i, k in enumerate(grup.tolist()):
+        if kelompok == "ruangan":
+            r_id, p_id = k, None
+        elif kelompok == "produk":
+            r_id, p_id = None, k
+        else:
+            r_id, p_id = k >> 32, k & 0xFFFFFFFF
+        baris = _baris_statistik(i, *stat)
+        if r_id is not None:
+            baris["ruangan"] = r_id
+            baris["ruangan_nama"] = nama_ruangan.get(r_id)
+        if p_id is not None:
+            baris["produk"] = p_id
+            baris["produk_nama"] = nama_produk.get(p_id)
+        hasil.append(baris)
+    return hasil
+
+
+def _stint_batch(riwayat_terfilter):
+    """Semua stint (hot + arsip, tanpa filter) dari batch yang punya baris di `riwayat_terfilter`."""
+    batch = Q()
+    for qs in riwayat_terfilter.querysets:
+        batch |= Q(nomor_batch__in=qs.values("nomor_batch"))
+    return list(gabungan(RiwayatProduksi).filter(batch).values_list(
+        "nama_produk_id", "nomor_batch", "waktu_mulai_produksi", "waktu_selesai",
+    ))
+
+
+def _hitung(dari, sampai, ruangan_ids, kelompok):
+    np = _np()
+
+    riwayat = gabungan(RiwayatProduksi)
+    proses = gabungan(ProsesProduksi).filter(waktu_mulai_produksi__isnull=False)
+    if dari:
+        riwayat = riwayat.filter(waktu_selesai__gte=dari)
+        proses = proses.filter(waktu_mulai_produksi__gte=dari)
+    if sampai:
+        riwayat = riwayat.filter(waktu_selesai__lt=sampai)
+        proses = proses.filter(waktu_mulai_produksi__lt=sampai)
+    if ruangan_ids:
+        riwayat = riwayat.filter(ruangan_id__in=ruangan_ids)
+        proses = proses.filter(ruangan_id__in=ruangan_ids)
+
+    # --- waktu proses per stint (riwayat) ---
+    baris_r = list(riwayat.values_list(
+        "ruangan_id", "nama_produk_id", "nomor_batch", "waktu_mulai_produksi", "waktu_selesai",
+    ))
+    if baris_r:
+        r_ruangan, r_produk, r_batch, r_mulai, r_selesai = zip(*baris_r)
+        r_ruangan = np.asarray(r_ruangan, dtype=np.int64)
+        r_produk = np.asarray(r_produk, dtype=np.int64)
+        r_mulai = _detik(r_mulai)
+        r_selesai = _detik(r_selesai)
+        menit_proses = np.maximum(r_selesai - r_mulai, 0) / 60.0
+    else:
+        r_ruangan = r_produk = np.empty(0, dtype=np.int64)
+        r_batch, menit_proses = (), np.empty(0)
+
+    # --- waktu antrian (proses) ---
+    baris_p = list(proses.values_list("ruangan_id", "nama_id", "waktu_dibuat", "waktu_mulai_produksi"))
+    if baris_p:
+        p_ruangan, p_produk, p_dibuat, p_mulai = zip(*baris_p)
+        p_ruangan = np.asarray(p_ruangan, dtype=np.int64)
+        p_produk = np.asarray(p_produk, dtype=np.int64)
+        menit_antrian = np.maximum(_detik(p_mulai) - _detik(p_dibuat), 0) / 60.0
+    else:
+        p_ruangan = p_produk = np.empty(0, dtype=np.int64)
+        menit_antrian = np.empty(0)
+
+    # --- nama (topologi + satu query produk) ---
+    nama_ruangan = {i: info.nama for i, info in topologi().per_id.items()}
+    id_produk = set(np.unique(np.concatenate((r_produk, p_produk))).tolist())
+    nama_produk = dict(ItemDescription.objects.filter(id__in=id_produk).values_list("id", "description"))
+
+    hasil = {
+        "kelompok": kelompok,
+        "bin_menit": list(BIN_MENIT),
+        "proses": _ringkas(
+            _kunci_kelompok(r_ruangan, r_produk, kelompok), menit_proses,
+            kelompok, nama_ruangan, nama_produk,
+        ),
+        "antrian": _ringkas(
+            _kunci_kelompok(p_ruangan, p_produk, kelompok), menit_antrian,
+            kelompok, nama_ruangan, nama_produk,
+        ),
+    }
+
+    # --- lead time per batch: min(mulai) → max(selesai) lintas ruangan ---
+    if len(menit_proses):
+        if dari or sampai or ruangan_ids:
+            # baris di atas hanya stint yang lolos filter → ambil semua stint batch-nya
+            l_produk, l_batch, l_mulai, l_selesai = zip(*_stint_batch(riwayat))
+            l_produk = np.asarray(l_produk, dtype=np.int64)
+            l_mulai, l_selesai = _detik(l_mulai), _detik(l_selesai)
+        else:
+            l_produk, l_batch, l_mulai, l_selesai = r_produk, r_batch, r_mulai, r_selesai
+        batch_unik, inv_batch = np.unique(np.asarray(l_batch), return_inverse=True)
+        inv_batch = inv_batch.ravel()
+        awal_batch = np.full(len(batch_unik), np.inf)
+        akhir_batch = np.full(len(batch_unik), -np.inf)
+        np.minimum.at(awal_batch, inv_batch, l_mulai)
+        np.maximum.at(akhir_batch, inv_batch, l_selesai)
+        # produk satu batch sama di semua ruangan
+        produk_batch = np.zeros(len(batch_unik), dtype=np.int64)
+        produk_batch[inv_batch] = l_produk
+        menit_lead = (akhir_batch - awal_batch) / 60.0
+
+        _, *stat = statistik_kelompok(np.zeros(len(batch_unik), dtype=np.int64), menit_lead)
+        hasil["lead_time"] = {
+            "total": _baris_statistik(0, *stat),
+            "per_produk": _ringkas(produk_batch, menit_lead, "produk", nama_ruangan, nama_produk),
+        }
+    else:
+        hasil["lead_time"] = {"total": None, "per_produk": []}
+
+    return hasil
+
+
+def analitik_siklus(dari=None, sampai=None, ruangan_ids=(), kelompok="ruangan"):
+    """
+    Hasil analitik (dict JSON-ready), di-cache per watermark + parameter.
+    dari/sampai None = tanpa batas (pemanggil sebaiknya membulatkan nilainya
+    agar kunci cache stabil).
+    """
+    if kelompok not in KELOMPOK:
+        raise ValueError(f"kelompok harus salah satu dari {', '.join(KELOMPOK)}")
+    wm = watermark()
+    kunci = "analitik:" + hashlib.blake2b(
+        f"{wm}|{dari}|{sampai}|{sorted(ruangan_ids)}|{kelompok}".encode(),
+        digest_size=12,
+    ).hexdigest()
+    data = cache.get(kunci)
+    if data is None:
+        mulai = time.perf_counter()
+        data = _hitung(dari, sampai, list(ruangan_ids), kelompok)
+        data["watermark"] = wm
+        data["dihitung_ms"] = round((time.perf_counter() - mulai) * 1000, 1)
+        cache.set(kunci, data, TTL_CACHE)
+    return data
+
+
+# --- ringkasan harian per ruangan (dilipat konsumen jurnal) ------------------
+# Hanya pasangan (tanggal, ruangan) yang muncul di event baru yang dihitung
+# ulang (jurnal._konsumen_analitik); kunci tanpa watermark sehingga tetap
+# berlaku sampai event berikutnya untuk pasangan yang sama.
+def _kunci_harian(tanggal, ruangan_id):
+    return f"analitik:harian:{tanggal.isoformat()}:{ruangan_id}"
+
+
+def hitung_harian(tanggal, ruangan_id):
+    """Hitung & simpan analitik satu hari lokal untuk satu ruangan."""
+    awal = make_aware(datetime.combine(tanggal, datetime.min.time()))
+    mulai = time.perf_counter()
+    data = _hitung(awal, awal + timedelta(days=1), [ruangan_id], "ruangan")
+    data["tanggal"] = tanggal.isoformat()
+    data["dihitung_ms"] = round((time.perf_counter() - mulai) * 1000, 1)
+    cache.set(_kunci_harian(tanggal, ruangan_id), data, None)
+    return data
+
+
+def analitik_harian(tanggal, ruangan_id):
+    """Ringkasan harian yang dijaga konsumen; dihitung saat itu juga bila belum ada."""
+    data = cache.get(_kunci_harian(tanggal, ruangan_id))
+    return data if data is not None else hitung_harian(tanggal, ruangan_id)
@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+
+
+class ProduksiMonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'produksi_monitoring'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate, pre_migrate
+
+        from . import signals  # noqa: F401  (daftarkan receiver)
+        from .pencarian import lepas_sebelum_migrate, pasang_setelah_migrate
+
+        # trigger FTS dilepas selama migrate (memblok ALTER tabel sumber); tabelnya tetap
+        pre_migrate.connect(lepas_sebelum_migrate, sender=self)
+        post_migrate.connect(pasang_setelah_migrate, sender=self)
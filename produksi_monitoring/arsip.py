@@ -0,0 +1,217 @@
+# produksi_monitoring/arsip.py
+"""
+Arsip hot/cold untuk ProsesProduksi & RiwayatProduksi.
+
+Tabel hot hanya berisi batch yang masih berjalan dan riwayat terbaru; batch
+TERTUTUP dan riwayat yang lebih tua dari ARSIP_UMUR_HARI dipindah ke
+ArsipProsesProduksi / ArsipRiwayatProduksi (database yang sama):
+
+- Batch tertutup = semua barisnya berstatus "Selesai …", minimal satu baris
+  "Selesai Produksi" atau hasil akhir Reject, dan perubahan terakhirnya
+  (waktu_selesai, atau waktu_dibuat) lebih tua dari batas umur
+- Riwayat diarsipkan bila lebih tua dari batas umur DAN nomor batch-nya
+  tidak lagi punya baris hot di ProsesProduksi
+- Dipindah per potongan dalam transaksi_tulis(): salin (bulk_create, id
+  asli dipertahankan) lalu DELETE mentah — QuerySet.delete() akan memuat &
+  mengirim signal per baris, padahal batch lama tidak tampil di papan
+- Index FTS ikut lewat trigger (pencarian.py), rollup tidak berubah karena
+  angkanya dihitung dari hot + arsip
+
+Baca gabungan lewat `gabungan(Model)`: field arsip bernama sama dengan hot,
+sehingga filter / values_list / annotate yang sama berlaku di kedua tabel.
+"""
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Exists, Max, OuterRef, Q
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+
+from .konkurensi import transaksi_tulis
+from .models import ArsipProsesProduksi, ArsipRiwayatProduksi, ProsesProduksi, RiwayatProduksi
+from .realtime import segarkan_ruangan
+
+UMUR_HARI = getattr(settings, "ARSIP_UMUR_HARI", 180)
+# nomor batch per transaksi (proses) / baris per transaksi (riwayat)
+CHUNK_BATCH = 200
+CHUNK_RIWAYAT = 500
+
+PASANGAN = {
+    ProsesProduksi: ArsipProsesProduksi,
+    RiwayatProduksi: ArsipRiwayatProduksi,
+}
+
+
+# --- lapisan baca hot + arsip ------------------------------------------------
+class Gabungan:
+    """
+    Beberapa QuerySet (arsip lalu hot) yang diperlakukan sebagai satu.
+    Metode berantai diterapkan ke setiap QuerySet; iterasi menyambung hasil.
+    Hanya path maju (kolom & FK → field master) yang dijamin ada di keduanya;
+    relasi balik (related_name) tidak ada di tabel arsip.
+
+    Urutan global tidak digabung: order_by() berlaku per tabel, arsip dibaca
+    dulu lalu hot. Hasilnya TIDAK urut id secara global — riwayat lama dari
+    batch yang masih berjalan tetap hot, sehingga id arsip bisa lebih besar
+    dari id hot. Pemanggil yang butuh urutan global harus mengurutkan
+    sendiri; ekspor, analitik, rollup & jurnal tidak bergantung padanya.
+    """
+
+    def __init__(self, querysets):
+        self.querysets = list(querysets)
+
+    def _terapkan(self, nama, *args, **kwargs):
+        return Gabungan(getattr(qs, nama)(*args, **kwargs) for qs in self.querysets)
+
+    def filter(self, *args, **kwargs):
+        return self._terapkan("filter", *args, **kwargs)
+
+    def exclude(self, *args, **kwargs):
+        return self._terapkan("exclude", *args, **kwargs)
+
+    def annotate(self, *args, **kwargs):
+        return self._terapkan("annotate", *args, **kwargs)
+
+    def order_by(self, *fields):
+        return self._terapkan("order_by", *fields)
+
+    def values(self, *fields, **expressions):
+        return self._terapkan("values", *fields, **expressions)
+
+    def values_list(self, *fields, **kwargs):
+        return self._terapkan("values_list", *fields, **kwargs)
+
+    def distinct(self, *fields):
+        return self._terapkan("distinct", *fields)
+
+    def iterator(self, chunk_size=2000):
+        for qs in self.querysets:
+            yield from qs.iterator(chunk_size=chunk_size)
+
+    def __iter__(self):
+        for qs in self.querysets:
+            yield from qs
+
+    def count(self):
+        return sum(qs.count() for qs in self.querysets)
+
+    def exists(self):
+        return any(qs.exists() for qs in self.querysets)
+
+
+def gabungan(model, arsip=True):
+    """Gabungan arsip + hot untuk ProsesProduksi / RiwayatProduksi (arsip=False → hot saja)."""
+    hot = model.objects.all()
+    if not arsip:
+        return Gabungan([hot])
+    return Gabungan([PASANGAN[model].objects.all(), hot])
+
+
+# --- pemindahan hot → arsip --------------------------------------------------
+@dataclass
+class HasilArsip:
+    batch: int = 0
+    proses: int = 0
+    riwayat: int = 0
+    durasi_ms: float = 0.0
+    uji_coba: bool = False
+
+    def __str__(self):
+        kata = "akan diarsipkan" if self.uji_coba else "diarsipkan"
+        return (
+            f"{self.batch} batch ({self.proses} baris proses) dan {self.riwayat} riwayat "
+            f"{kata} ({self.durasi_ms:.1f} ms)"
+        )
+
+
+def batas_umur(umur_hari=None):
+    return now() - timedelta(days=UMUR_HARI if umur_hari is None else umur_hari)
+
+
+def batch_tertutup(batas):
+    """QuerySet nomor_batch yang tertutup dan terakhir berubah sebelum `batas`."""
+    return (
+        ProsesProduksi.objects.values("nomor_batch")
+        .annotate(
+            terbuka=Count("id", filter=~Q(status__startswith="Selesai")),
+            tutup=Count("id", filter=Q(status="Selesai Produksi") | Q(hasil_akhir="Reject")),
+            terakhir=Max(Coalesce("waktu_selesai", "waktu_dibuat")),
+        )
+        .filter(terbuka=0, tutup__gt=0, terakhir__lt=batas)
+        .order_by("nomor_batch")
+        .values_list("nomor_batch", flat=True)
+    )
+
+
+def riwayat_lama(batas):
+    """Riwayat lebih tua dari `batas` yang batch-nya sudah tidak ada di tabel hot proses."""
+    return RiwayatProduksi.objects.filter(waktu_selesai__lt=batas).exclude(
+        Exists(ProsesProduksi.objects.filter(nomor_batch=OuterRef("nomor_batch")))
+    )
+
+
+def _pindahkan(model, ids, waktu):
+    """Salin baris `ids` ke tabel arsip lalu hapus dari hot; return set ruangan_id."""
+    arsip = PASANGAN[model]
+    kolom = [f.attname for f in arsip._meta.concrete_fields if f.attname != "diarsipkan_pada"]
+    baris = list(model.objects.filter(id__in=ids).values(*kolom))
+    arsip.objects.bulk_create(
+        [arsip(diarsipkan_pada=waktu, **b) for b in baris], batch_size=CHUNK_RIWAYAT,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)} "
+            f"WHERE id IN ({', '.join(['%s'] * len(ids))})",
+            list(ids),
+        )
+    return {b["ruangan_id"] for b in baris}
+
+
+def arsipkan(umur_hari=None, uji_coba=False, log=None) -> HasilArsip:
+    """
+    Pindahkan batch tertutup & riwayat lama ke tabel arsip.
+    uji_coba=True hanya menghitung. `log(pesan)` dipanggil per potongan.
+    """
+    mulai = time.perf_counter()
+    batas = batas_umur(umur_hari)
+    hasil = HasilArsip(uji_coba=uji_coba)
+
+    nomor = list(batch_tertutup(batas))
+    if uji_coba:
+        hasil.batch = len(nomor)
+        hasil.proses = ProsesProduksi.objects.filter(nomor_batch__in=nomor).count()
+        # riwayat batch di atas ikut terarsip setelah prosesnya pindah
+        hasil.riwayat = RiwayatProduksi.objects.filter(waktu_selesai__lt=batas).exclude(
+            Exists(ProsesProduksi.objects.filter(nomor_batch=OuterRef("nomor_batch")).exclude(nomor_batch__in=nomor))
+        ).count()
+        hasil.durasi_ms = (time.perf_counter() - mulai) * 1000
+        return hasil
+
+    for i in range(0, len(nomor), CHUNK_BATCH):
+        with transaksi_tulis():
+            # periksa ulang di dalam transaksi: batch bisa dibuka lagi sejak daftar diambil
+            potongan = list(batch_tertutup(batas).filter(nomor_batch__in=nomor[i:i + CHUNK_BATCH]))
+            ids = list(ProsesProduksi.objects.filter(nomor_batch__in=potongan).values_list("id", flat=True))
+            if ids:
+                segarkan_ruangan(_pindahkan(ProsesProduksi, ids, now()))
+        hasil.batch += len(potongan)
+        hasil.proses += len(ids)
+        if log:
+            log(f"proses: {hasil.batch}/{len(nomor)} batch")
+
+    while True:
+        with transaksi_tulis():
+            ids = list(riwayat_lama(batas).order_by("id").values_list("id", flat=True)[:CHUNK_RIWAYAT])
+            if ids:
+                segarkan_ruangan(_pindahkan(RiwayatProduksi, ids, now()))
+        if not ids:
+            break
+        hasil.riwayat += len(ids)
+        if log:
+            log(f"riwayat: {hasil.riwayat} baris")
+
+    hasil.durasi_ms = (time.perf_counter() - mulai) * 1000
+    return hasil
@@ -0,0 +1,231 @@
+# produksi_monitoring/benchmark.py
+"""
+Benchmark view & operasi utama lewat Django test Client.
+
+Tiap skenario dijalankan `pemanasan` kali (tidak diukur), lalu `iterasi`
+kali diukur latensinya, lalu satu kali lagi dengan instrumentasi (jumlah
+query + puncak memori via tracemalloc) — dipisah supaya overhead
+instrumentasi tidak ikut ke angka latensi. Skenario tulis dibungkus
+transaksi yang di-rollback, jadi data tidak berubah.
+
+Laporan JSON bisa dibandingkan antar run dengan bandingkan().
+"""
+import json
+import platform
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import django
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+
+from . import papan_cache
+from .instrumentasi import _persentil
+from .models import ItemDescription, Operator, ProsesProduksi, RiwayatProduksi, Ruangan
+from .ringkasan import KUNCI_CACHE as KUNCI_RINGKASAN
+from .topology import (
+    topologi, TAHAP_PENIMBANGAN, TAHAP_PROSES, TAHAP_FILLING, TAHAP_LABELLING,
+)
+
+PERSENTIL = (50, 95, 99)
+
+
+@dataclass
+class Skenario:
+    nama: str
+    # ktx → (method, path, data); None = skenario dilewati (data tidak ada)
+    permintaan: Callable[[dict], Optional[tuple]]
+    # dipanggil sebelum tiap iterasi, di luar pengukuran (mis. buang cache)
+    persiapan: Optional[Callable[[dict], None]] = None
+    tulis: bool = False
+
+
+def _konteks():
+    topo = topologi()
+    ruangan = {t: topo.pertama(t) for t in (TAHAP_PENIMBANGAN, TAHAP_PROSES, TAHAP_FILLING, TAHAP_LABELLING)}
+    labelling = (
+        ProsesProduksi.objects
+        .filter(ruangan_id__in=topo.ids(TAHAP_LABELLING), status="Sedang Diproses",
+                estimasi_jumlah_kemasan__isnull=False)
+        .values_list("id", flat=True)
+        .first()
+    )
+    return {"ruangan": ruangan, "labelling_id": labelling}
+
+
+def _skenario_monitoring(tahap, dingin):
+    def permintaan(ktx):
+        info = ktx["ruangan"].get(tahap)
+        return ("get", reverse("monitoring_per_ruangan", args=[info.slug]), None) if info else None
+
+    def buang_cache(ktx):
+        papan_cache.naikkan_versi([ktx["ruangan"][tahap].id])
+
+    return Skenario(
+        nama=f"monitoring_ruangan_{tahap}_{'dingin' if dingin else 'hangat'}",
+        permintaan=permintaan,
+        persiapan=buang_cache if dingin else None,
+    )
+
+
+def daftar_skenario():
+    skenario = []
+    for tahap in (TAHAP_PENIMBANGAN, TAHAP_PROSES, TAHAP_FILLING, TAHAP_LABELLING):
+        skenario.append(_skenario_monitoring(tahap, dingin=True))
+        skenario.append(_skenario_monitoring(tahap, dingin=False))
+    skenario += [
+        Skenario("get_produksi_data", lambda ktx: ("get", reverse("get_produksi_data"), None)),
+        Skenario("api_status_batch", lambda ktx: ("get", reverse("api_status_batch") + "?limit=500", None)),
+        Skenario(
+            "admin_changelist",
+            lambda ktx: ("get", reverse("admin:produksi_monitoring_prosesproduksi_changelist"), None),
+        ),
+        Skenario(
+            "ringkasan_pabrik",
+            lambda ktx: ("get", reverse("api_ringkasan_pabrik"), None),
+            persiapan=lambda ktx: cache.delete(KUNCI_RINGKASAN),
+        ),
+        Skenario("grafik_produksi_30_hari", lambda ktx: ("get", reverse("api_grafik_produksi"), None)),
+        Skenario(
+            "update_progress_labelling",
+            lambda ktx: (
+                "post",
+                reverse("update_progress_labelling", args=[ktx["labelling_id"]]),
+                {"jumlah": 1, "rid": uuid.uuid4().hex},
+            ) if ktx["labelling_id"] else None,
+            tulis=True,
+        ),
+    ]
+    return skenario
+
+
+def _kirim(client, sk, ktx):
+    method, path, data = sk.permintaan(ktx)
+    kirim = getattr(client, method)
+    if sk.tulis:
+        with transaction.atomic():
+            resp = kirim(path, data or {})
+            transaction.set_rollback(True)
+    else:
+        resp = kirim(path, data or {})
+    # respons streaming baru bekerja saat dibaca
+    if resp.streaming:
+        b"".join(resp.streaming_content)
+    else:
+        resp.content
+    return resp
+
+
+def ukur(client, sk, ktx, iterasi, pemanasan):
+    if sk.permintaan(ktx) is None:
+        return {"dilewati": "data untuk skenario ini tidak ada"}
+
+    for _ in range(pemanasan):
+        if sk.persiapan:
+            sk.persiapan(ktx)
+        _kirim(client, sk, ktx)
+
+    durasi = []
+    status = None
+    for _ in range(iterasi):
+        if sk.persiapan:
+            sk.persiapan(ktx)
+        t0 = time.perf_counter()
+        resp = _kirim(client, sk, ktx)
+        durasi.append((time.perf_counter() - t0) * 1000)
+        status = resp.status_code
+
+    # pass terinstrumentasi (query + memori), tidak dihitung ke latensi
+    if sk.persiapan:
+        sk.persiapan(ktx)
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as q:
+            _kirim(client, sk, ktx)
+        _, puncak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "status": status,
+        "iterasi": iterasi,
+        **{f"p{p}_ms": round(_persentil(durasi, p), 2) for p in PERSENTIL},
+        "rata2_ms": round(sum(durasi) / len(durasi), 2),
+        "min_ms": round(min(durasi), 2),
+        "maks_ms": round(max(durasi), 2),
+        "query": len(q.captured_queries),
+        "puncak_memori_kb": round(puncak / 1024, 1),
+    }
+
+
+def jalankan_benchmark(user, iterasi=30, pemanasan=3, hanya=None, log=None):
+    client = Client()
+    client.force_login(user)
+    ktx = _konteks()
+
+    hasil = {}
+    for sk in daftar_skenario():
+        if hanya and sk.nama not in hanya:
+            continue
+        hasil[sk.nama] = ukur(client, sk, ktx, iterasi, pemanasan)
+        if log:
+            log(sk.nama, hasil[sk.nama])
+
+    return {
+        "meta": {
+            "waktu": now().isoformat(),
+            "iterasi": iterasi,
+            "pemanasan": pemanasan,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "data": {
+                "ruangan": Ruangan.objects.count(),
+                "produk": ItemDescription.objects.count(),
+                "operator": Operator.objects.count(),
+                "proses": ProsesProduksi.objects.count(),
+                "riwayat": RiwayatProduksi.objects.count(),
+            },
+        },
+        "hasil": hasil,
+    }
+
+
+def bandingkan(lama, baru, ambang=0.10):
+    """
+    Bandingkan dua laporan. Regresi = p95 naik > `ambang` (relatif) atau
+    jumlah query bertambah. Return list dict per skenario.
+    """
+    baris = []
+    for nama, b in baru["hasil"].items():
+        l = lama["hasil"].get(nama)
+        if not l or "p95_ms" not in l or "p95_ms" not in b:
+            continue
+        delta = (b["p95_ms"] - l["p95_ms"]) / l["p95_ms"] if l["p95_ms"] else 0.0
+        baris.append({
+            "nama": nama,
+            "p95_lama": l["p95_ms"],
+            "p95_baru": b["p95_ms"],
+            "delta_persen": round(delta * 100, 1),
+            "query_lama": l["query"],
+            "query_baru": b["query"],
+            "regresi": delta > ambang or b["query"] > l["query"],
+        })
+    return baris
+
+
+def simpan_laporan(laporan, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(laporan, f, indent=2, ensure_ascii=False)
+
+
+def baca_laporan(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
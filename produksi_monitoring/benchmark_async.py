@@ -0,0 +1,154 @@
+# produksi_monitoring/benchmark_async.py
+"""
+Benchmark polling konkuren: view sync vs async di bawah ASGI.
+
+N klien kiosk (coroutine) masing-masing mengirim `poll` request GET
+berurutan ke aplikasi ASGI Django yang sama dengan produksi
+(ASGIHandler dari get_asgi_application) — dipanggil langsung di proses ini, tanpa socket,
+sehingga yang terukur adalah handler, middleware, ORM dan thread, bukan
+jaringan. Tiap skenario dijalankan sekali lewat URL sync dan sekali lewat
+URL async (views_async.py).
+
+Diukur: throughput (request/detik dinding), p50/p95/p99 latensi per request,
+jumlah respons gagal, dan puncak jumlah thread proses selama skenario.
+"""
+import asyncio
+import platform
+import threading
+import time
+
+import django
+from django.core.handlers.asgi import ASGIHandler
+from django.urls import reverse
+from django.utils.timezone import now
+
+from .benchmark import PERSENTIL
+from .instrumentasi import _persentil
+
+# nama skenario → (nama url sync, nama url async, query string)
+SKENARIO = {
+    "get_produksi_data": ("get_produksi_data", "get_produksi_data_async", ""),
+    "api_status_batch": ("api_status_batch", "api_status_batch_async", "limit=100"),
+    "dashboard": ("dashboard", "dashboard_async", ""),
+    "monitoring_index": ("monitoring_index", "monitoring_index_async", ""),
+}
+SAMPEL_THREAD_DETIK = 0.01
+
+
+def _scope(path, query):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+
+
+async def _permintaan(app, path, query):
+    """Satu request lewat aplikasi ASGI; return (status, jumlah byte body)."""
+    masuk = [{"type": "http.request", "body": b"", "more_body": False}]
+    selesai = asyncio.Event()
+    hasil = {"status": None, "byte": 0}
+
+    async def receive():
+        if masuk:
+            return masuk.pop()
+        await selesai.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(pesan):
+        if pesan["type"] == "http.response.start":
+            hasil["status"] = pesan["status"]
+        elif pesan["type"] == "http.response.body":
+            hasil["byte"] += len(pesan.get("body", b""))
+            if not pesan.get("more_body"):
+                selesai.set()
+
+    await app(_scope(path, query), receive, send)
+    selesai.set()
+    return hasil["status"], hasil["byte"]
+
+
+async def _kiosk(app, path, query, poll, jeda, durasi, gagal):
+    for _ in range(poll):
+        t0 = time.perf_counter()
+        status, _ = await _permintaan(app, path, query)
+        durasi.append((time.perf_counter() - t0) * 1000)
+        if status != 200:
+            gagal.append(status)
+        if jeda:
+            await asyncio.sleep(jeda)
+
+
+async def _pantau_thread(puncak, berhenti):
+    while not berhenti.is_set():
+        puncak[0] = max(puncak[0], threading.active_count())
+        await asyncio.sleep(SAMPEL_THREAD_DETIK)
+
+
+async def ukur_poll(app, url, klien, poll, jeda=0.0):
+    path, _, query = url.partition("?")
+    # pemanasan: topologi, template, koneksi
+    await _permintaan(app, path, query)
+
+    durasi, gagal, puncak = [], [], [threading.active_count()]
+    berhenti = asyncio.Event()
+    pemantau = asyncio.create_task(_pantau_thread(puncak, berhenti))
+    t0 = time.perf_counter()
+    await asyncio.gather(*[
+        _kiosk(app, path, query, poll, jeda, durasi, gagal) for _ in range(klien)
+    ])
+    dinding = time.perf_counter() - t0
+    berhenti.set()
+    await pemantau
+
+    return {
+        "request": len(durasi),
+        "gagal": len(gagal),
+        "durasi_s": round(dinding, 3),
+        "throughput_rps": round(len(durasi) / dinding, 1),
+        **{f"p{p}_ms": round(_persentil(durasi, p), 2) for p in PERSENTIL},
+        "maks_ms": round(max(durasi), 2),
+        "puncak_thread": puncak[0],
+    }
+
+
+def _url(nama, query):
+    return f"{reverse(nama)}?{query}" if query else reverse(nama)
+
+
+async def _jalankan(skenario, klien, poll, jeda, log):
+    app = ASGIHandler()
+    hasil = {}
+    for nama in skenario:
+        url_sync, url_async, query = SKENARIO[nama]
+        hasil[nama] = {}
+        for mode, url in (("sync", _url(url_sync, query)), ("async", _url(url_async, query))):
+            hasil[nama][mode] = await ukur_poll(app, url, klien, poll, jeda)
+            if log:
+                log(nama, mode, hasil[nama][mode])
+    return hasil
+
+
+def jalankan_benchmark_async(skenario=None, klien=200, poll=5, jeda=0.0, log=None):
+    skenario = list(skenario or SKENARIO)
+    hasil = asyncio.run(_jalankan(skenario, klien, poll, jeda, log))
+    return {
+        "meta": {
+            "waktu": now().isoformat(),
+            "klien": klien,
+            "poll_per_klien": poll,
+            "jeda_s": jeda,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+        },
+        "hasil": hasil,
+    }
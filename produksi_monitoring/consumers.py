@@ -0,0 +1,44 @@
+# produksi_monitoring/consumers.py
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .models import Ruangan
+from .realtime import nama_grup
+
+
+class ProsesProduksiConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Papan monitoring realtime per ruangan: ws/monitoring/<slug>/
+    Klien hanya menerima diff baris; tidak ada pesan masuk yang diproses.
+    """
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if not user or not user.is_authenticated:
+            await self.close()
+            return
+
+        slug = self.scope["url_route"]["kwargs"]["ruangan_nama"]
+        if not await self._ruangan_ada(slug):
+            await self.close()
+            return
+
+        self.grup = nama_grup(slug)
+        await self.channel_layer.group_add(self.grup, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if getattr(self, "grup", None):
+            await self.channel_layer.group_discard(self.grup, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # Satu-satunya pesan klien: ping keep-alive
+        if content.get("tipe") == "ping":
+            await self.send_json({"tipe": "pong"})
+
+    async def ruangan_update(self, event):
+        await self.send_json(event["pesan"])
+
+    @database_sync_to_async
+    def _ruangan_ada(self, slug):
+        return Ruangan.objects.filter(slug=slug).exists()
@@ -0,0 +1,219 @@
+# produksi_monitoring/data_sintetis.py
+"""
+Generator data sintetis untuk uji beban / benchmark.
+
+Membuat rantai ruangan Penimbangan → Proses → Filling → Labelling, master
+item, operator, ProsesProduksi dan RiwayatProduksi dengan distribusi status
+yang menyerupai lantai produksi. Semua nama memakai PREFIX sehingga bisa
+dibersihkan lagi (hapus_data_sintetis). Insert memakai bulk_create per
+chunk — tidak ada save()/signal per baris — sehingga skala 1 juta baris
+tetap realistis dijalankan.
+"""
+import random
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from . import katalog
+from .models import (
+    ArsipProsesProduksi, ArsipRiwayatProduksi, ItemDescription, Operator, ProsesProduksi,
+    RiwayatProduksi, Ruangan,
+)
+from .topology import (
+    TAHAP_PENIMBANGAN, TAHAP_PROSES, TAHAP_FILLING, TAHAP_LABELLING, invalidate,
+)
+
+PREFIX = "SYN"
+CHUNK = 5000
+
+KATEGORI_OPERATOR = {
+    TAHAP_PENIMBANGAN: "Penimbangan",
+    TAHAP_PROSES: "Proses",
+    TAHAP_FILLING: "Filling",
+    TAHAP_LABELLING: "Labelling",
+}
+
+
+@dataclass
+class HasilGenerate:
+    ruangan: int = 0
+    produk: int = 0
+    operator: int = 0
+    proses: int = 0
+    riwayat: int = 0
+    durasi_ms: float = 0.0
+
+    def __str__(self):
+        return (
+            f"{self.ruangan} ruangan, {self.produk} produk, {self.operator} operator, "
+            f"{self.proses} proses, {self.riwayat} riwayat ({self.durasi_ms / 1000:.1f} s)"
+        )
+
+
+@contextmanager
+def _waktu_manual(model, nama_field):
+    """Matikan auto_now_add sementara agar waktu historis bisa diisi."""
+    field = model._meta.get_field(nama_field)
+    semula = field.auto_now_add
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = semula
+
+
+def _buat_ruangan(jumlah_paralel):
+    """Rantai tahap; tiap jalur Proses[i] → Filling[i] → Labelling[i]."""
+    def buat(kode, nama, tahap, berikutnya=None):
+        return Ruangan.objects.create(
+            kode_ruangan=kode, nama=nama, link_khusus=f"/{PREFIX.lower()}/{kode.lower()}",
+            jenis_proses=tahap, tahap_berikutnya=berikutnya,
+        )
+
+    jalur = []
+    for i in range(1, jumlah_paralel + 1):
+        lab = buat(f"{PREFIX}L{i}", f"{PREFIX} Labelling {i}", TAHAP_LABELLING)
+        fil = buat(f"{PREFIX}F{i}", f"{PREFIX} Filling {i}", TAHAP_FILLING, lab)
+        pro = buat(f"{PREFIX}P{i}", f"{PREFIX} Ruang Proses {i}", TAHAP_PROSES, fil)
+        jalur.append((pro, fil, lab))
+    timbang = buat(f"{PREFIX}W", f"{PREFIX} Penimbangan", TAHAP_PENIMBANGAN, jalur[0][0])
+    invalidate()
+    return timbang, jalur
+
+
+def _status_di(ruangan, tahap, rng):
+    """Status + hasil_akhir untuk batch yang sedang berada di ruangan ini."""
+    r = rng.random()
+    if r < 0.3:
+        return "Menunggu", ""
+    if r < 0.6:
+        return "Sedang Diproses", ""
+    if tahap == TAHAP_LABELLING:
+        return "Selesai Produksi", ""
+    hasil = ("Release" if rng.random() < 0.95 else "Reject") if tahap == TAHAP_PROSES else ""
+    return f"Selesai Diproses di {ruangan.nama}", hasil
+
+
+def generate(batch=1000, produk=None, operator=30, jalur=2, hari=90, seed=42, log=None) -> HasilGenerate:
+    """
+    `batch` = jumlah ProsesProduksi (1 baris per batch, di ruangan posisinya
+    sekarang). Riwayat dibuat untuk setiap ruangan yang sudah dilewati, jadi
+    total baris ≈ 2,5 × batch.
+    """
+    mulai = time.perf_counter()
+    rng = random.Random(seed)
+    hasil = HasilGenerate()
+    produk = produk or max(50, batch // 100)
+    operator = max(operator, len(KATEGORI_OPERATOR))
+    if Ruangan.objects.filter(kode_ruangan__startswith=PREFIX).exists():
+        raise ValueError(f"Data sintetis '{PREFIX}' sudah ada; hapus dulu (generate_dummy_data --hapus).")
+
+    with transaction.atomic():
+        timbang, daftar_jalur = _buat_ruangan(jalur)
+        hasil.ruangan = 1 + 3 * len(daftar_jalur)
+
+        items = ItemDescription.objects.bulk_create([
+            ItemDescription(description=f"{PREFIX} Produk {i:05d}", barcode=f"{PREFIX}{i:08d}")
+            for i in range(produk)
+        ], batch_size=CHUNK)
+        hasil.produk = len(items)
+        katalog.invalidate()
+
+        ops = Operator.objects.bulk_create([
+            Operator(nama=f"{PREFIX} Operator {i:03d}", kategori=list(KATEGORI_OPERATOR.values())[i % 4])
+            for i in range(operator)
+        ])
+        hasil.operator = len(ops)
+
+    # id diambil ulang (SQLite < 3.35 tidak mengembalikan pk dari bulk_create)
+    produk_ids = list(
+        ItemDescription.objects.filter(description__startswith=f"{PREFIX} Produk ").values_list("id", flat=True)
+    )
+    op_per_kategori = {}
+    for op_id, kategori in Operator.objects.filter(nama__startswith=f"{PREFIX} ").values_list("id", "kategori"):
+        op_per_kategori.setdefault(kategori, []).append(op_id)
+    acuan = now()
+    rentang_menit = hari * 24 * 60
+
+    proses_buf, riwayat_buf = [], []
+
+    def flush():
+        with transaction.atomic(), _waktu_manual(ProsesProduksi, "waktu_dibuat"):
+            ProsesProduksi.objects.bulk_create(proses_buf, batch_size=1000)
+            RiwayatProduksi.objects.bulk_create(riwayat_buf, batch_size=1000)
+        hasil.proses += len(proses_buf)
+        hasil.riwayat += len(riwayat_buf)
+        proses_buf.clear()
+        riwayat_buf.clear()
+        if log:
+            log(f"  … {hasil.proses} proses, {hasil.riwayat} riwayat")
+
+    for n in range(batch):
+        pro, fil, lab = daftar_jalur[n % len(daftar_jalur)]
+        rute = [(timbang, TAHAP_PENIMBANGAN), (pro, TAHAP_PROSES), (fil, TAHAP_FILLING), (lab, TAHAP_LABELLING)]
+        posisi = rng.choices(range(4), weights=(2, 2, 2, 4))[0]
+        nomor_batch = f"{PREFIX}{n:07d}"
+        produk_id = rng.choice(produk_ids)
+        jumlah = rng.randint(50, 2000)
+        satuan = rng.choice(("kg", "liter"))
+        estimasi = jumlah * rng.randint(2, 6)
+
+        t = acuan - timedelta(minutes=rng.randint(60 * 24, rentang_menit))
+        dibuat = t
+        for ruangan, tahap in rute[:posisi]:
+            t_mulai = t + timedelta(minutes=rng.randint(5, 240))
+            t_selesai = t_mulai + timedelta(minutes=rng.randint(30, 480))
+            riwayat_buf.append(RiwayatProduksi(
+                nomor_batch=nomor_batch, nama_produk_id=produk_id, jumlah=jumlah, satuan=satuan,
+                ruangan=ruangan, operator_id=rng.choice(op_per_kategori[KATEGORI_OPERATOR[tahap]]), waktu_mulai_produksi=t_mulai, waktu_selesai=t_selesai,
+                hasil_akhir=("Release" if rng.random() < 0.95 else "Reject") if tahap == TAHAP_PROSES else None,
+            ))
+            t = t_selesai
+
+        ruangan, tahap = rute[posisi]
+        status, hasil_akhir = _status_di(ruangan, tahap, rng)
+        t_mulai = t + timedelta(minutes=rng.randint(5, 240)) if status != "Menunggu" else None
+        t_selesai = t_mulai + timedelta(minutes=rng.randint(30, 480)) if status.startswith("Selesai") else None
+        labelling = tahap == TAHAP_LABELLING
+        proses_buf.append(ProsesProduksi(
+            nomor_batch=nomor_batch, nama_id=produk_id, jumlah=jumlah, satuan=satuan,
+            ruangan=ruangan, status=status, hasil_akhir=hasil_akhir,
+            operator_id=rng.choice(op_per_kategori[KATEGORI_OPERATOR[tahap]]),
+            waktu_dibuat=dibuat, waktu_mulai_produksi=t_mulai, waktu_selesai=t_selesai,
+            progress=jumlah if t_selesai else (rng.randint(0, jumlah) if t_mulai else 0),
+            estimasi_jumlah_kemasan=estimasi if labelling else None,
+            jumlah_kemasan=(estimasi if t_selesai else rng.randint(0, estimasi)) if labelling and t_mulai else None,
+            satuan_kemasan="Pcs" if labelling else None,
+        ))
+
+        if len(proses_buf) >= CHUNK:
+            flush()
+    if proses_buf or riwayat_buf:
+        flush()
+
+    hasil.durasi_ms = (time.perf_counter() - mulai) * 1000
+    return hasil
+
+
+def hapus_data_sintetis():
+    """
+    Hapus semua data ber-PREFIX, termasuk yang sudah diarsipkan. Tabel
+    besar dihapus dengan satu DELETE mentah: QuerySet.delete() akan memuat
+    & mengirim signal per baris (index FTS ikut terhapus lewat trigger).
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for model in (ArsipRiwayatProduksi, ArsipProsesProduksi, RiwayatProduksi, ProsesProduksi):
+                cursor.execute(
+                    f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)} WHERE nomor_batch LIKE %s",
+                    [f"{PREFIX}%"],
+                )
+        Ruangan.objects.filter(kode_ruangan__startswith=PREFIX).delete()
+        ItemDescription.objects.filter(description__startswith=f"{PREFIX} ").delete()
+        Operator.objects.filter(nama__startswith=f"{PREFIX} ").delete()
+    invalidate()
+    katalog.invalidate()
@@ -0,0 +1,237 @@
+# produksi_monitoring/ekspor.py
+"""
+Ekspor riwayat produksi & batch selesai ke CSV / XLSX dengan memori tetap.
+
+- Filter: ruangan (slug), produk (id), hasil akhir, rentang waktu_selesai
+  (dari/sampai atau bulan=YYYY-MM)
+- Satu query values_list() dengan JOIN nama produk/ruangan/operator, dibaca
+  lewat .iterator(chunk_size) → tidak ada list instance / list baris penuh
+- Urut id (primary key) per tabel → SQLite tidak perlu sort sementara, baris
+  pertama keluar segera walau hasilnya jutaan baris
+- Tabel arsip dibaca dulu lalu tabel hot (arsip.gabungan); arsip=0 → hot saja.
+  Urutan file = blok arsip lalu blok hot, masing-masing urut id — bukan urut
+  id global (id arsip bisa lebih besar dari id hot)
+- CSV di-stream per potongan; XLSX ditulis openpyxl mode write-only (baris
+  langsung ke file sementara worksheet) dan pindah sheet setiap batas baris
+  Excel tercapai
+"""
+import csv
+from datetime import datetime
+
+from django.utils.timezone import localtime, make_aware
+
+from .arsip import gabungan
+from .helpers import parse_waktu
+from .models import ProsesProduksi, RiwayatProduksi
+from .topology import topologi
+
+SUMBER_RIWAYAT = "riwayat"
+SUMBER_PROSES = "proses"
+FORMAT_CSV = "csv"
+FORMAT_XLSX = "xlsx"
+
+CHUNK = 2000
+BARIS_PER_POTONGAN_CSV = 500
+# 1.048.576 baris per sheet Excel, dikurangi header
+MAKS_BARIS_SHEET = 1_048_575
+FORMAT_WAKTU = "%Y-%m-%d %H:%M:%S"
+
+# (header, path ORM) per sumber — urutan = urutan kolom file
+KOLOM = {
+    SUMBER_RIWAYAT: (
+        ("Nomor Batch", "nomor_batch"),
+        ("Produk", "nama_produk__description"),
+        ("Barcode", "nama_produk__barcode"),
+        ("Ruangan", "ruangan__nama"),
+        ("Operator", "operator__nama"),
+        ("Jumlah", "jumlah"),
+        ("Satuan", "satuan"),
+        ("Waktu Mulai", "waktu_mulai_produksi"),
+        ("Waktu Selesai", "waktu_selesai"),
+        ("Hasil Akhir", "hasil_akhir"),
+    ),
+    SUMBER_PROSES: (
+        ("Nomor Batch", "nomor_batch"),
+        ("Produk", "nama__description"),
+        ("Barcode", "nama__barcode"),
+        ("Ruangan", "ruangan__nama"),
+        ("Operator", "operator__nama"),
+        ("Jumlah", "jumlah"),
+        ("Satuan", "satuan"),
+        ("Jumlah Kemasan", "jumlah_kemasan"),
+        ("Satuan Kemasan", "satuan_kemasan"),
+        ("Status", "status"),
+        ("Waktu Mulai", "waktu_mulai_produksi"),
+        ("Waktu Selesai", "waktu_selesai"),
+        ("Hasil Akhir", "hasil_akhir"),
+    ),
+}
+HASIL_AKHIR = ("Release", "Reject")
+
+
+class FilterEksporError(ValueError):
+    """Parameter ekspor tidak valid (dikembalikan sebagai HTTP 400 / CommandError)."""
+
+
+def _daftar(nilai):
+    return [v.strip() for v in (nilai or "").split(",") if v.strip()]
+
+
+def _waktu(nilai, nama):
+    """Tanggal (YYYY-MM-DD) atau datetime ISO-8601 → datetime aware."""
+    try:
+        return parse_waktu(nilai)
+    except ValueError:
+        raise FilterEksporError(f"{nama} harus tanggal YYYY-MM-DD atau ISO-8601 yang valid") from None
+
+
+def _bulan(nilai):
+    """'YYYY-MM' → (awal bulan, awal bulan berikutnya)."""
+    try:
+        tahun, bulan = (int(x) for x in nilai.split("-"))
+        awal = datetime(tahun, bulan, 1)
+    except ValueError:
+        raise FilterEksporError("bulan harus format YYYY-MM")
+    akhir = datetime(tahun + bulan // 12, bulan % 12 + 1, 1)
+    return make_aware(awal), make_aware(akhir)
+
+
+def _sel_csv(nilai):
+    """Nilai sel CSV: datetime → teks waktu lokal, None → kosong."""
+    if isinstance(nilai, datetime):
+        return localtime(nilai).strftime(FORMAT_WAKTU)
+    return "" if nilai is None else nilai
+
+
+def _sel_xlsx(nilai):
+    """Nilai sel XLSX: datetime tetap tanggal Excel (lokal, tanpa zona — Excel tidak kenal zona)."""
+    if isinstance(nilai, datetime):
+        return localtime(nilai).replace(tzinfo=None)
+    return nilai
+
+
+class EksporProduksi:
+    """Satu permintaan ekspor; dibangun dari query string / opsi command."""
+
+    def __init__(self, params):
+        self.jumlah = 0
+        self.sumber = params.get("sumber") or SUMBER_RIWAYAT
+        if self.sumber not in KOLOM:
+            raise FilterEksporError(f"sumber harus '{SUMBER_RIWAYAT}' atau '{SUMBER_PROSES}'")
+        self.format = params.get("format") or FORMAT_CSV
+        if self.format not in (FORMAT_CSV, FORMAT_XLSX):
+            raise FilterEksporError(f"format harus '{FORMAT_CSV}' atau '{FORMAT_XLSX}'")
+
+        topo = topologi()
+        self.ruangan_ids = []
+        for slug in _daftar(params.get("ruangan")):
+            info = topo.dari_slug(slug)
+            if not info:
+                raise FilterEksporError(f"ruangan tidak dikenal: {slug}")
+            self.ruangan_ids.append(info.id)
+
+        try:
+            self.produk_ids = [int(p) for p in _daftar(params.get("produk"))]
+        except ValueError:
+            raise FilterEksporError("produk harus daftar id angka")
+
+        self.hasil = _daftar(params.get("hasil"))
+        tidak_dikenal = [h for h in self.hasil if h not in HASIL_AKHIR]
+        if tidak_dikenal:
+            raise FilterEksporError(f"hasil tidak dikenal: {', '.join(tidak_dikenal)}")
+
+        self.arsip = params.get("arsip") not in ("0", "false", False)
+
+        self.bulan = params.get("bulan") or None
+        if self.bulan:
+            self.dari, self.sampai = _bulan(self.bulan)
+        else:
+            self.dari = _waktu(params.get("dari"), "dari")
+            self.sampai = _waktu(params.get("sampai"), "sampai")
+
+    @property
+    def header(self):
+        return [h for h, _ in KOLOM[self.sumber]]
+
+    @property
+    def nama_file(self):
+        periode = self.bulan or "semua"
+        return f"{self.sumber}_produksi_{periode}.{self.format}"
+
+    def queryset(self):
+        if self.sumber == SUMBER_RIWAYAT:
+            qs, produk = gabungan(RiwayatProduksi, self.arsip), "nama_produk_id__in"
+        else:
+            # batch yang sudah selesai di ruangannya (Selesai Diproses di …/Selesai Produksi)
+            qs, produk = gabungan(ProsesProduksi, self.arsip).filter(status__startswith="Selesai"), "nama_id__in"
+        if self.ruangan_ids:
+            qs = qs.filter(ruangan_id__in=self.ruangan_ids)
+        if self.produk_ids:
+            qs = qs.filter(**{produk: self.produk_ids})
+        if self.hasil:
+            qs = qs.filter(hasil_akhir__in=self.hasil)
+        if self.dari:
+            qs = qs.filter(waktu_selesai__gte=self.dari)
+        if self.sampai:
+            qs = qs.filter(waktu_selesai__lt=self.sampai)
+        # urut PK: tanpa ORDER BY di luar index → streaming dimulai seketika
+        return qs.order_by("id").values_list(*[p for _, p in KOLOM[self.sumber]])
+
+    def baris(self, sel=_sel_csv):
+        """Generator list nilai sel per baris (tanpa header); `self.jumlah` ikut bertambah."""
+        self.jumlah = 0
+        for row in self.queryset().iterator(chunk_size=CHUNK):
+            self.jumlah += 1
+            yield [sel(v) for v in row]
+
+    # --- CSV ---
+    def stream_csv(self):
+        """
+        Generator str untuk StreamingHttpResponse / file. BOM UTF-8 di awal
+        agar Excel membaca karakter non-ASCII dengan benar.
+        """
+        penampung = _Penampung()
+        writer = csv.writer(penampung)
+        writer.writerow(self.header)
+        yield "\ufeff" + penampung.ambil()
+        for row in self.baris():
+            writer.writerow(row)
+            if self.jumlah % BARIS_PER_POTONGAN_CSV == 0:
+                yield penampung.ambil()
+        sisa = penampung.ambil()
+        if sisa:
+            yield sisa
+
+    # --- XLSX ---
+    def tulis_xlsx(self, tujuan):
+        """Tulis workbook write-only ke path / file object; return jumlah baris data."""
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws, isi_sheet = None, MAKS_BARIS_SHEET
+        for row in self.baris(_sel_xlsx):
+            if isi_sheet >= MAKS_BARIS_SHEET:
+                ws = wb.create_sheet(f"{self.sumber} {len(wb.worksheets) + 1}")
+                ws.append(self.header)
+                isi_sheet = 0
+            ws.append(row)
+            isi_sheet += 1
+        if ws is None:
+            wb.create_sheet(f"{self.sumber} 1").append(self.header)
+        wb.save(tujuan)
+        return self.jumlah
+
+
+class _Penampung:
+    """Tujuan csv.writer: kumpulkan baris lalu ambil() sebagai satu str."""
+
+    def __init__(self):
+        self._isi = []
+
+    def write(self, teks):
+        self._isi.append(teks)
+
+    def ambil(self):
+        teks = "".join(self._isi)
+        self._isi.clear()
+        return teks
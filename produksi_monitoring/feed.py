@@ -0,0 +1,248 @@
+# produksi_monitoring/feed.py
+"""
+Feed status batch untuk integrasi MES.
+
+- Filter: ruangan (slug), status, rentang waktu_dibuat
+- Pilih kolom (`fields=`), baca lewat values_list() — tanpa instance model
+- Keyset pagination pada (waktu_dibuat, id) → biaya per halaman tetap
+- Hasil di-stream (NDJSON atau JSON bertahap); varian a*() untuk view async
+  membaca per potongan lewat sync_to_async (_aiter_potongan)
+"""
+import base64
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .helpers import parse_waktu
+from .models import ProsesProduksi
+from .topology import topologi
+
+# nama kolom di output → path ORM
+KOLOM = {
+    "id": "id",
+    "nomor_batch": "nomor_batch",
+    "nama_produk": "nama__description",
+    "barcode": "nama__barcode",
+    "ruangan": "ruangan_id",          # diganti nama ruangan dari topologi
+    "status": "status",
+    "hasil_akhir": "hasil_akhir",
+    "jumlah": "jumlah",
+    "satuan": "satuan",
+    "progress": "progress",
+    "estimasi_jumlah_kemasan": "estimasi_jumlah_kemasan",
+    "jumlah_kemasan": "jumlah_kemasan",
+    "satuan_kemasan": "satuan_kemasan",
+    "operator": "operator__nama",
+    "waktu_dibuat": "waktu_dibuat",
+    "waktu_mulai_produksi": "waktu_mulai_produksi",
+    "waktu_selesai": "waktu_selesai",
+}
+KOLOM_DEFAULT = (
+    "id", "nomor_batch", "nama_produk", "ruangan", "status", "hasil_akhir",
+    "jumlah", "satuan", "progress", "operator", "waktu_dibuat", "waktu_selesai",
+)
+
+LIMIT_DEFAULT = 500
+LIMIT_MAKS = 5000
+CHUNK = 1000
+
+
+class FeedError(ValueError):
+    """Parameter feed tidak valid (dikembalikan sebagai HTTP 400)."""
+
+
+def encode_cursor(waktu_dibuat, pk):
+    mentah = f"{waktu_dibuat.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(mentah.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        mentah = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        waktu, pk = mentah.rsplit("|", 1)
+        waktu = parse_datetime(waktu)
+        if waktu is None:
+            raise ValueError
+        return waktu, int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise FeedError("cursor tidak valid")
+
+
+def _daftar(nilai):
+    return [v.strip() for v in (nilai or "").split(",") if v.strip()]
+
+
+def _waktu(nilai, nama):
+    try:
+        return parse_waktu(nilai)
+    except ValueError:
+        raise FeedError(f"{nama} harus tanggal YYYY-MM-DD atau ISO-8601 yang valid") from None
+
+
+async def _aiter_potongan(qs, ukuran=CHUNK):
+    """
+    Iterasi async atas QuerySet per `ukuran` baris. Pengganti
+    QuerySet.aiterator(): di Django 4.2 aiterator() atas values_list()
+    mengeksekusi query langsung di event loop (SynchronousOnlyOperation).
+    Semua potongan dibaca di thread sync yang sama → satu cursor/koneksi.
+    """
+    it = await sync_to_async(lambda: iter(qs.iterator(chunk_size=ukuran)))()
+    while True:
+        potongan = await sync_to_async(lambda: list(islice(it, ukuran)))()
+        for row in potongan:
+            yield row
+        if len(potongan) < ukuran:
+            break
+
+
+class FeedStatusBatch:
+    """Satu halaman feed; dibangun dari query string (request.GET)."""
+
+    def __init__(self, params, ruangan_default=None, kolom_default=KOLOM_DEFAULT, tanpa_batas=False, topo=None):
+        self.kolom = _daftar(params.get("fields")) or list(kolom_default)
+        tidak_dikenal = [k for k in self.kolom if k not in KOLOM]
+        if tidak_dikenal:
+            raise FeedError(f"fields tidak dikenal: {', '.join(tidak_dikenal)}")
+
+        if tanpa_batas:
+            self.limit = None
+        else:
+            try:
+                self.limit = min(int(params.get("limit", LIMIT_DEFAULT)), LIMIT_MAKS)
+            except (TypeError, ValueError):
+                raise FeedError("limit harus angka")
+            if self.limit < 1:
+                raise FeedError("limit harus > 0")
+
+        self.naik = params.get("urutan", "desc") == "asc"
+        self.cursor = decode_cursor(params["cursor"]) if params.get("cursor") else None
+
+        # view async mengirim topo dari atopologi() → konstruktor tanpa query
+        self.topo = topo = topo or topologi()
+        slugs = _daftar(params.get("ruangan")) or list(ruangan_default or [])
+        self.ruangan_ids = []
+        for slug in slugs:
+            info = topo.dari_slug(slug)
+            if not info:
+                raise FeedError(f"ruangan tidak dikenal: {slug}")
+            self.ruangan_ids.append(info.id)
+
+        self.status = _daftar(params.get("status"))
+        self.dari = _waktu(params.get("dari"), "dari")
+        self.sampai = _waktu(params.get("sampai"), "sampai")
+
+    def queryset(self):
+        qs = ProsesProduksi.objects.all()
+        if self.ruangan_ids:
+            qs = qs.filter(ruangan_id__in=self.ruangan_ids)
+        if self.status:
+            qs = qs.filter(status__in=self.status)
+        if self.dari:
+            qs = qs.filter(waktu_dibuat__gte=self.dari)
+        if self.sampai:
+            qs = qs.filter(waktu_dibuat__lt=self.sampai)
+
+        if self.cursor:
+            waktu, pk = self.cursor
+            if self.naik:
+                qs = qs.filter(Q(waktu_dibuat__gt=waktu) | Q(waktu_dibuat=waktu, id__gt=pk))
+            else:
+                qs = qs.filter(Q(waktu_dibuat__lt=waktu) | Q(waktu_dibuat=waktu, id__lt=pk))
+
+        urutan = ("waktu_dibuat", "id") if self.naik else ("-waktu_dibuat", "-id")
+        # waktu_dibuat & id selalu diambil (untuk cursor), meski tidak diminta
+        path = [KOLOM[k] for k in self.kolom] + ["waktu_dibuat", "id"]
+        qs = qs.order_by(*urutan).values_list(*path)
+        return qs if self.limit is None else qs[: self.limit + 1]
+
+    def _idx_ruangan(self):
+        return self.kolom.index("ruangan") if "ruangan" in self.kolom else None
+
+    def _dict(self, row, idx_ruangan):
+        nilai = list(row[:len(self.kolom)])
+        if idx_ruangan is not None:
+            info = self.topo.ruangan(nilai[idx_ruangan])
+            nilai[idx_ruangan] = info.nama if info else None
+        return dict(zip(self.kolom, nilai))
+
+    def baris(self):
+        """
+        Generator dict per baris. Setelah habis, `self.next_cursor` terisi
+        (None bila tidak ada halaman berikutnya).
+        """
+        self.next_cursor = None
+        n = len(self.kolom)
+        idx_ruangan = self._idx_ruangan()
+        terakhir = None
+
+        for i, row in enumerate(self.queryset().iterator(chunk_size=CHUNK)):
+            if i == self.limit:
+                self.next_cursor = encode_cursor(*terakhir)
+                break
+            terakhir = row[n:]
+            yield self._dict(row, idx_ruangan)
+
+    async def abaris(self):
+        """Sama dengan baris(), untuk view async."""
+        self.next_cursor = None
+        n = len(self.kolom)
+        idx_ruangan = self._idx_ruangan()
+        terakhir = None
+        i = 0
+        async for row in _aiter_potongan(self.queryset()):
+            if i == self.limit:
+                self.next_cursor = encode_cursor(*terakhir)
+                break
+            i += 1
+            terakhir = row[n:]
+            yield self._dict(row, idx_ruangan)
+
+    # --- serialisasi bertahap ---
+    def stream_ndjson(self):
+        for data in self.baris():
+            yield json.dumps(data, cls=DjangoJSONEncoder) + "\n"
+        yield json.dumps({"next_cursor": self.next_cursor}) + "\n"
+
+    def stream_json(self):
+        yield '{"data": ['
+        pemisah = ""
+        for data in self.baris():
+            yield pemisah + json.dumps(data, cls=DjangoJSONEncoder)
+            pemisah = ","
+        yield '], "next_cursor": %s}' % json.dumps(self.next_cursor)
+
+    def stream_json_list(self):
+        """Array JSON polos (format lama get_produksi_data)."""
+        yield "["
+        pemisah = ""
+        for data in self.baris():
+            yield pemisah + json.dumps(data, cls=DjangoJSONEncoder)
+            pemisah = ","
+        yield "]"
+
+    # --- serialisasi bertahap (async) ---
+    async def astream_ndjson(self):
+        async for data in self.abaris():
+            yield json.dumps(data, cls=DjangoJSONEncoder) + "\n"
+        yield json.dumps({"next_cursor": self.next_cursor}) + "\n"
+
+    async def astream_json(self):
+        yield '{"data": ['
+        pemisah = ""
+        async for data in self.abaris():
+            yield pemisah + json.dumps(data, cls=DjangoJSONEncoder)
+            pemisah = ","
+        yield '], "next_cursor": %s}' % json.dumps(self.next_cursor)
+
+    async def astream_json_list(self):
+        yield "["
+        pemisah = ""
+        async for data in self.abaris():
+            yield pemisah + json.dumps(data, cls=DjangoJSONEncoder)
+            pemisah = ","
+        yield "]"
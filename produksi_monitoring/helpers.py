@@ -1,7 +1,35 @@
 # produksi_monitoring/helpers.py
+from datetime import datetime
+
 from django.db import transaction
 from django.db.models import Q
-from .models import ProsesProduksi, Ruangan, Operator
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware
+from . import jurnal
+from .models import EventBatch, ProsesProduksi, Operator
+from .realtime import segarkan_ruangan
+from .topology import topologi
+
+
+def parse_waktu(nilai, default=None):
+    """
+    Parameter waktu dari/sampai: tanggal (YYYY-MM-DD) atau datetime ISO-8601
+    → datetime aware (naive dianggap zona waktu lokal). Kosong → `default`.
+    Format salah maupun tanggal mustahil (2024-02-30, bulan 13) → ValueError(nilai).
+    """
+    if not nilai:
+        return default
+    try:
+        waktu = parse_datetime(nilai)
+        if waktu is None:
+            tanggal = parse_date(nilai)
+            if tanggal is None:
+                raise ValueError(nilai)
+            waktu = datetime.combine(tanggal, datetime.min.time())
+    except ValueError:
+        # parse_* melempar ValueError sendiri untuk tanggal yang mustahil
+        raise ValueError(nilai) from None
+    return make_aware(waktu) if is_naive(waktu) else waktu
 
 
 def ensure_labelling_shadow_from(proses_filling: ProsesProduksi) -> bool:
@@ -13,16 +41,16 @@ def ensure_labelling_shadow_from(proses_filling: ProsesProduksi) -> bool:
       False -> tidak dibuat (sudah ada / bukan dari Filling / tak ada ruangan Labelling)
     """
     # Validasi dasar
-    if not proses_filling or not getattr(proses_filling, "ruangan", None):
+    if not proses_filling or not proses_filling.ruangan_id:
         return False
 
-    # Hanya jalankan untuk sumber dari Filling (sesuaikan keyword jika nama ruang berbeda)
-    nama_asal = (proses_filling.ruangan.nama or "").lower()
-    if "fill" not in nama_asal:  # contoh: "Filling", "Pengisian (Filling)", dst.
+    # Hanya jalankan untuk sumber dari tahap Filling (lihat topology.py)
+    topo = topologi(proses_filling.ruangan_id)
+    if not topo.is_filling(proses_filling.ruangan_id):
         return False
 
-    # Cari ruangan Labelling (pakai 'labell' agar match "labelling"/"labeling")
-    ruangan_lab = Ruangan.objects.filter(nama__icontains="labell").first()
+    # Ruangan Labelling tujuan (tahap berikutnya, atau Labelling pertama)
+    ruangan_lab = topo.ruangan_labelling_untuk(proses_filling.ruangan_id)
     if not ruangan_lab:
         return False
 
@@ -33,7 +61,7 @@ def ensure_labelling_shadow_from(proses_filling: ProsesProduksi) -> bool:
     # Cegah duplikasi (nomor_batch yang sama di ruangan Labelling)
     exists = ProsesProduksi.objects.filter(
         nomor_batch=proses_filling.nomor_batch,
-        ruangan=ruangan_lab,
+        ruangan_id=ruangan_lab.id,
     ).exists()
     if exists:
         return False
@@ -48,7 +76,7 @@ def ensure_labelling_shadow_from(proses_filling: ProsesProduksi) -> bool:
         # double-check di dalam transaksi
         if ProsesProduksi.objects.select_for_update().filter(
             nomor_batch=proses_filling.nomor_batch,
-            ruangan=ruangan_lab,
+            ruangan_id=ruangan_lab.id,
         ).exists():
             return False
 
@@ -57,7 +85,7 @@ def ensure_labelling_shadow_from(proses_filling: ProsesProduksi) -> bool:
             nama=getattr(proses_filling, "nama", None),
             jumlah=getattr(proses_filling, "jumlah", None),
             satuan=getattr(proses_filling, "satuan", None),
-            ruangan=ruangan_lab,
+            ruangan_id=ruangan_lab.id,
             status="Menunggu",
         )
 
@@ -70,6 +98,71 @@ def ensure_labelling_shadow_from(proses_filling: ProsesProduksi) -> bool:
         if default_op:
             obj.operator = default_op
 
+        obj._jenis_event = EventBatch.SHADOW  # dibaca jurnal saat post_save
         obj.save()
 
     return True
+
+
+def ensure_labelling_shadow_bulk(proses_list) -> int:
+    """
+    Versi massal dari ensure_labelling_shadow_from().
+    Dipakai oleh penjadwal auto-start: satu query cek duplikasi per ruangan
+    Labelling tujuan + satu bulk_create.
+    Return: jumlah shadow yang baru dibuat.
+    """
+    topo = topologi(*{p.ruangan_id for p in proses_list})
+
+    # Kelompokkan sumber Filling per ruangan Labelling tujuan
+    per_tujuan = {}
+    for p in proses_list:
+        if not topo.is_filling(p.ruangan_id):
+            continue
+        ruangan_lab = topo.ruangan_labelling_untuk(p.ruangan_id)
+        if ruangan_lab and ruangan_lab.id != p.ruangan_id:
+            per_tujuan.setdefault(ruangan_lab.id, []).append(p)
+    if not per_tujuan:
+        return 0
+
+    default_op = Operator.objects.filter(
+        Q(kategori__iexact="Labelling") | Q(kategori__icontains="label")
+    ).order_by("nama").first()
+
+    baru = []
+    with transaction.atomic():
+        for ruangan_lab_id, sumber in per_tujuan.items():
+            sudah_ada = set(
+                ProsesProduksi.objects.filter(
+                    ruangan_id=ruangan_lab_id,
+                    nomor_batch__in=[p.nomor_batch for p in sumber],
+                ).values_list("nomor_batch", flat=True)
+            )
+            for p in sumber:
+                if p.nomor_batch in sudah_ada:
+                    continue
+                sudah_ada.add(p.nomor_batch)
+                baru.append(ProsesProduksi(
+                    nomor_batch=p.nomor_batch,
+                    nama_id=p.nama_id,
+                    jumlah=p.jumlah,
+                    satuan=p.satuan,
+                    ruangan_id=ruangan_lab_id,
+                    status="Menunggu",
+                    estimasi_jumlah_kemasan=p.estimasi_jumlah_kemasan,
+                    satuan_kemasan=p.satuan_kemasan,
+                    operator=default_op,
+                ))
+
+        # bulk_create tidak memanggil save()/clean(); duplikasi sudah dicek di atas
+        ProsesProduksi.objects.bulk_create(baru, batch_size=500)
+
+        # bulk_create juga tidak memicu signal → jurnal & papan Labelling manual
+        if baru:
+            jurnal.catat_bulk(
+                EventBatch.SHADOW,
+                [(obj.pk, obj.nomor_batch, obj.ruangan_id) for obj in baru],
+                data={"status": "Menunggu"},
+            )
+            segarkan_ruangan({obj.ruangan_id for obj in baru})
+
+    return len(baru)
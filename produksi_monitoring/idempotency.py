@@ -0,0 +1,152 @@
+# produksi_monitoring/idempotency.py
+"""
+Idempotensi request (rid) dengan TTL.
+
+- Front cache LRU per proses: duplikat yang baru saja terlihat dijawab tanpa
+  menyentuh DB (tanpa write lock SQLite).
+- Sumber kebenaran tetap tabel IdempotencyKey (unik per key, antar-worker).
+- Baris lebih tua dari TTL dibersihkan bertahap: purge_kadaluarsa() /
+  command `purge_idempotency`.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.timezone import now
+
+from .models import IdempotencyKey
+
+TTL_DETIK = getattr(settings, "IDEMPOTENCY_TTL_DETIK", 60 * 60 * 24)
+KAPASITAS_CACHE = getattr(settings, "IDEMPOTENCY_CACHE_KAPASITAS", 10_000)
+
+
+class CacheIdempotensi:
+    def __init__(self, kapasitas=KAPASITAS_CACHE, ttl=TTL_DETIK):
+        self.kapasitas = kapasitas
+        self.ttl = ttl
+        self._data = OrderedDict()   # key → waktu terlihat (monotonic)
+        self._lock = threading.Lock()
+        self.hit = 0
+        self.miss = 0
+        self.eviksi = 0
+        self.kadaluarsa = 0
+
+    def _cek(self, key):
+        with self._lock:
+            waktu = self._data.get(key)
+            if waktu is None:
+                self.miss += 1
+                return False
+            if time.monotonic() - waktu > self.ttl:
+                del self._data[key]
+                self.kadaluarsa += 1
+                self.miss += 1
+                return False
+            self._data.move_to_end(key)
+            self.hit += 1
+            return True
+
+    def ingat(self, key):
+        with self._lock:
+            self._data[key] = time.monotonic()
+            self._data.move_to_end(key)
+            while len(self._data) > self.kapasitas:
+                self._data.popitem(last=False)
+                self.eviksi += 1
+
+    def klaim(self, key, action="labelling_update") -> bool:
+        """
+        True  → key baru, aksi boleh dijalankan
+        False → duplikat (dari cache atau DB)
+        Panggil di dalam transaction.atomic() aksi yang bersangkutan.
+        """
+        if self._cek(key):
+            return False
+
+        _, created = IdempotencyKey.objects.get_or_create(key=key, defaults={"action": action})
+        if created:
+            # hanya diingat bila transaksi aksi benar-benar commit
+            transaction.on_commit(lambda: self.ingat(key))
+        else:
+            self.ingat(key)
+        return created
+
+    def dikenal(self, key) -> bool:
+        """Sudah pernah diklaim? Hanya baca (cache lalu DB) → aman dipanggil sebelum transaksi tulis."""
+        return key in self.duplikat_dari([key])
+
+    def duplikat_dari(self, keys):
+        """Subset `keys` yang sudah pernah diklaim (cache dulu, sisanya satu query)."""
+        dup = {k for k in keys if self._cek(k)}
+        sisa = set(keys) - dup
+        if sisa:
+            dari_db = set(IdempotencyKey.objects.filter(key__in=sisa).values_list("key", flat=True))
+            for k in dari_db:
+                self.ingat(k)
+            dup |= dari_db
+        return dup
+
+    def simpan_bulk(self, keys, action):
+        """Tandai `keys` sudah diproses; panggil di dalam transaksi aksi."""
+        keys = list(keys)
+        if not keys:
+            return
+        IdempotencyKey.objects.bulk_create([IdempotencyKey(key=k, action=action) for k in keys], batch_size=500)
+
+        def ingat_semua():
+            for k in keys:
+                self.ingat(k)
+        transaction.on_commit(ingat_semua)
+
+    def statistik(self):
+        with self._lock:
+            total = self.hit + self.miss
+            return {
+                "ukuran": len(self._data),
+                "kapasitas": self.kapasitas,
+                "ttl_detik": self.ttl,
+                "hit": self.hit,
+                "miss": self.miss,
+                "hit_rate": round(self.hit / total, 4) if total else None,
+                "eviksi": self.eviksi,
+                "kadaluarsa": self.kadaluarsa,
+            }
+
+
+cache_idempotensi = CacheIdempotensi()
+
+
+def klaim(key, action="labelling_update") -> bool:
+    return cache_idempotensi.klaim(key, action)
+
+
+def dikenal(key) -> bool:
+    return cache_idempotensi.dikenal(key)
+
+
+def duplikat_dari(keys):
+    return cache_idempotensi.duplikat_dari(keys)
+
+
+def simpan_bulk(keys, action):
+    return cache_idempotensi.simpan_bulk(keys, action)
+
+
+def purge_kadaluarsa(ttl_detik=TTL_DETIK, chunk=1000, dry_run=False):
+    """Hapus IdempotencyKey yang lebih tua dari TTL per chunk (transaksi pendek). Return jumlah."""
+    batas = now() - timedelta(seconds=ttl_detik)
+    qs = IdempotencyKey.objects.filter(created_at__lt=batas)
+    if dry_run:
+        return qs.count()
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(qs.order_by("created_at").values_list("id", flat=True)[:chunk])
+            if not ids:
+                break
+            total += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
+    return total
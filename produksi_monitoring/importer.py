@@ -0,0 +1,210 @@
+# produksi_monitoring/importer.py
+"""
+Import Master Item (ItemDescription) dari Excel secara massal.
+
+Alur: baca sheet streaming (openpyxl read-only) → diff di memori terhadap
+ItemDescription yang ada (kunci: description & barcode, dibandingkan lewat
+hash per baris) → tulis dengan bulk_create / bulk_update per chunk, masing-
+masing dalam transaksi pendek agar writer SQLite tidak tertahan lama.
+"""
+import hashlib
+import time
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from . import katalog
+from .models import ItemDescription
+
+KOLOM_BARCODE = "Barcode"
+KOLOM_DESKRIPSI = "Item Description"
+CHUNK_DEFAULT = 500
+
+
+class FormatFileError(ValueError):
+    """Struktur file tidak sesuai (header tidak ditemukan, dsb.)."""
+
+
+@dataclass
+class HasilImport:
+    ditambah: int = 0
+    diperbarui: int = 0
+    tidak_berubah: int = 0
+    dilewati: int = 0
+    konflik: list = field(default_factory=list)
+    baca_ms: float = 0.0
+    diff_ms: float = 0.0
+    tulis_ms: float = 0.0
+
+    @property
+    def total_ms(self):
+        return self.baca_ms + self.diff_ms + self.tulis_ms
+
+
+def _teks(nilai):
+    """Normalisasi sel: angka barcode (int/float) → string tanpa '.0'."""
+    if nilai is None:
+        return None
+    if isinstance(nilai, float) and nilai.is_integer():
+        nilai = int(nilai)
+    teks = str(nilai).strip()
+    return teks or None
+
+
+def hash_baris(description, barcode):
+    return hashlib.blake2b(f"{description}\x1f{barcode or ''}".encode(), digest_size=8).digest()
+
+
+def baca_sheet(file_path):
+    """Generator (description, barcode) dari sheet pertama, tanpa memuat seluruh file."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [_teks(h) for h in next(rows, ())]
+        try:
+            i_desc = header.index(KOLOM_DESKRIPSI)
+            i_bc = header.index(KOLOM_BARCODE)
+        except ValueError:
+            raise FormatFileError(f"Header '{KOLOM_BARCODE}' / '{KOLOM_DESKRIPSI}' tidak ditemukan.")
+
+        for row in rows:
+            if len(row) <= max(i_desc, i_bc):
+                continue
+            yield _teks(row[i_desc]), _teks(row[i_bc])
+    finally:
+        wb.close()
+
+
+def _chunks(daftar, ukuran):
+    for i in range(0, len(daftar), ukuran):
+        yield daftar[i:i + ukuran]
+
+
+def _chunks_tukar(ubah, barcode_lama, ukuran):
+    """
+    Chunk item yang berubah tanpa memisahkan rantai tukar-barcode.
+
+    Item yang mengambil barcode lama item lain (A→B, tukar A↔B, rantai
+    A→B→C) digabung satu kelompok (union-find di memori); kelompok dikemas
+    utuh ke chunk, sehingga pengosongan + pengisian barcode satu chunk
+    tidak pernah bergantung pada chunk lain.
+    """
+    induk = list(range(len(ubah)))
+
+    def akar(i):
+        while induk[i] != i:
+            induk[i] = induk[induk[i]]
+            i = induk[i]
+        return i
+
+    pemegang = {barcode_lama[o.id]: i for i, o in enumerate(ubah) if barcode_lama[o.id]}
+    for i, o in enumerate(ubah):
+        j = pemegang.get(o.barcode)
+        if j is not None:
+            induk[akar(i)] = akar(j)
+
+    kelompok = {}
+    for i, o in enumerate(ubah):
+        kelompok.setdefault(akar(i), []).append(o)
+
+    potong = []
+    for anggota in kelompok.values():
+        if potong and len(potong) + len(anggota) > ukuran:
+            yield potong
+            potong = []
+        potong.extend(anggota)
+    if potong:
+        yield potong
+
+
+def import_item_descriptions(file_path, dry_run=False, chunk=CHUNK_DEFAULT) -> HasilImport:
+    hasil = HasilImport()
+
+    # --- 1. baca file (baris terakhir menang, sama seperti update_or_create berulang) ---
+    t0 = time.perf_counter()
+    target = {}
+    for description, barcode in baca_sheet(file_path):
+        if not description:
+            hasil.dilewati += 1
+            continue
+        target[description] = barcode
+    hasil.baca_ms = (time.perf_counter() - t0) * 1000
+
+    # --- 2. diff di memori ---
+    t0 = time.perf_counter()
+    ada = {
+        desc: (pk, bc, hash_baris(desc, bc))
+        for pk, desc, bc in ItemDescription.objects.values_list("id", "description", "barcode").iterator()
+    }
+    # Barcode yang pasti tetap di pemiliknya: item yang tidak disentuh file
+    # dan baris yang tidak berubah. Dikunci SEBELUM diff, agar baris lebih
+    # awal di file tidak bisa merebutnya (→ IntegrityError saat tulis).
+    terkunci = {bc: desc for desc, (_, bc, _) in ada.items() if bc and desc not in target}
+    berubah = []
+    for description, barcode in target.items():
+        lama = ada.get(description)
+        if lama and lama[2] == hash_baris(description, barcode):
+            hasil.tidak_berubah += 1
+            if barcode:
+                terkunci[barcode] = description
+        else:
+            berubah.append((description, barcode, lama))
+
+    # Item yang dilewati karena konflik tetap memegang barcode lamanya; bila
+    # barcode itu sudah diklaim baris sebelumnya, kunci dan ulangi diff.
+    while True:
+        pemilik_barcode = dict(terkunci)
+        baru, ubah, konflik = [], [], []
+        barcode_lama = {}
+        diulang = False
+        for description, barcode, lama in berubah:
+            if barcode and pemilik_barcode.get(barcode, description) != description:
+                # barcode unik: sudah dipakai item lain → lewati, jangan gagalkan seluruh import
+                konflik.append((description, barcode, pemilik_barcode[barcode]))
+                if lama and lama[1]:
+                    if pemilik_barcode.get(lama[1], description) != description:
+                        terkunci[lama[1]] = description
+                        diulang = True
+                        break
+                    pemilik_barcode[lama[1]] = description
+                continue
+            if barcode:
+                pemilik_barcode[barcode] = description
+
+            if lama:
+                ubah.append(ItemDescription(id=lama[0], description=description, barcode=barcode))
+                barcode_lama[lama[0]] = lama[1]
+            else:
+                baru.append(ItemDescription(description=description, barcode=barcode))
+        if not diulang:
+            break
+    hasil.dilewati += len(konflik)
+    hasil.konflik = konflik
+    hasil.diff_ms = (time.perf_counter() - t0) * 1000
+
+    hasil.ditambah = len(baru)
+    hasil.diperbarui = len(ubah)
+    if dry_run:
+        return hasil
+
+    # --- 3. tulis per chunk, transaksi pendek ---
+    t0 = time.perf_counter()
+    # Per chunk: kosongkan barcode lalu isi nilai baru dalam SATU transaksi,
+    # agar tukar-barcode tidak melanggar UNIQUE dan crash di tengah tidak
+    # meninggalkan item dengan barcode NULL. Rantai tukar tidak pernah
+    # terbelah antar chunk (_chunks_tukar).
+    for potong in _chunks_tukar(ubah, barcode_lama, chunk):
+        with transaction.atomic():
+            ItemDescription.objects.filter(id__in=[o.id for o in potong]).update(barcode=None)
+            ItemDescription.objects.bulk_update(potong, ["barcode"])
+    for potong in _chunks(baru, chunk):
+        with transaction.atomic():
+            ItemDescription.objects.bulk_create(potong)
+    # bulk_* tidak memicu signal → index katalog dibangun ulang manual
+    if baru or ubah:
+        katalog.invalidate()
+    hasil.tulis_ms = (time.perf_counter() - t0) * 1000
+
+    return hasil
@@ -0,0 +1,231 @@
+# produksi_monitoring/instrumentasi.py
+"""
+Instrumentasi ORM per request (opt-in: settings.INSTRUMENTASI_AKTIF).
+
+Per request dicatat: nama view, durasi total, jumlah query, waktu DB,
+fingerprint SQL yang berulang (indikasi N+1) dan waktu render template.
+Request di atas ambang ditulis ke log berputar (RotatingFileHandler).
+Agregat bergulir per view (jendela N request terakhir) disimpan per proses
+dan di-flush berkala ke cache bersama agar halaman admin bisa menggabungkan
+semua worker.
+
+Overhead dijaga kecil: satu execute_wrapper (perf_counter + increment dict
+per query), normalisasi SQL di-memo (lru_cache), tulis cache paling sering
+sekali per FLUSH_DETIK per proses. Saat nonaktif middleware melempar
+MiddlewareNotUsed → tidak ada overhead sama sekali.
+"""
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.timezone import now
+
+JENDELA = 200            # request terakhir per view yang disimpan
+FLUSH_DETIK = 10
+PREFIX_CACHE = "instrumentasi"
+TTL_CACHE = 60 * 60
+MAKS_FINGERPRINT_LOG = 5
+
+_state = contextvars.ContextVar("instrumentasi_request", default=None)
+
+_RE_IN = re.compile(r"\((?:%s|\?)(?:\s*,\s*(?:%s|\?))+\)")
+_RE_SPASI = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """SQL berparameter → bentuk kanonik (IN (%s, %s, ...) diringkas)."""
+    return _RE_SPASI.sub(" ", _RE_IN.sub("(...)", sql)).strip()
+
+
+class _StatRequest:
+    __slots__ = ("query", "db_detik", "sql", "template_detik")
+
+    def __init__(self):
+        self.query = 0
+        self.db_detik = 0.0
+        self.sql = Counter()
+        self.template_detik = 0.0
+
+
+def _pencatat_query(execute, sql, params, many, context):
+    stat = _state.get()
+    if stat is None:
+        return execute(sql, params, many, context)
+    t0 = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stat.db_detik += time.perf_counter() - t0
+        stat.query += 1
+        stat.sql[sql] += 1
+
+
+# --- waktu render template --------------------------------------------------
+# Django tidak punya hook waktu render di luar test; bungkus Template.render
+# milik backend (dipanggil render()/render_to_string(), bukan oleh {% include %})
+_template_dibungkus = False
+
+
+def _bungkus_template():
+    global _template_dibungkus
+    if _template_dibungkus:
+        return
+    from django.template.backends.django import Template
+
+    asli = Template.render
+
+    def render(self, *args, **kwargs):
+        stat = _state.get()
+        if stat is None:
+            return asli(self, *args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return asli(self, *args, **kwargs)
+        finally:
+            stat.template_detik += time.perf_counter() - t0
+
+    Template.render = render
+    _template_dibungkus = True
+
+
+# --- agregat bergulir per view ----------------------------------------------
+class AgregatView:
+    """Jendela (durasi_ms, db_ms, query) per view untuk satu proses."""
+
+    def __init__(self, jendela=JENDELA):
+        self._lock = threading.Lock()
+        self._data = {}
+        self._jendela = jendela
+        self._flush_terakhir = 0.0
+
+    def catat(self, view, durasi_ms, db_ms, query):
+        with self._lock:
+            dq = self._data.get(view)
+            if dq is None:
+                dq = self._data[view] = deque(maxlen=self._jendela)
+            dq.append((round(durasi_ms, 2), round(db_ms, 2), query))
+        if time.monotonic() - self._flush_terakhir >= FLUSH_DETIK:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {view: list(dq) for view, dq in self._data.items()}
+
+    def flush(self):
+        self._flush_terakhir = time.monotonic()
+        kunci = f"{PREFIX_CACHE}:proses:{os.getpid()}"
+        cache.set(kunci, self.snapshot(), TTL_CACHE)
+        daftar = cache.get(f"{PREFIX_CACHE}:daftar") or []
+        if kunci not in daftar:
+            cache.set(f"{PREFIX_CACHE}:daftar", (daftar + [kunci])[-64:], TTL_CACHE)
+
+
+agregat = AgregatView()
+
+
+def _persentil(data, p):
+    """Interpolasi linear (sama dengan numpy.percentile default); data tidak perlu urut."""
+    urut = sorted(data)
+    if not urut:
+        return None
+    posisi = (len(urut) - 1) * p / 100
+    bawah = int(posisi)
+    atas = min(bawah + 1, len(urut) - 1)
+    return urut[bawah] + (urut[atas] - urut[bawah]) * (posisi - bawah)
+
+
+def ringkasan_view():
+    """Gabungan agregat semua worker (dari cache) → list dict per view, terlambat dulu."""
+    agregat.flush()
+    gabung = {}
+    daftar = cache.get(f"{PREFIX_CACHE}:daftar") or []
+    for data in cache.get_many(daftar).values():
+        for view, baris in data.items():
+            gabung.setdefault(view, []).extend(baris)
+
+    hasil = []
+    for view, baris in gabung.items():
+        durasi = sorted(b[0] for b in baris)
+        hasil.append({
+            "view": view,
+            "n": len(baris),
+            "p50_ms": round(_persentil(durasi, 50), 2),
+            "p95_ms": round(_persentil(durasi, 95), 2),
+            "maks_ms": durasi[-1],
+            "rata2_db_ms": round(sum(b[1] for b in baris) / len(baris), 2),
+            "rata2_query": round(sum(b[2] for b in baris) / len(baris), 1),
+            "maks_query": max(b[2] for b in baris),
+        })
+    hasil.sort(key=lambda h: h["p95_ms"] or 0, reverse=True)
+    return hasil
+
+
+# --- log request lambat -----------------------------------------------------
+def _logger_lambat():
+    logger = logging.getLogger("produksi_monitoring.lambat")
+    if not logger.handlers:
+        path = settings.INSTRUMENTASI_LOG
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=5 * 1024 * 1024, backupCount=5, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+class InstrumentasiORMMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "INSTRUMENTASI_AKTIF", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.ambang_ms = getattr(settings, "INSTRUMENTASI_AMBANG_MS", 500)
+        self.logger = _logger_lambat()
+        _bungkus_template()
+
+    def __call__(self, request):
+        stat = _StatRequest()
+        token = _state.set(stat)
+        t0 = time.perf_counter()
+        try:
+            with connections["default"].execute_wrapper(_pencatat_query):
+                response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        durasi_ms = (time.perf_counter() - t0) * 1000
+
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name if match else None) or request.path
+        db_ms = stat.db_detik * 1000
+        agregat.catat(view, durasi_ms, db_ms, stat.query)
+
+        if durasi_ms >= self.ambang_ms:
+            duplikat = [
+                {"sql": fingerprint(sql)[:300], "kali": n}
+                for sql, n in stat.sql.most_common(MAKS_FINGERPRINT_LOG) if n > 1
+            ]
+            self.logger.info(json.dumps({
+                "waktu": now().isoformat(),
+                "view": view,
+                "method": request.method,
+                "path": request.get_full_path()[:500],
+                "status": response.status_code,
+                "durasi_ms": round(durasi_ms, 1),
+                "db_ms": round(db_ms, 1),
+                "template_ms": round(stat.template_detik * 1000, 1),
+                "query": stat.query,
+                "duplikat": duplikat,
+            }, ensure_ascii=False))
+        return response
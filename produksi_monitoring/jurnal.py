@@ -0,0 +1,208 @@
+# produksi_monitoring/jurnal.py
+"""
+Jurnal siklus hidup batch (EventBatch, append-only) + konsumen berkursor.
+
+Penulisan:
+- save() ProsesProduksi → post_save (signals.py) → event_dari_perubahan()
+  membandingkan snapshot _nilai_awal dengan nilai sekarang. save() membungkus
+  dirinya dalam atomic, jadi event ikut commit/rollback bersama perubahan.
+- Jalur massal (UPDATE/bulk_create tanpa signal: pindah massal, auto-start,
+  shadow Labelling) memanggil catat_bulk() di dalam transaksinya sendiri.
+
+Pembacaan: konsumen menyimpan posisi (EventBatch.id terakhir) di KursorEvent
+dan hanya membaca event dengan id > posisi. Di SQLite penulis selalu serial,
+sehingga id ter-commit berurutan dan kursor tidak pernah melompati event.
+Tiap konsumen MELIPAT event yang dibacanya di transaksi yang sama dengan
+pemajuan kursor:
+- rollup: RollupProduksi untuk pasangan hari+ruangan di event itu
+  (dibaca /api/grafik/produksi/)
+- analitik: ringkasan analitik harian per ruangan di cache (dibaca
+  /api/analitik/harian/ lewat analitik.analitik_harian)
+- push: meneruskan event ke papan ruangan sebagai pesan "event". Butuh
+  channel layer bersama (mis. channels_redis): dengan InMemoryChannelLayer
+  konsumen ini berjalan di proses lain dan tidak pernah sampai ke klien,
+  sehingga dilewati (lihat realtime.layer_bersama)
+"""
+import logging
+
+from django.utils import timezone
+
+from .konkurensi import transaksi_tulis
+from .models import EventBatch, KursorEvent
+
+logger = logging.getLogger(__name__)
+
+UKURAN_BACA = 500
+
+
+def _status_ke_jenis(status):
+    if status in ("Sedang Diproses", "Sedang diproses"):
+        return EventBatch.MULAI
+    if status.startswith("Selesai") or status == "Menunggu Verifikasi Admin":
+        return EventBatch.SELESAI
+    return EventBatch.STATUS
+
+
+def event_dari_perubahan(instance, awal, created):
+    """Daftar EventBatch (belum disimpan) untuk satu save() ProsesProduksi."""
+    dasar = {"nomor_batch": instance.nomor_batch, "proses_id": instance.pk, "ruangan_id": instance.ruangan_id}
+
+    if created or not awal:
+        jenis = getattr(instance, "_jenis_event", EventBatch.DIBUAT)
+        return [EventBatch(jenis=jenis, data={
+            "status": instance.status, "jumlah": instance.jumlah, "satuan": instance.satuan,
+        }, **dasar)]
+
+    events = []
+    ruangan_lama = awal.get("ruangan_id")
+    pindah = ruangan_lama is not None and ruangan_lama != instance.ruangan_id
+    if pindah:
+        # status ikut di-reset saat pindah → cukup satu event pindah
+        events.append(EventBatch(jenis=EventBatch.PINDAH, data={
+            "dari": ruangan_lama, "ke": instance.ruangan_id, "status": instance.status,
+        }, **dasar))
+    elif "status" in awal and awal["status"] != instance.status:
+        events.append(EventBatch(jenis=_status_ke_jenis(instance.status), data={
+            "dari": awal["status"], "ke": instance.status,
+        }, **dasar))
+
+    if "hasil_akhir" in awal and awal["hasil_akhir"] != instance.hasil_akhir:
+        jenis = {"Release": EventBatch.RELEASE, "Reject": EventBatch.REJECT}.get(instance.hasil_akhir)
+        if jenis:
+            events.append(EventBatch(jenis=jenis, **dasar))
+
+    progress = {}
+    for f in ("progress", "jumlah_kemasan"):
+        if f in awal and awal[f] != getattr(instance, f):
+            progress[f] = getattr(instance, f)
+            progress[f"{f}_delta"] = (getattr(instance, f) or 0) - (awal[f] or 0)
+    if progress and not pindah:
+        events.append(EventBatch(jenis=EventBatch.PROGRESS, data=progress, **dasar))
+
+    return events
+
+
+def catat(events):
+    if events:
+        EventBatch.objects.bulk_create(events)
+
+
+def catat_bulk(jenis, baris, data=None):
+    """
+    Catat satu event per baris untuk jalur massal.
+    `baris` = iterable (proses_id, nomor_batch, ruangan_id); `data` = dict
+    yang sama untuk semua, atau callable(baris) → dict.
+    """
+    events = []
+    for b in baris:
+        events.append(EventBatch(
+            jenis=jenis, proses_id=b[0], nomor_batch=b[1], ruangan_id=b[2],
+            data=data(b) if callable(data) else dict(data or {}),
+        ))
+    catat(events)
+
+
+def riwayat_batch(nomor_batch):
+    """Semua event satu batch, urut kejadian."""
+    return EventBatch.objects.filter(nomor_batch=nomor_batch).order_by("id")
+
+
+# --- konsumen berkursor -------------------------------------------------------
+def konsumsi(nama, handler, ukuran=UKURAN_BACA, maks_putaran=None):
+    """
+    Proses event baru untuk konsumen `nama` per potongan `ukuran`.
+    handler(list[EventBatch]) dipanggil dalam transaksi yang sama dengan
+    pemajuan kursor: bila handler gagal, kursor tidak maju (at-least-once).
+    Return jumlah event yang diproses.
+    """
+    total, putaran = 0, 0
+    while maks_putaran is None or putaran < maks_putaran:
+        putaran += 1
+        with transaksi_tulis():
+            kursor, _ = KursorEvent.objects.select_for_update().get_or_create(nama=nama)
+            events = list(EventBatch.objects.filter(id__gt=kursor.posisi).order_by("id")[:ukuran])
+            if not events:
+                break
+            handler(events)
+            kursor.posisi = events[-1].id
+            kursor.save(update_fields=["posisi", "diperbarui"])
+        total += len(events)
+    return total
+
+
+JENIS_RIWAYAT = (EventBatch.SELESAI, EventBatch.RELEASE, EventBatch.REJECT)
+JENIS_ANALITIK = (EventBatch.MULAI, EventBatch.SELESAI, EventBatch.RELEASE, EventBatch.REJECT)
+
+
+def _kunci_hari_ruangan(events):
+    """Pasangan (tanggal lokal, ruangan_id) yang disentuh event."""
+    return {(timezone.localtime(e.waktu).date(), e.ruangan_id) for e in events if e.ruangan_id}
+
+
+def _konsumen_rollup(events):
+    """
+    Lipat event selesai/release/reject → hitung ulang rollup HANYA untuk
+    (hari, ruangan) yang terdampak, di transaksi yang sama dengan kursor.
+    Hari diambil dari waktu_selesai riwayat batch tsb (bisa beda dari waktu
+    event, mis. hasil akhir dipilih esok hari), plus hari event itu sendiri.
+    """
+    from .arsip import gabungan
+    from .models import RiwayatProduksi
+    from .rollup import hitung_ulang_kunci
+
+    relevan = [e for e in events if e.jenis in JENIS_RIWAYAT]
+    if not relevan:
+        return
+    kunci = _kunci_hari_ruangan(relevan)
+    batch = {e.nomor_batch for e in relevan}
+    ruangan = {e.ruangan_id for e in relevan}
+    for ruangan_id, selesai in (
+        gabungan(RiwayatProduksi)
+        .filter(nomor_batch__in=batch, ruangan_id__in=ruangan)
+        .values_list("ruangan_id", "waktu_selesai")
+    ):
+        kunci.add((timezone.localtime(selesai).date(), ruangan_id))
+    hitung_ulang_kunci(kunci)
+
+
+def _konsumen_analitik(events):
+    """Hitung ulang ringkasan analitik harian hanya untuk (hari, ruangan) di event baru."""
+    from .analitik import hitung_harian
+
+    for tanggal, ruangan_id in sorted(_kunci_hari_ruangan(e for e in events if e.jenis in JENIS_ANALITIK)):
+        hitung_harian(tanggal, ruangan_id)
+
+
+def _konsumen_push(events):
+    """
+    Teruskan event ke papan ruangan (websocket) sebagai pesan "event" —
+    jalur susulan untuk tulis dari proses lain (perintah, penjadwal) yang
+    push on_commit-nya tidak sampai ke papan. Dikirim di dalam transaksi
+    kursor: bila commit gagal, event dikirim lagi (at-least-once) dan papan
+    membuang duplikat lewat id event.
+    """
+    from .realtime import kirim_event
+
+    kirim_event(events)
+
+
+KONSUMEN = {
+    "rollup": _konsumen_rollup,
+    "analitik": _konsumen_analitik,
+    "push": _konsumen_push,
+}
+
+
+def konsumen_aktif():
+    """Konsumen default: "push" hanya bila channel layer dipakai bersama antar proses."""
+    from .realtime import layer_bersama
+
+    return [nama for nama in KONSUMEN if nama != "push" or layer_bersama()]
+
+
+def jalankan_konsumen(nama_list=None, ukuran=UKURAN_BACA):
+    """Jalankan konsumen terdaftar (default: konsumen_aktif()); return {nama: jumlah event}."""
+    hasil = {}
+    for nama in nama_list or konsumen_aktif():
+        hasil[nama] = konsumsi(nama, KONSUMEN[nama], ukuran=ukuran)
+    return hasil
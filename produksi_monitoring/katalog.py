@@ -0,0 +1,180 @@
+# produksi_monitoring/katalog.py
+"""
+Index in-memory master item (ItemDescription) untuk scan barcode & autocomplete.
+
+- Barcode  : dict barcode → item (exact, O(1))
+- Deskripsi: daftar (token, item) terurut; kata kunci dicocokkan sebagai
+  PREFIX token lewat bisect, beberapa kata kunci di-intersect. Hanya bila
+  tidak ada hasil prefix, jatuh ke pencarian substring di memori (setara
+  icontains lama) — tetap tanpa query DB.
+
+Dibangun (1 query) saat pertama dipakai, seperti topology.py. Perubahan
+ItemDescription (signals.py, importer, data sintetis) memanggil invalidate():
+index lokal dibuang dan token versi di cache bersama diganti, sehingga worker
+lain ikut membangun ulang paling lambat CEK_VERSI_DETIK kemudian.
+"""
+import heapq
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+KUNCI_VERSI = "katalog_produk:versi"
+CEK_VERSI_DETIK = 2
+LIMIT_DEFAULT = 10
+
+_RE_TOKEN = re.compile(r"[0-9a-z]+")
+
+
+def _token(teks):
+    return _RE_TOKEN.findall((teks or "").lower())
+
+
+@dataclass(frozen=True)
+class Produk:
+    id: int
+    description: str
+    barcode: Optional[str]
+
+    def as_dict(self):
+        return {"id": self.id, "description": self.description, "barcode": self.barcode}
+
+
+class IndexProduk:
+    """
+    Produk disimpan terurut (panjang deskripsi, deskripsi) → indeks list =
+    peringkat relevansi statis, jadi top-N cukup heapq.nsmallest atas int.
+    """
+
+    def __init__(self, baris, versi=None):
+        self.versi = versi
+        self.produk = sorted(
+            (Produk(r[0], r[1], r[2]) for r in baris),
+            key=lambda p: (len(p.description), p.description.lower()),
+        )
+        self._lower = [p.description.lower() for p in self.produk]
+        self.per_barcode = {}
+        pasangan = []
+        for i, p in enumerate(self.produk):
+            if p.barcode:
+                self.per_barcode[p.barcode.strip().lower()] = i
+            for t in set(_token(p.description)):
+                pasangan.append((t, i))
+        pasangan.sort()
+        self._token = [t for t, _ in pasangan]
+        self._item = [i for _, i in pasangan]
+        # deskripsi utuh terurut → "diawali kata kunci" juga lewat bisect
+        urut = sorted(range(len(self._lower)), key=self._lower.__getitem__)
+        self._desc = [self._lower[i] for i in urut]
+        self._desc_item = urut
+
+    def __len__(self):
+        return len(self.produk)
+
+    def dari_barcode(self, kode) -> Optional[Produk]:
+        i = self.per_barcode.get((kode or "").strip().lower())
+        return self.produk[i] if i is not None else None
+
+    @staticmethod
+    def _rentang(kunci, awalan):
+        lo = bisect_left(kunci, awalan)
+        return lo, bisect_left(kunci, awalan + "\uffff", lo)
+
+    def _prefix_token(self, awalan):
+        lo, hi = self._rentang(self._token, awalan)
+        return set(self._item[lo:hi])
+
+    def cari_indeks(self, q, limit=LIMIT_DEFAULT):
+        """
+        Indeks produk terurut relevansi; limit=None → semua yang cocok.
+        Urutan: barcode persis, deskripsi diawali kata kunci (yang persis
+        otomatis paling pendek), lalu cocok prefix per token.
+        """
+        q_lower = (q or "").strip().lower()
+        kata = _token(q_lower)
+        if not kata:
+            return []
+
+        ambil = (lambda s: sorted(s)) if limit is None else (lambda s: heapq.nsmallest(limit, s))
+        hasil, sudah = [], set()
+
+        def tambah(daftar):
+            for i in daftar:
+                if i not in sudah:
+                    sudah.add(i)
+                    hasil.append(i)
+
+        barcode = self.per_barcode.get(q_lower)
+        if barcode is not None:
+            tambah([barcode])
+
+        lo, hi = self._rentang(self._desc, q_lower)
+        tambah(ambil(self._desc_item[lo:hi]))
+
+        # prefix per kata, intersect mulai dari himpunan terkecil
+        calon = sorted((self._prefix_token(k) for k in set(kata)), key=len)
+        cocok = calon[0]
+        for s in calon[1:]:
+            if not cocok:
+                break
+            cocok = cocok & s
+        if not cocok and not hasil:
+            cocok = {i for i, d in enumerate(self._lower) if q_lower in d}
+        tambah(ambil(cocok))
+
+        return hasil if limit is None else hasil[:limit]
+
+    def cari(self, q, limit=LIMIT_DEFAULT):
+        return [self.produk[i] for i in self.cari_indeks(q, limit)]
+
+
+_lock = threading.Lock()
+_index = None
+_cek_terakhir = 0.0
+
+
+def _versi_bersama():
+    return cache.get(KUNCI_VERSI)
+
+
+def index_produk() -> IndexProduk:
+    """Index aktif; dibangun ulang bila belum ada atau versi bersama berubah."""
+    global _index, _cek_terakhir
+    idx = _index
+    if idx is not None and time.monotonic() - _cek_terakhir < CEK_VERSI_DETIK:
+        return idx
+    versi = _versi_bersama()
+    with _lock:
+        _cek_terakhir = time.monotonic()
+        if _index is None or _index.versi != versi:
+            from .models import ItemDescription
+
+            baris = ItemDescription.objects.order_by("id").values_list("id", "description", "barcode")
+            _index = IndexProduk(list(baris), versi=versi)
+        return _index
+
+
+def cari(q, limit=LIMIT_DEFAULT):
+    return index_produk().cari(q, limit)
+
+
+def dari_barcode(kode):
+    return index_produk().dari_barcode(kode)
+
+
+def _naikkan_versi():
+    cache.set(KUNCI_VERSI, uuid.uuid4().hex, None)
+
+
+def invalidate():
+    """Buang index lokal; worker lain menyusul lewat versi bersama setelah commit."""
+    global _index
+    with _lock:
+        _index = None
+    transaction.on_commit(_naikkan_versi)
@@ -0,0 +1,66 @@
+# produksi_monitoring/konkurensi.py
+"""
+Tulis konkuren di SQLite: transaksi IMMEDIATE + retry terbatas dengan jitter.
+
+Banyak terminal operator menulis bersamaan (update_progress, labelling,
+tandai_sedang_diproses). Di SQLite hanya satu penulis pada satu waktu dan
+select_for_update tidak berlaku, sehingga:
+
+- transaksi_tulis() membuka transaksi dengan BEGIN IMMEDIATE (lihat backend
+  sqlite_produksi): kunci tulis diambil di awal, baca-ubah-tulis jadi serial.
+  Penulis lain menunggu di busy_timeout (OPTIONS["timeout"]).
+- retry_terkunci() mengulang seluruh fungsi bila tetap "database is locked"
+  (timeout habis), dengan backoff eksponensial + full jitter. Transaksi
+  yang gagal di-rollback (on_commit ikut batal), jadi aman diulang — asal
+  efek samping di luar database (pesan django.contrib.messages) baru dibuat
+  SETELAH transaksi selesai, bukan di dalamnya (lihat views._kirim_pesan).
+  Di dalam atomic luar tidak di-retry (transaksi luar sudah tidak valid),
+  error diteruskan.
+
+Di database selain SQLite keduanya setara transaction.atomic() biasa.
+"""
+import random
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+PERCOBAAN = 4
+JEDA_DASAR = 0.05   # detik
+JEDA_MAKS = 1.0
+
+
+def error_terkunci(exc):
+    return "locked" in str(exc).lower()
+
+
+@contextmanager
+def transaksi_tulis(using=None):
+    """transaction.atomic() yang di SQLite dibuka dengan BEGIN IMMEDIATE."""
+    conn = connections[using or DEFAULT_DB_ALIAS]
+    semula = getattr(conn, "begin_immediate", False)
+    conn.begin_immediate = True
+    try:
+        with transaction.atomic(using=using):
+            conn.begin_immediate = semula
+            yield
+    finally:
+        conn.begin_immediate = semula
+
+
+def retry_terkunci(percobaan=PERCOBAAN, jeda_dasar=JEDA_DASAR, jeda_maks=JEDA_MAKS, using=None):
+    """Decorator: ulangi fungsi saat OperationalError kunci SQLite."""
+    def dekorator(fungsi):
+        @wraps(fungsi)
+        def pembungkus(*args, **kwargs):
+            conn = connections[using or DEFAULT_DB_ALIAS]
+            for ke in range(percobaan):
+                try:
+                    return fungsi(*args, **kwargs)
+                except OperationalError as exc:
+                    if not error_terkunci(exc) or conn.in_atomic_block or ke == percobaan - 1:
+                        raise
+                    time.sleep(random.uniform(0, min(jeda_maks, jeda_dasar * (2 ** ke))))
+        return pembungkus
+    return dekorator
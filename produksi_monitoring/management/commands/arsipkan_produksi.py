@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from produksi_monitoring.arsip import arsipkan, UMUR_HARI
+
+class Command(BaseCommand):
+    help = "Pindahkan batch tertutup & riwayat lama ke tabel arsip (per potongan transaksi)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--umur-hari', type=int, default=UMUR_HARI, help=f"Arsipkan yang lebih tua dari N hari (default: settings.ARSIP_UMUR_HARI = {UMUR_HARI})")
+        parser.add_argument('--dry-run', action='store_true', help="Hanya hitung, tanpa memindahkan data")
+
+    def handle(self, *args, **options):
+        if options['umur_hari'] < 0:
+            raise CommandError("--umur-hari tidak boleh negatif")
+        hasil = arsipkan(
+            umur_hari=options['umur_hari'],
+            uji_coba=options['dry_run'],
+            log=lambda pesan: self.stdout.write(f"  {pesan}"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ {hasil}"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from produksi_monitoring.scheduler import jalankan_auto_start
+
+class Command(BaseCommand):
+    help = "Mulai otomatis batch 'Menunggu' yang waktu mulainya sudah lewat (semua ruangan, sekali jalan)"
+
+    def handle(self, *args, **options):
+        hasil = jalankan_auto_start()
+        if hasil.dipromosikan:
+            self.stdout.write(self.style.SUCCESS(f"✅ {hasil}"))
+        else:
+            self.stdout.write(self.style.WARNING(f"Tidak ada batch yang jatuh tempo ({hasil.durasi_ms:.1f} ms)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+from produksi_monitoring.pencarian import bangun_ulang
+
+class Command(BaseCommand):
+    help = "Muat awal / bangun ulang index pencarian FTS5 (batch, produk, riwayat)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ulang-skema', action='store_true', help="Drop & buat ulang tabel FTS beserta trigger-nya")
+
+    def handle(self, *args, **options):
+        jumlah = bangun_ulang(ulang_skema=options['ulang_skema'])
+        if jumlah is None:
+            raise CommandError("Database tidak mendukung FTS5 (bukan SQLite atau tanpa ENABLE_FTS5)")
+        self.stdout.write(self.style.SUCCESS(f"✅ Index pencarian dibangun: {jumlah} baris"))
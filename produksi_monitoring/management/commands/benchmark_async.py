@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from produksi_monitoring.benchmark import simpan_laporan
+from produksi_monitoring.benchmark_async import SKENARIO, jalankan_benchmark_async
+
+class Command(BaseCommand):
+    help = "Bandingkan view sync vs async di bawah ASGI: N klien kiosk polling bersamaan (throughput, p95/p99, thread)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--klien', type=int, default=200, help="Jumlah klien kiosk bersamaan")
+        parser.add_argument('--poll', type=int, default=5, help="Request per klien")
+        parser.add_argument('--jeda', type=float, default=0.0, help="Jeda antar poll per klien (detik)")
+        parser.add_argument('--skenario', default="", help=f"Pisahkan dengan koma: {', '.join(SKENARIO)} (default: semua)")
+        parser.add_argument('--output', default=None, help="Simpan laporan JSON ke path ini")
+
+    def handle(self, *args, **options):
+        skenario = [s.strip() for s in options['skenario'].split(",") if s.strip()] or list(SKENARIO)
+        tidak_dikenal = [s for s in skenario if s not in SKENARIO]
+        if tidak_dikenal:
+            raise CommandError(f"Skenario tidak dikenal: {', '.join(tidak_dikenal)}")
+
+        def log(nama, mode, h):
+            self.stdout.write(
+                f"  {nama:<20} {mode:<5} {h['throughput_rps']:>8.1f} req/s  p50 {h['p50_ms']:>8.1f}"
+                f"  p95 {h['p95_ms']:>8.1f}  p99 {h['p99_ms']:>8.1f} ms  thread {h['puncak_thread']:>4}"
+                f"  gagal {h['gagal']}"
+            )
+
+        laporan = jalankan_benchmark_async(
+            skenario, klien=options['klien'], poll=options['poll'], jeda=options['jeda'], log=log,
+        )
+        if options['output']:
+            simpan_laporan(laporan, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"✅ Laporan disimpan ke {options['output']}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("✅ Selesai"))
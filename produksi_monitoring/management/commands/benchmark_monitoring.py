@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from produksi_monitoring.benchmark import (
+    jalankan_benchmark, bandingkan, simpan_laporan, baca_laporan, daftar_skenario,
+)
+
+class Command(BaseCommand):
+    help = "Benchmark view monitoring (p50/p95/p99, jumlah query, puncak memori) → laporan JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterasi', type=int, default=30, help="Iterasi terukur per skenario")
+        parser.add_argument('--pemanasan', type=int, default=3, help="Iterasi pemanasan (tidak diukur)")
+        parser.add_argument('--skenario', default="", help="Nama skenario, pisahkan dengan koma (default: semua)")
+        parser.add_argument('--user', default=None, help="Username untuk login (default: superuser pertama)")
+        parser.add_argument('--output', default="benchmark.json", help="Path laporan JSON")
+        parser.add_argument('--banding', default=None, help="Laporan JSON sebelumnya untuk dibandingkan")
+        parser.add_argument('--ambang', type=float, default=10.0, help="Batas kenaikan p95 (persen) sebelum dianggap regresi")
+        parser.add_argument('--daftar', action='store_true', help="Tampilkan nama skenario lalu berhenti")
+
+    def handle(self, *args, **options):
+        if options['daftar']:
+            for sk in daftar_skenario():
+                self.stdout.write(sk.nama)
+            return
+
+        User = get_user_model()
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.filter(is_superuser=True).order_by("id").first()
+        if not user:
+            raise CommandError("User tidak ditemukan; buat superuser dulu atau pakai --user.")
+
+        hanya = {s.strip() for s in options['skenario'].split(",") if s.strip()} or None
+
+        def log(nama, h):
+            if "dilewati" in h:
+                self.stdout.write(self.style.WARNING(f"  {nama:<40} dilewati: {h['dilewati']}"))
+            else:
+                self.stdout.write(
+                    f"  {nama:<40} p50 {h['p50_ms']:>8.1f}  p95 {h['p95_ms']:>8.1f}  p99 {h['p99_ms']:>8.1f} ms"
+                    f"  {h['query']:>3} query  {h['puncak_memori_kb']:>8.0f} KB  [{h['status']}]"
+                )
+
+        laporan = jalankan_benchmark(
+            user, iterasi=options['iterasi'], pemanasan=options['pemanasan'], hanya=hanya, log=log,
+        )
+        simpan_laporan(laporan, options['output'])
+        self.stdout.write(self.style.SUCCESS(f"✅ Laporan disimpan ke {options['output']}"))
+
+        if options['banding']:
+            regresi = 0
+            for b in bandingkan(baca_laporan(options['banding']), laporan, options['ambang'] / 100):
+                baris = (
+                    f"  {b['nama']:<40} p95 {b['p95_lama']:>8.1f} → {b['p95_baru']:>8.1f} ms "
+                    f"({b['delta_persen']:+.1f}%)  query {b['query_lama']} → {b['query_baru']}"
+                )
+                if b['regresi']:
+                    regresi += 1
+                    self.stdout.write(self.style.ERROR(baris + "  ⚠️ regresi"))
+                else:
+                    self.stdout.write(baris)
+            if regresi:
+                raise CommandError(f"{regresi} skenario mengalami regresi.")
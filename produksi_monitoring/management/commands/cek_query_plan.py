@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from produksi_monitoring.query_plan import QUERY_PANAS, cek_semua
+
+class Command(BaseCommand):
+    help = "EXPLAIN QUERY PLAN untuk query panas; gagal bila ada full scan atau sort sementara (temp B-tree)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ruangan', type=int, default=None, help="ID ruangan untuk parameter query (default: ruangan pertama)")
+        parser.add_argument('--query', default="", help="Nama query, pisahkan dengan koma (default: semua)")
+        parser.add_argument('--sql', action='store_true', help="Tampilkan SQL tiap query")
+        parser.add_argument('--daftar', action='store_true', help="Tampilkan query terdaftar lalu berhenti")
+
+    def handle(self, *args, **options):
+        if options['daftar']:
+            for q in QUERY_PANAS:
+                self.stdout.write(f"{q.nama:<28} {q.keterangan}")
+            return
+
+        hanya = {s.strip() for s in options['query'].split(",") if s.strip()} or None
+        try:
+            hasil = cek_semua(options['ruangan'], hanya)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        gagal = 0
+        for h in hasil:
+            if h.lolos:
+                self.stdout.write(self.style.SUCCESS(f"  ✔ {h.nama}"))
+            else:
+                gagal += 1
+                self.stdout.write(self.style.ERROR(f"  ✘ {h.nama}"))
+            if options['sql']:
+                self.stdout.write(f"      {h.sql}")
+            for baris in h.plan:
+                self.stdout.write(f"      {baris}")
+
+        if gagal:
+            raise CommandError(f"{gagal} query panas tanpa index yang cocok.")
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(hasil)} query panas memakai index"))
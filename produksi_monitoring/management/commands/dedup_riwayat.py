@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from produksi_monitoring.riwayat import sisihkan_duplikat_riwayat
+
+class Command(BaseCommand):
+    help = "Sisihkan duplikat RiwayatProduksi (sisakan satu per batch + ruangan + waktu mulai) ke RiwayatProduksiDuplikat, bertahap per chunk"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk', type=int, default=500, help="Jumlah grup duplikat per transaksi")
+        parser.add_argument('--dry-run', action='store_true', help="Hanya hitung, tidak memindahkan")
+
+    def handle(self, *args, **options):
+        grup, baris = sisihkan_duplikat_riwayat(chunk=options['chunk'], dry_run=options['dry_run'])
+        if not grup:
+            self.stdout.write(self.style.WARNING('Tidak ada duplikat riwayat.'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'[dry-run] {baris} baris duplikat di {grup} grup akan disisihkan.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Berhasil menyisihkan {baris} baris duplikat di {grup} grup ke RiwayatProduksiDuplikat.'))
@@ -0,0 +1,50 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from produksi_monitoring.ekspor import (
+    EksporProduksi, FilterEksporError, FORMAT_CSV, FORMAT_XLSX, SUMBER_PROSES, SUMBER_RIWAYAT,
+)
+
+class Command(BaseCommand):
+    help = "Ekspor riwayat produksi / batch selesai ke CSV atau XLSX (streaming, memori tetap)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sumber', choices=[SUMBER_RIWAYAT, SUMBER_PROSES], default=SUMBER_RIWAYAT)
+        parser.add_argument('--format', choices=[FORMAT_CSV, FORMAT_XLSX], default=None, help="Default: dari ekstensi --output, selain itu csv")
+        parser.add_argument('--bulan', default=None, help="YYYY-MM (mengabaikan --dari/--sampai)")
+        parser.add_argument('--dari', default=None, help="Waktu selesai >= (YYYY-MM-DD / ISO-8601)")
+        parser.add_argument('--sampai', default=None, help="Waktu selesai < (YYYY-MM-DD / ISO-8601)")
+        parser.add_argument('--ruangan', default=None, help="Slug ruangan, pisahkan dengan koma")
+        parser.add_argument('--produk', default=None, help="ID produk, pisahkan dengan koma")
+        parser.add_argument('--hasil', default=None, help="Release,Reject")
+        parser.add_argument('--tanpa-arsip', dest='arsip', action='store_false', help="Hanya tabel hot (tanpa arsip)")
+        parser.add_argument('--output', default=None, help="Path file (default: nama otomatis; '-' = stdout untuk CSV)")
+
+    def handle(self, *args, **options):
+        output = options['output']
+        if not options['format'] and output and output.endswith(".xlsx"):
+            options['format'] = FORMAT_XLSX
+        try:
+            ekspor = EksporProduksi(options)
+        except FilterEksporError as e:
+            raise CommandError(str(e))
+        output = output or ekspor.nama_file
+
+        mulai = time.perf_counter()
+        if ekspor.format == FORMAT_XLSX:
+            if output == "-":
+                raise CommandError("XLSX tidak bisa ditulis ke stdout; pakai --output <file>.xlsx")
+            ekspor.tulis_xlsx(output)
+        else:
+            f = sys.stdout if output == "-" else open(output, "w", encoding="utf-8", newline="")
+            try:
+                for potongan in ekspor.stream_csv():
+                    f.write(potongan)
+            finally:
+                if f is not sys.stdout:
+                    f.close()
+        if output != "-":
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {ekspor.jumlah} baris diekspor ke {output} ({time.perf_counter() - mulai:.1f} detik)"
+            ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from produksi_monitoring.data_sintetis import generate, hapus_data_sintetis, PREFIX
+
+class Command(BaseCommand):
+    help = f"Membuat data sintetis (prefix '{PREFIX}') untuk uji beban: ruangan, produk, operator, proses & riwayat"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=1000, help="Jumlah ProsesProduksi (1.000 – 1.000.000)")
+        parser.add_argument('--produk', type=int, default=None, help="Jumlah ItemDescription (default: batch/100, min 50)")
+        parser.add_argument('--operator', type=int, default=30, help="Jumlah operator")
+        parser.add_argument('--jalur', type=int, default=2, help="Jalur paralel Proses→Filling→Labelling")
+        parser.add_argument('--hari', type=int, default=90, help="Sebaran waktu_dibuat (hari ke belakang)")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--hapus', action='store_true', help=f"Hapus data sintetis '{PREFIX}' yang ada lalu berhenti")
+
+    def handle(self, *args, **options):
+        if options['hapus']:
+            hapus_data_sintetis()
+            self.stdout.write(self.style.SUCCESS(f"✅ Data sintetis '{PREFIX}' dihapus."))
+            return
+
+        try:
+            hasil = generate(
+                batch=options['batch'],
+                produk=options['produk'],
+                operator=options['operator'],
+                jalur=options['jalur'],
+                hari=options['hari'],
+                seed=options['seed'],
+                log=self.stdout.write,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"✅ {hasil}"))
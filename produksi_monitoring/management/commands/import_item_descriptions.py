@@ -1,34 +1,35 @@
-import pandas as pd
-from django.core.management.base import BaseCommand
-from produksi_monitoring.models import ItemDescription
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from produksi_monitoring.importer import import_item_descriptions, FormatFileError, CHUNK_DEFAULT
 
 class Command(BaseCommand):
-    help = "Memperbarui Master Item dari file Excel"
+    help = "Memperbarui Master Item dari file Excel (massal, hanya baris yang berubah)"
 
     def add_arguments(self, parser):
         parser.add_argument('file_path', type=str, help="Path ke file Excel")
+        parser.add_argument('--dry-run', action='store_true', help="Hitung perubahan tanpa menulis ke database")
+        parser.add_argument('--chunk', type=int, default=CHUNK_DEFAULT, help="Ukuran batch bulk_create/bulk_update")
 
     def handle(self, *args, **options):
         file_path = options['file_path']
         self.stdout.write(f"📂 Membaca file: {file_path}")
 
         try:
-            df = pd.read_excel(file_path, dtype={"Barcode": str, "Item Description": str})
-            for _, row in df.iterrows():
-                barcode = row["Barcode"]
-                description = row["Item Description"]
-
-                item, created = ItemDescription.objects.update_or_create(
-                    description=description,  # Pastikan deskripsi unik
-                    defaults={"barcode": barcode}
-                )
-
-                if created:
-                    self.stdout.write(f"✅ Item baru ditambahkan: {description} ({barcode})")
-                else:
-                    self.stdout.write(f"♻️ Item diperbarui: {description} ({barcode})")
-
-            self.stdout.write("🎉 Update Master Item selesai!")
-
-        except Exception as e:
-            self.stderr.write(f"❌ Error saat memproses file: {e}")
+            hasil = import_item_descriptions(file_path, dry_run=options['dry_run'], chunk=options['chunk'])
+        except (FormatFileError, OSError) as e:
+            raise CommandError(f"❌ Error saat memproses file: {e}")
+        except IntegrityError as e:
+            raise CommandError(f"❌ Import dihentikan, data bentrok dengan database: {e}")
+
+        for description, barcode, pemilik in hasil.konflik:
+            self.stderr.write(f"⚠️ Dilewati: {description} — barcode {barcode} sudah dipakai '{pemilik}'")
+
+        prefix = "🔎 [dry-run] " if options['dry_run'] else "🎉 "
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Baru: {hasil.ditambah}, diperbarui: {hasil.diperbarui}, "
+            f"tidak berubah: {hasil.tidak_berubah}, dilewati: {hasil.dilewati}"
+        ))
+        self.stdout.write(
+            f"⏱️ baca {hasil.baca_ms:.0f} ms · diff {hasil.diff_ms:.0f} ms · "
+            f"tulis {hasil.tulis_ms:.0f} ms · total {hasil.total_ms:.0f} ms"
+        )
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from produksi_monitoring.jurnal import KONSUMEN, UKURAN_BACA, jalankan_konsumen
+from produksi_monitoring.realtime import layer_bersama
+
+class Command(BaseCommand):
+    help = "Proses EventBatch baru untuk konsumen berkursor (rollup, analitik, push); hanya event sejak kursor terakhir"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--konsumen', default="", help=f"Nama konsumen, pisahkan dengan koma (default: {', '.join(KONSUMEN)})")
+        parser.add_argument('--ukuran', type=int, default=UKURAN_BACA, help="Event per transaksi")
+        parser.add_argument('--loop', action='store_true', help="Jalan terus, cek event baru tiap --interval detik")
+        parser.add_argument('--interval', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        nama = [s.strip() for s in options['konsumen'].split(",") if s.strip()] or None
+        tidak_dikenal = set(nama or ()) - set(KONSUMEN)
+        if tidak_dikenal:
+            raise CommandError(f"Konsumen tidak dikenal: {', '.join(sorted(tidak_dikenal))}")
+        if nama and "push" in nama and not layer_bersama():
+            raise CommandError("Konsumen push butuh channel layer bersama (mis. channels_redis), bukan InMemoryChannelLayer")
+
+        while True:
+            hasil = jalankan_konsumen(nama, ukuran=options['ukuran'])
+            if any(hasil.values()) or not options['loop']:
+                ringkas = ", ".join(f"{k}: {v} event" for k, v in hasil.items())
+                self.stdout.write(self.style.SUCCESS(f"✅ {ringkas}"))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,33 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import localtime, now
+from produksi_monitoring.scheduler import CEK_DETIK, PenjadwalAutoStart
+
+class Command(BaseCommand):
+    help = "Daemon auto-start: tidur sampai waktu mulai terjadwal berikutnya lalu mulai semua batch jatuh tempo (semua ruangan)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cek', type=float, default=CEK_DETIK, help="Interval (detik) cek perubahan jadwal dari proses lain")
+
+    def handle(self, *args, **options):
+        if options['cek'] <= 0:
+            raise CommandError("--cek harus lebih dari 0")
+
+        penjadwal = PenjadwalAutoStart(
+            cek_detik=options['cek'],
+            log=lambda pesan: self.stdout.write(f"[{localtime(now()):%Y-%m-%d %H:%M:%S}] {pesan}"),
+        )
+
+        def berhenti(signum, frame):
+            self.stdout.write(f"Sinyal {signal.Signals(signum).name} diterima, berhenti...")
+            penjadwal.berhenti.set()
+
+        signal.signal(signal.SIGTERM, berhenti)
+        signal.signal(signal.SIGINT, berhenti)
+
+        self.stdout.write(self.style.SUCCESS("✅ Penjadwal auto-start berjalan (SIGTERM / Ctrl+C untuk berhenti)"))
+        penjadwal.jalankan()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Penjadwal berhenti: {penjadwal.siklus} siklus, {penjadwal.total_dipromosikan} batch dimulai"
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from produksi_monitoring.idempotency import purge_kadaluarsa, TTL_DETIK
+
+class Command(BaseCommand):
+    help = "Menghapus IdempotencyKey yang sudah melewati TTL (bertahap per chunk)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl-jam', type=float, default=TTL_DETIK / 3600, help="Umur maksimum key (jam)")
+        parser.add_argument('--chunk', type=int, default=1000, help="Jumlah baris per transaksi hapus")
+        parser.add_argument('--dry-run', action='store_true', help="Hanya hitung, tidak menghapus")
+
+    def handle(self, *args, **options):
+        total = purge_kadaluarsa(
+            ttl_detik=int(options['ttl_jam'] * 3600),
+            chunk=options['chunk'],
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"[dry-run] {total} key kadaluarsa akan dihapus."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Berhasil menghapus {total} key kadaluarsa."))
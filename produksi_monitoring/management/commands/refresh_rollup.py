@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from produksi_monitoring.rollup import refresh_rollup
+
+class Command(BaseCommand):
+    help = "Perbarui rollup produksi per jam/hari dari RiwayatProduksi (inkremental, berbasis watermark)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--penuh', action='store_true', help="Hitung ulang seluruh riwayat (mis. setelah riwayat dihapus)")
+
+    def handle(self, *args, **options):
+        hasil = refresh_rollup(penuh=options['penuh'])
+        self.stdout.write(self.style.SUCCESS(f"✅ {hasil}"))
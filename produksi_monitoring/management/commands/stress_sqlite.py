@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from produksi_monitoring.stress_sqlite import MODE, jalankan_mode
+
+class Command(BaseCommand):
+    help = "Uji tekanan tulis konkuren SQLite: mode bawaan vs mode produksi (WAL + BEGIN IMMEDIATE + retry)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--thread', type=int, default=8, help="Jumlah thread penulis")
+        parser.add_argument('--operasi', type=int, default=200, help="Transaksi per thread")
+        parser.add_argument('--kerja-ms', type=float, default=1.0, help="Jeda kerja di dalam transaksi (ms)")
+        parser.add_argument('--mode', choices=[*MODE, 'semua'], default='semua')
+
+    def handle(self, *args, **options):
+        daftar_mode = list(MODE) if options['mode'] == 'semua' else [options['mode']]
+        hasil = {}
+        for mode in daftar_mode:
+            hasil[mode] = jalankan_mode(
+                mode, thread=options['thread'], operasi=options['operasi'], kerja_ms=options['kerja_ms'],
+            )
+            self.stdout.write(f"  {hasil[mode]}")
+
+        if len(hasil) == 2 and hasil["bawaan"].throughput:
+            rasio = hasil["produksi"].throughput / hasil["bawaan"].throughput
+            self.stdout.write(self.style.SUCCESS(f"✅ Throughput produksi {rasio:.2f}× mode bawaan"))
+        else:
+            self.stdout.write(self.style.SUCCESS("✅ Selesai"))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.18 on 2026-10-18 11:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produksi_monitoring', '0050_alter_prosesproduksi_nomor_batch'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='prosesproduksi',
+            index=models.Index(fields=['waktu_dibuat', 'id'], name='proses_waktu_dibuat_id_idx'),
+        ),
+    ]
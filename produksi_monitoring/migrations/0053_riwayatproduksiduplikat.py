@@ -0,0 +1,97 @@
+# Generated by Django 4.2.18 on 2026-10-18 11:52
+
+from django.db import migrations, models, transaction
+import django.utils.timezone
+
+# Kolom riwayat yang dipindah ke tabel duplikat (dan dikembalikan saat dibalik)
+KOLOM = (
+    "id", "nomor_batch", "nama_produk_id", "jumlah", "satuan", "ruangan_id", "operator_id",
+    "waktu_mulai_produksi", "waktu_selesai", "hasil_akhir",
+)
+# Baris duplikat yang dipindah per transaksi
+CHUNK = 500
+
+
+def sisihkan_duplikat(apps, schema_editor):
+    # Baris ganda (batch + ruangan + waktu mulai sama, bukan id terbesar)
+    # DIPINDAH ke tabel duplikat per potongan id, tiap potongan transaksi
+    # sendiri (migration ini atomic = False) → tidak ada kunci tulis panjang
+    # walau riwayatnya bertahun-tahun. SQL sendiri atas tabel historis, tidak
+    # mengimpor kode app (`dedup_riwayat` punya versinya sendiri di riwayat.py).
+    # Constraint unik menyusul di 0059.
+    riwayat = apps.get_model('produksi_monitoring', 'RiwayatProduksi')._meta.db_table
+    duplikat = apps.get_model('produksi_monitoring', 'RiwayatProduksiDuplikat')._meta.db_table
+    koneksi = schema_editor.connection
+    kolom = ", ".join(KOLOM)
+    pilih_id = f"""
+        SELECT r.id FROM {riwayat} r
+        JOIN (
+            SELECT nomor_batch, ruangan_id, waktu_mulai_produksi, MAX(id) AS simpan
+            FROM {riwayat}
+            GROUP BY nomor_batch, ruangan_id, waktu_mulai_produksi
+            HAVING COUNT(*) > 1
+        ) g ON r.nomor_batch = g.nomor_batch
+            AND r.ruangan_id = g.ruangan_id
+            AND r.waktu_mulai_produksi = g.waktu_mulai_produksi
+        WHERE r.id <> g.simpan
+        ORDER BY r.id
+        LIMIT %s
+    """
+    waktu = koneksi.ops.adapt_datetimefield_value(django.utils.timezone.now())
+    while True:
+        with transaction.atomic(using=koneksi.alias):
+            with koneksi.cursor() as c:
+                c.execute(pilih_id, [CHUNK])
+                ids = [baris[0] for baris in c.fetchall()]
+                if not ids:
+                    break
+                isian = ", ".join(["%s"] * len(ids))
+                c.execute(
+                    f"INSERT INTO {duplikat} ({kolom}, disisihkan_pada) "
+                    f"SELECT {kolom}, %s FROM {riwayat} WHERE id IN ({isian})",
+                    [waktu, *ids],
+                )
+                c.execute(f"DELETE FROM {riwayat} WHERE id IN ({isian})", ids)
+
+
+def kembalikan_duplikat(apps, schema_editor):
+    riwayat = apps.get_model('produksi_monitoring', 'RiwayatProduksi')._meta.db_table
+    duplikat = apps.get_model('produksi_monitoring', 'RiwayatProduksiDuplikat')._meta.db_table
+    kolom = ", ".join(KOLOM)
+    with schema_editor.connection.cursor() as c:
+        c.execute(f"INSERT INTO {riwayat} ({kolom}) SELECT {kolom} FROM {duplikat}")
+        c.execute(f"DELETE FROM {duplikat}")
+
+
+class Migration(migrations.Migration):
+
+    # dedup per potongan harus commit per potongan, bukan satu transaksi besar
+    atomic = False
+
+    dependencies = [
+        ('produksi_monitoring', '0052_idempotencykey_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RiwayatProduksiDuplikat',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('nomor_batch', models.CharField(db_index=True, max_length=20)),
+                ('nama_produk_id', models.BigIntegerField()),
+                ('jumlah', models.PositiveIntegerField()),
+                ('satuan', models.CharField(max_length=10)),
+                ('ruangan_id', models.BigIntegerField()),
+                ('operator_id', models.BigIntegerField(blank=True, null=True)),
+                ('waktu_mulai_produksi', models.DateTimeField()),
+                ('waktu_selesai', models.DateTimeField()),
+                ('hasil_akhir', models.CharField(blank=True, max_length=20, null=True)),
+                ('disisihkan_pada', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Riwayat Produksi Duplikat',
+                'verbose_name_plural': 'Riwayat Produksi Duplikat',
+            },
+        ),
+        migrations.RunPython(sisihkan_duplikat, kembalikan_duplikat),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.18 on 2026-10-18 11:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produksi_monitoring', '0053_riwayatproduksiduplikat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Watermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nama', models.CharField(max_length=50, unique=True)),
+                ('nilai', models.DateTimeField(blank=True, null=True)),
+                ('diperbarui', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='riwayatproduksi',
+            name='diperbarui_pada',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='RollupProduksi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periode', models.CharField(choices=[('jam', 'Per Jam'), ('hari', 'Per Hari')], max_length=4)),
+                ('awal', models.DateTimeField()),
+                ('satuan', models.CharField(max_length=10)),
+                ('jumlah', models.PositiveBigIntegerField(default=0)),
+                ('jumlah_batch', models.PositiveIntegerField(default=0)),
+                ('jumlah_release', models.PositiveIntegerField(default=0)),
+                ('jumlah_reject', models.PositiveIntegerField(default=0)),
+                ('nama_produk', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='produksi_monitoring.itemdescription')),
+                ('ruangan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='produksi_monitoring.ruangan')),
+            ],
+            options={
+                'verbose_name': 'Rollup Produksi',
+                'verbose_name_plural': 'Rollup Produksi',
+                'indexes': [models.Index(fields=['periode', 'awal'], name='rollup_periode_awal_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='rollupproduksi',
+            constraint=models.UniqueConstraint(fields=('periode', 'awal', 'ruangan', 'nama_produk', 'satuan'), name='uniq_rollup_bucket'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.18 on 2026-10-18 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produksi_monitoring', '0054_rollup_produksi'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='prosesproduksi',
+            index=models.Index(fields=['ruangan', 'status', 'waktu_mulai_produksi'], name='proses_ruang_stat_mulai_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prosesproduksi',
+            index=models.Index(fields=['ruangan', 'status', 'waktu_selesai'], name='proses_ruang_stat_selesai_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prosesproduksi',
+            index=models.Index(fields=['status', 'waktu_mulai_produksi'], name='proses_status_mulai_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='riwayatproduksi',
+            index=models.Index(fields=['ruangan', 'waktu_selesai'], name='riwayat_ruang_selesai_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.18 on 2026-10-18 12:10
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produksi_monitoring', '0055_index_query_panas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KursorEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nama', models.CharField(max_length=50, unique=True)),
+                ('posisi', models.BigIntegerField(default=0)),
+                ('diperbarui', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EventBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jenis', models.CharField(choices=[('dibuat', 'Dibuat'), ('shadow', 'Shadow Labelling dibuat'), ('mulai', 'Mulai diproses'), ('progress', 'Progress'), ('selesai', 'Selesai'), ('status', 'Status berubah'), ('pindah', 'Pindah ruangan'), ('release', 'Release'), ('reject', 'Reject')], max_length=10)),
+                ('nomor_batch', models.CharField(max_length=20)),
+                ('proses_id', models.BigIntegerField(blank=True, null=True)),
+                ('ruangan_id', models.BigIntegerField(blank=True, null=True)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('waktu', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Event Batch',
+                'verbose_name_plural': 'Event Batch',
+                'indexes': [models.Index(fields=['nomor_batch', 'id'], name='event_batch_nomor_id_idx')],
+            },
+        ),
+    ]
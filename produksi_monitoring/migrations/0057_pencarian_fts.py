@@ -0,0 +1,31 @@
+# Generated by Django 4.2.18 on 2026-10-18 14:05
+
+from django.db import migrations
+
+
+def buat_indeks(apps, schema_editor):
+    """Tabel FTS5 (pencarian.py) dibuat & diisi dari tabel sumber yang sudah ada."""
+    from produksi_monitoring import pencarian
+
+    conn = schema_editor.connection
+    # trigger dipasang post_migrate, bukan di sini: trigger-nya memblok ALTER
+    # tabel sumber oleh migration berikutnya dalam rencana yang sama
+    if pencarian.pasang(conn, trigger=False):
+        pencarian.isi(conn)
+
+
+def hapus_indeks(apps, schema_editor):
+    from produksi_monitoring import pencarian
+
+    pencarian.lepas(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produksi_monitoring', '0056_jurnal_event_batch'),
+    ]
+
+    operations = [
+        migrations.RunPython(buat_indeks, hapus_indeks),
+    ]
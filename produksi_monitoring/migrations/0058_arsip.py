@@ -0,0 +1,64 @@
+# Generated by Django 4.2.18 on 2026-10-18 12:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produksi_monitoring', '0057_pencarian_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArsipRiwayatProduksi',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('nomor_batch', models.CharField(db_index=True, max_length=20)),
+                ('jumlah', models.PositiveIntegerField()),
+                ('satuan', models.CharField(max_length=10)),
+                ('waktu_mulai_produksi', models.DateTimeField()),
+                ('waktu_selesai', models.DateTimeField()),
+                ('hasil_akhir', models.CharField(blank=True, max_length=20, null=True)),
+                ('diperbarui_pada', models.DateTimeField()),
+                ('diarsipkan_pada', models.DateTimeField(default=django.utils.timezone.now)),
+                ('nama_produk', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='produksi_monitoring.itemdescription')),
+                ('operator', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='produksi_monitoring.operator')),
+                ('ruangan', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='produksi_monitoring.ruangan')),
+            ],
+            options={
+                'verbose_name': 'Arsip Riwayat Produksi',
+                'verbose_name_plural': 'Arsip Riwayat Produksi',
+                'indexes': [models.Index(fields=['ruangan', 'waktu_selesai'], name='arsip_riwayat_ruang_sel_idx'), models.Index(fields=['waktu_selesai'], name='arsip_riwayat_selesai_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArsipProsesProduksi',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(max_length=30)),
+                ('hasil_akhir', models.CharField(blank=True, max_length=10)),
+                ('nomor_batch', models.CharField(db_index=True, max_length=20)),
+                ('jumlah', models.PositiveIntegerField()),
+                ('satuan', models.CharField(max_length=10)),
+                ('estimasi_jumlah_kemasan', models.PositiveIntegerField(blank=True, null=True)),
+                ('jumlah_kemasan', models.PositiveIntegerField(blank=True, null=True)),
+                ('satuan_kemasan', models.CharField(blank=True, max_length=10, null=True)),
+                ('waktu_dibuat', models.DateTimeField()),
+                ('waktu_mulai_produksi', models.DateTimeField(blank=True, null=True)),
+                ('waktu_selesai', models.DateTimeField(blank=True, null=True)),
+                ('progress', models.PositiveIntegerField(default=0)),
+                ('diarsipkan_pada', models.DateTimeField(default=django.utils.timezone.now)),
+                ('nama', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='produksi_monitoring.itemdescription')),
+                ('operator', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='produksi_monitoring.operator')),
+                ('ruangan', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='produksi_monitoring.ruangan')),
+            ],
+            options={
+                'verbose_name': 'Arsip Proses Produksi',
+                'verbose_name_plural': 'Arsip Proses Produksi',
+                'indexes': [models.Index(fields=['waktu_selesai'], name='arsip_proses_selesai_idx')],
+            },
+        ),
+    ]
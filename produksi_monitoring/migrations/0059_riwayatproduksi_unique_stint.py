@@ -0,0 +1,38 @@
+# Generated by Django 4.2.18 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+def cek_duplikat(apps, schema_editor):
+    # Constraint unik butuh riwayat tanpa duplikat stint. 0053 sudah
+    # menyisihkannya; bila masih ada (mis. ditulis di antara keduanya),
+    # jalankan dulu `python manage.py dedup_riwayat` (bertahap per chunk)
+    # lalu ulangi migrate — bukan dedup besar di dalam transaksi ini.
+    RiwayatProduksi = apps.get_model('produksi_monitoring', 'RiwayatProduksi')
+    sisa = (
+        RiwayatProduksi.objects.values('nomor_batch', 'ruangan_id', 'waktu_mulai_produksi')
+        .annotate(n=models.Count('id'))
+        .filter(n__gt=1)
+        .order_by()
+        .count()
+    )
+    if sisa:
+        raise RuntimeError(
+            f"{sisa} grup duplikat RiwayatProduksi masih ada; "
+            "jalankan `python manage.py dedup_riwayat` lalu ulangi migrate."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produksi_monitoring', '0058_arsip'),
+    ]
+
+    operations = [
+        migrations.RunPython(cek_duplikat, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='riwayatproduksi',
+            constraint=models.UniqueConstraint(fields=('nomor_batch', 'ruangan', 'waktu_mulai_produksi'), name='uniq_riwayat_batch_ruangan_mulai'),
+        ),
+    ]
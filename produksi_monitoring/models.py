@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils.timezone import now
 from django.core.exceptions import ValidationError
 from django.utils.text import slugify
 
+from .topology import topologi
+
 class Mesin(models.Model):
     kode_mesin = models.CharField(max_length=10, unique=True, null=True)
     nama_mesin = models.CharField(max_length=200, unique=True)
@@ -110,6 +112,22 @@ class ProsesProduksi(models.Model):
     def __str__(self):
     
         return f"{self.nomor_batch} - {self.nama.description}"
+
+    # Field yang dipantau untuk diff realtime (lihat signals.py)
+    FIELD_DIPANTAU = (
+        "status", "hasil_akhir", "nomor_batch", "jumlah", "satuan", "progress",
+        "estimasi_jumlah_kemasan", "jumlah_kemasan", "satuan_kemasan",
+        "ruangan_id", "operator_id", "waktu_mulai_produksi", "waktu_selesai",
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Snapshot nilai awal → dipakai untuk menghitung perubahan saat save()
+        instance._nilai_awal = {
+            f: instance.__dict__.get(f) for f in cls.FIELD_DIPANTAU if f in instance.__dict__
+        }
+        return instance
     
     @property
     def progress_percentage(self):
@@ -131,7 +149,7 @@ class ProsesProduksi(models.Model):
         # Validasi khusus saat Labelling menandai selesai
         if (
             self.status == "Selesai Produksi"
-            and (self.ruangan and (self.ruangan.nama or "").lower().__contains__("labell"))
+            and topologi(self.ruangan_id).is_labelling(self.ruangan_id)
             and (not self.jumlah_kemasan or not self.satuan_kemasan)
         ):
             raise ValidationError("Jumlah kemasan dan satuan kemasan harus diisi di ruangan Labelling.")
@@ -143,10 +161,12 @@ class ProsesProduksi(models.Model):
         if self.status == "Sedang diproses" and not self.waktu_mulai_produksi:
             self.waktu_mulai_produksi = now()
 
-        super().save(*args, **kwargs)
+        # post_save menulis EventBatch (signals.py) → harus satu transaksi dengan UPDATE ini
+        with transaction.atomic(using=kwargs.get("using"), savepoint=False):
+            super().save(*args, **kwargs)
 
     def is_labelling(self):
-        return self.ruangan.nama.lower() == "labelling"
+        return topologi(self.ruangan_id).is_labelling(self.ruangan_id)
 
     @property
     def progress_display(self):
@@ -173,6 +193,15 @@ class ProsesProduksi(models.Model):
         verbose_name = "Proses Produksi"
         verbose_name_plural = "Proses Produksi"
         ordering = ("-waktu_dibuat",)
+        indexes = [
+            # keyset pagination feed status (feed.py)
+            models.Index(fields=["waktu_dibuat", "id"], name="proses_waktu_dibuat_id_idx"),
+            # papan ruangan: filter (ruangan, status) + urut waktu → tanpa sort sementara
+            models.Index(fields=["ruangan", "status", "waktu_mulai_produksi"], name="proses_ruang_stat_mulai_idx"),
+            models.Index(fields=["ruangan", "status", "waktu_selesai"], name="proses_ruang_stat_selesai_idx"),
+            # auto-start: status='Menunggu' AND waktu_mulai_produksi <= now (scheduler.py)
+            models.Index(fields=["status", "waktu_mulai_produksi"], name="proses_status_mulai_idx"),
+        ]
 
 class RiwayatProduksi(models.Model):
     nomor_batch = models.CharField(max_length=20)
@@ -184,15 +213,58 @@ class RiwayatProduksi(models.Model):
     waktu_mulai_produksi = models.DateTimeField()
     waktu_selesai = models.DateTimeField()
     hasil_akhir = models.CharField(max_length=20, blank=True, null=True)
+    # Ikut di-set saat upsert (riwayat.py) → watermark refresh rollup
+    diperbarui_pada = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"Riwayat: {self.nomor_batch} di {self.ruangan.nama}"
 
+    class Meta:
+        constraints = [
+            # satu riwayat per batch per ruangan per stint (waktu mulai) → kunci
+            # upsert (riwayat.py); batch yang kembali ke ruangan yang sama
+            # (rework / reject diproses ulang) mendapat baris baru
+            models.UniqueConstraint(
+                fields=['nomor_batch', 'ruangan', 'waktu_mulai_produksi'],
+                name='uniq_riwayat_batch_ruangan_mulai',
+            ),
+        ]
+        indexes = [
+            # riwayat papan ruangan: filter ruangan + ORDER BY -waktu_selesai
+            models.Index(fields=["ruangan", "waktu_selesai"], name="riwayat_ruang_selesai_idx"),
+        ]
+
+
+class RiwayatProduksiDuplikat(models.Model):
+    """
+    Baris RiwayatProduksi ganda (stint sama) yang disisihkan saat dedup —
+    tidak dihapus, bisa diperiksa / dikembalikan. `id` = id asli riwayat;
+    kolom relasi sengaja bukan FK (seperti EventBatch).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    nomor_batch = models.CharField(max_length=20, db_index=True)
+    nama_produk_id = models.BigIntegerField()
+    jumlah = models.PositiveIntegerField()
+    satuan = models.CharField(max_length=10)
+    ruangan_id = models.BigIntegerField()
+    operator_id = models.BigIntegerField(null=True, blank=True)
+    waktu_mulai_produksi = models.DateTimeField()
+    waktu_selesai = models.DateTimeField()
+    hasil_akhir = models.CharField(max_length=20, blank=True, null=True)
+    disisihkan_pada = models.DateTimeField(default=now)
+
+    class Meta:
+        verbose_name = "Riwayat Produksi Duplikat"
+        verbose_name_plural = "Riwayat Produksi Duplikat"
+
+    def __str__(self):
+        return f"Duplikat riwayat #{self.id}: {self.nomor_batch}"
+
 
 class IdempotencyKey(models.Model):
     key = models.CharField(max_length=64, unique=True, db_index=True)
     action = models.CharField(max_length=50, default="labelling_update")  # jenis aksi, bisa disesuaikan
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)  # dipakai purge TTL
 
     class Meta:
         verbose_name = "Idempotency Key"
@@ -200,3 +272,176 @@ class IdempotencyKey(models.Model):
 
     def __str__(self):
         return f"{self.action}:{self.key[:8]}"
+
+
+class RollupProduksi(models.Model):
+    """
+    Agregat RiwayatProduksi per jam / per hari, per ruangan & produk.
+    Diisi oleh rollup.refresh_rollup() — jangan diedit manual.
+    """
+    PERIODE_JAM = "jam"
+    PERIODE_HARI = "hari"
+    PERIODE_CHOICES = [
+        (PERIODE_JAM, "Per Jam"),
+        (PERIODE_HARI, "Per Hari"),
+    ]
+
+    periode = models.CharField(max_length=4, choices=PERIODE_CHOICES)
+    awal = models.DateTimeField()  # awal jam/hari (zona waktu lokal)
+    ruangan = models.ForeignKey(Ruangan, on_delete=models.CASCADE)
+    nama_produk = models.ForeignKey(ItemDescription, on_delete=models.CASCADE)
+    satuan = models.CharField(max_length=10)
+    jumlah = models.PositiveBigIntegerField(default=0)
+    jumlah_batch = models.PositiveIntegerField(default=0)
+    jumlah_release = models.PositiveIntegerField(default=0)
+    jumlah_reject = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Rollup Produksi"
+        verbose_name_plural = "Rollup Produksi"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["periode", "awal", "ruangan", "nama_produk", "satuan"],
+                name="uniq_rollup_bucket",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["periode", "awal"], name="rollup_periode_awal_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.periode} {self.awal:%Y-%m-%d %H:%M} {self.ruangan_id}/{self.nama_produk_id}"
+
+
+class Watermark(models.Model):
+    """Posisi terakhir yang sudah diproses oleh job inkremental (rollup, analitik, dst.)."""
+    nama = models.CharField(max_length=50, unique=True)
+    nilai = models.DateTimeField(null=True, blank=True)
+    diperbarui = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.nama}: {self.nilai}"
+
+
+class EventBatch(models.Model):
+    """
+    Jurnal siklus hidup batch (append-only, lihat jurnal.py).
+    `id` = nomor urut monotonik (AUTOINCREMENT) → kursor konsumen.
+    proses_id/ruangan_id sengaja bukan FK: event tetap ada walau baris dihapus.
+    """
+    DIBUAT = "dibuat"
+    SHADOW = "shadow"
+    MULAI = "mulai"
+    PROGRESS = "progress"
+    SELESAI = "selesai"
+    STATUS = "status"
+    PINDAH = "pindah"
+    RELEASE = "release"
+    REJECT = "reject"
+    JENIS_CHOICES = [
+        (DIBUAT, "Dibuat"),
+        (SHADOW, "Shadow Labelling dibuat"),
+        (MULAI, "Mulai diproses"),
+        (PROGRESS, "Progress"),
+        (SELESAI, "Selesai"),
+        (STATUS, "Status berubah"),
+        (PINDAH, "Pindah ruangan"),
+        (RELEASE, "Release"),
+        (REJECT, "Reject"),
+    ]
+
+    jenis = models.CharField(max_length=10, choices=JENIS_CHOICES)
+    nomor_batch = models.CharField(max_length=20)
+    proses_id = models.BigIntegerField(null=True, blank=True)
+    ruangan_id = models.BigIntegerField(null=True, blank=True)
+    data = models.JSONField(default=dict, blank=True)
+    waktu = models.DateTimeField(default=now)
+
+    class Meta:
+        verbose_name = "Event Batch"
+        verbose_name_plural = "Event Batch"
+        indexes = [
+            # "apa yang terjadi pada batch X" → urut sesuai kejadian
+            models.Index(fields=["nomor_batch", "id"], name="event_batch_nomor_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.nomor_batch} {self.jenis}"
+
+
+class KursorEvent(models.Model):
+    """Posisi (EventBatch.id terakhir) yang sudah diproses per konsumen."""
+    nama = models.CharField(max_length=50, unique=True)
+    posisi = models.BigIntegerField(default=0)
+    diperbarui = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.nama}: {self.posisi}"
+
+
+# --- Arsip (cold) -----------------------------------------------------------
+# Salinan kolom ProsesProduksi / RiwayatProduksi dengan NAMA FIELD YANG SAMA,
+# sehingga path ORM (nama__description, ruangan__nama, ...) berlaku di kedua
+# tabel dan arsip.Gabungan bisa membaca hot + arsip dengan query yang sama.
+# `id` = id asli baris hot. FK tanpa constraint & DO_NOTHING: arsip tidak
+# pernah ikut terhapus/terkunci oleh perubahan master data.
+def _fk_arsip(model, **kwargs):
+    return models.ForeignKey(
+        model, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+", **kwargs
+    )
+
+
+class ArsipProsesProduksi(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    status = models.CharField(max_length=30)
+    hasil_akhir = models.CharField(max_length=10, blank=True)
+    nama = _fk_arsip(ItemDescription)
+    nomor_batch = models.CharField(max_length=20, db_index=True)
+    jumlah = models.PositiveIntegerField()
+    satuan = models.CharField(max_length=10)
+    estimasi_jumlah_kemasan = models.PositiveIntegerField(null=True, blank=True)
+    jumlah_kemasan = models.PositiveIntegerField(null=True, blank=True)
+    satuan_kemasan = models.CharField(max_length=10, null=True, blank=True)
+    ruangan = _fk_arsip(Ruangan)
+    waktu_dibuat = models.DateTimeField()
+    waktu_mulai_produksi = models.DateTimeField(null=True, blank=True)
+    waktu_selesai = models.DateTimeField(null=True, blank=True)
+    operator = _fk_arsip(Operator, null=True, blank=True)
+    progress = models.PositiveIntegerField(default=0)
+    diarsipkan_pada = models.DateTimeField(default=now)
+
+    class Meta:
+        verbose_name = "Arsip Proses Produksi"
+        verbose_name_plural = "Arsip Proses Produksi"
+        indexes = [
+            models.Index(fields=["waktu_selesai"], name="arsip_proses_selesai_idx"),
+        ]
+
+    def __str__(self):
+        return f"Arsip: {self.nomor_batch} ({self.status})"
+
+
+class ArsipRiwayatProduksi(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    nomor_batch = models.CharField(max_length=20, db_index=True)
+    nama_produk = _fk_arsip(ItemDescription)
+    jumlah = models.PositiveIntegerField()
+    satuan = models.CharField(max_length=10)
+    ruangan = _fk_arsip(Ruangan)
+    operator = _fk_arsip(Operator, null=True, blank=True)
+    waktu_mulai_produksi = models.DateTimeField()
+    waktu_selesai = models.DateTimeField()
+    hasil_akhir = models.CharField(max_length=20, blank=True, null=True)
+    diperbarui_pada = models.DateTimeField()
+    diarsipkan_pada = models.DateTimeField(default=now)
+
+    class Meta:
+        verbose_name = "Arsip Riwayat Produksi"
+        verbose_name_plural = "Arsip Riwayat Produksi"
+        indexes = [
+            models.Index(fields=["ruangan", "waktu_selesai"], name="arsip_riwayat_ruang_sel_idx"),
+            models.Index(fields=["waktu_selesai"], name="arsip_riwayat_selesai_idx"),
+        ]
+
+    def __str__(self):
+        return f"Arsip riwayat: {self.nomor_batch}"
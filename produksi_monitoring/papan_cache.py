@@ -0,0 +1,91 @@
+# produksi_monitoring/papan_cache.py
+"""
+Cache render halaman monitoring per ruangan.
+
+Tiap ruangan punya penanda versi di cache Django (FileBasedCache → dipakai
+bersama semua worker). Versi diganti setelah commit setiap tulis yang
+menyentuh ruangan itu (lihat realtime.kirim_ke_ruangan & signals.py).
+Fragmen papan disimpan dengan kunci (ruangan, versi, limit, peran) sehingga
+tidak perlu invalidasi eksplisit: versi baru = kunci baru, yang lama kadaluarsa.
+
+Versi berupa token acak, bukan counter: dua worker yang menaikkan versi
+bersamaan tidak bisa "kehilangan" satu kenaikan (incr di FileBasedCache
+tidak atomik).
+"""
+import uuid
+
+from django.core.cache import cache
+
+from .topology import topologi
+
+PREFIX = "papan"
+TTL_FRAGMEN = 60 * 10
+# Ditaruh di context sebagai nilai csrf_token saat render fragmen, lalu
+# diganti token milik request — fragmen bisa dipakai bersama antar user.
+CSRF_PLACEHOLDER = "__CSRF_TOKEN_PAPAN__"
+
+
+def _kunci_versi(ruangan_id):
+    return f"{PREFIX}:versi:{ruangan_id}"
+
+
+def _token():
+    return uuid.uuid4().hex[:16]
+
+
+def versi(ruangan_id):
+    """Versi aktif ruangan; dibuat bila belum ada (mis. cache baru dibersihkan)."""
+    kunci = _kunci_versi(ruangan_id)
+    nilai = cache.get(kunci)
+    if nilai is None:
+        cache.add(kunci, _token(), None)
+        nilai = cache.get(kunci)
+    return nilai
+
+
+def naikkan_versi(ruangan_ids):
+    ids = {i for i in ruangan_ids if i}
+    if ids:
+        cache.set_many({_kunci_versi(i): _token() for i in ids}, None)
+
+
+def naikkan_semua():
+    """Untuk perubahan yang tampil di semua papan (operator, produk, ruangan)."""
+    naikkan_versi(topologi().per_id)
+
+
+def kunci_fragmen(ruangan_id, versi_ruangan, limit, peran):
+    return f"{PREFIX}:html:{ruangan_id}:{versi_ruangan}:{limit}:{peran}"
+
+
+def ambil_fragmen(kunci, render):
+    """HTML fragmen dari cache; `render()` dipanggil hanya saat miss."""
+    html = cache.get(kunci)
+    if html is not None:
+        _catat("hit")
+        return html
+    _catat("miss")
+    html = render()
+    cache.set(kunci, html, TTL_FRAGMEN)
+    return html
+
+
+def _catat(jenis):
+    kunci = f"{PREFIX}:statistik:{jenis}"
+    if not cache.add(kunci, 1, None):
+        try:
+            cache.incr(kunci)
+        except ValueError:
+            cache.set(kunci, 1, None)
+
+
+def statistik():
+    data = cache.get_many([f"{PREFIX}:statistik:hit", f"{PREFIX}:statistik:miss"])
+    hit = data.get(f"{PREFIX}:statistik:hit", 0)
+    miss = data.get(f"{PREFIX}:statistik:miss", 0)
+    total = hit + miss
+    return {
+        "hit": hit,
+        "miss": miss,
+        "hit_rate": round(hit / total, 4) if total else None,
+    }
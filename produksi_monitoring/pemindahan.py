@@ -0,0 +1,100 @@
+# produksi_monitoring/pemindahan.py
+"""
+Pindah batch massal ke ruangan berikutnya.
+
+Dulu: loop `produksi.save()` per batch (tiap save() menjalankan clean() +
+exists()), tanpa transaksi → 200 batch = 400+ statement dan bisa setengah jadi.
+Sekarang: validasi seluruh pilihan dengan beberapa query berbasis set, lalu
+satu UPDATE — semuanya dalam satu transaksi.
+"""
+from dataclasses import dataclass, field
+
+from . import jurnal
+from .konkurensi import transaksi_tulis
+from .models import EventBatch, ProsesProduksi
+from .realtime import segarkan_ruangan
+from .topology import topologi
+
+
+@dataclass
+class HasilPindah:
+    dipindahkan: list = field(default_factory=list)   # nomor_batch
+    ditolak: list = field(default_factory=list)       # (nomor_batch, alasan)
+
+    def __str__(self):
+        return f"{len(self.dipindahkan)} batch dipindahkan, {len(self.ditolak)} ditolak"
+
+
+def _alasan_tolak(topo, ruangan_id, status, hasil_akhir, ruangan_tujuan_id):
+    """Aturan yang sama dengan form pindah satu batch; None = boleh dipindah."""
+    info = topo.ruangan(ruangan_id)
+    if ruangan_id == ruangan_tujuan_id:
+        return "sudah berada di ruangan tujuan"
+    if hasil_akhir == "Reject":
+        return "hasil akhir 'Reject'"
+    if topo.is_labelling(ruangan_id):
+        return "batch dari ruang Labelling tidak bisa dipindahkan"
+    if topo.butuh_hasil_akhir(ruangan_id):
+        if hasil_akhir != "Release":
+            return "hasil akhir bukan 'Release'"
+    elif status != "Selesai Produksi" and not (info and status == f"Selesai Diproses di {info.nama}"):
+        return "belum selesai diproses"
+    return None
+
+
+def pindahkan_batch(batch_ids, ruangan_tujuan_id, operator_id) -> HasilPindah:
+    """
+    Pindahkan batch (pk) ke `ruangan_tujuan_id` dengan status 'Menunggu'.
+
+    Batch yang tidak lolos validasi dilewati dan dicatat alasannya di
+    `HasilPindah.ditolak`; sisanya dipindah dengan satu UPDATE.
+    """
+    hasil = HasilPindah()
+
+    with transaksi_tulis():
+        baris = list(
+            ProsesProduksi.objects.select_for_update()
+            .filter(pk__in=batch_ids)
+            .order_by("id")
+            .values_list("id", "nomor_batch", "ruangan_id", "status", "hasil_akhir")
+        )
+        topo = topologi(ruangan_tujuan_id, *{r[2] for r in baris})
+
+        # nomor_batch unik per ruangan: satu query untuk seluruh pilihan
+        sudah_di_tujuan = set(
+            ProsesProduksi.objects.filter(
+                ruangan_id=ruangan_tujuan_id,
+                nomor_batch__in={r[1] for r in baris},
+            ).values_list("nomor_batch", flat=True)
+        )
+
+        lolos, ruangan_asal, event_pindah = [], set(), []
+        for pk, nomor_batch, ruangan_id, status, hasil_akhir in baris:
+            alasan = _alasan_tolak(topo, ruangan_id, status, hasil_akhir, ruangan_tujuan_id)
+            if not alasan and nomor_batch in sudah_di_tujuan:
+                alasan = "nomor batch sudah ada di ruangan tujuan"
+            if alasan:
+                hasil.ditolak.append((nomor_batch, alasan))
+                continue
+            # dua batch bernomor sama dalam satu pilihan → hanya yang pertama
+            sudah_di_tujuan.add(nomor_batch)
+            lolos.append(pk)
+            ruangan_asal.add(ruangan_id)
+            event_pindah.append((pk, nomor_batch, ruangan_tujuan_id, ruangan_id))
+            hasil.dipindahkan.append(nomor_batch)
+
+        if lolos:
+            ProsesProduksi.objects.filter(pk__in=lolos).update(
+                ruangan_id=ruangan_tujuan_id,
+                operator_id=operator_id,
+                status="Menunggu",
+                waktu_mulai_produksi=None,
+            )
+            # UPDATE massal tidak memicu signal → jurnal & papan asal/tujuan manual
+            jurnal.catat_bulk(
+                EventBatch.PINDAH, event_pindah,
+                data=lambda b: {"dari": b[3], "ke": ruangan_tujuan_id, "status": "Menunggu"},
+            )
+            segarkan_ruangan(ruangan_asal | {ruangan_tujuan_id})
+
+    return hasil
@@ -0,0 +1,322 @@
+# produksi_monitoring/pencarian.py
+"""
+Pencarian teks penuh batch & riwayat lewat tabel virtual SQLite FTS5.
+
+Satu tabel `cari_batch_fts` berisi satu baris per ProsesProduksi dan per
+RiwayatProduksi — hot maupun arsip (arsip.py): nomor_batch, deskripsi &
+barcode produk, nama ruangan dan operator. rowid dikodekan agar tiap baris
+bisa dihapus/diganti lewat rowid (O(log n)): id*4 + {0 proses, 1 riwayat,
+2 arsip proses, 3 arsip riwayat} → bit 0 = jenis, bit 1 = arsip.
+
+Sinkronisasi memakai TRIGGER SQLite, bukan signal Django: jalur massal
+(pindah massal, auto-start, bulk_update scanner, upsert riwayat) menulis
+dengan UPDATE/bulk_create yang tidak memicu signal, trigger tetap jalan.
+Trigger UPDATE hanya bekerja bila kolom yang diindeks berubah, jadi update
+progress/status tidak membayar apa-apa. Ganti nama produk/ruangan/operator
+memperbarui baris terkait lewat index FK.
+
+Tabel FTS dibuat & diisi oleh migration 0057 (mundur melewatinya =
+tabel + trigger dihapus). Trigger rename menyebut tabel proses/riwayat/arsip,
+sehingga ALTER tabel sumber lewat _remake_table SQLite (AlterField,
+RemoveField, constraint) gagal selama trigger terpasang. Karena itu TRIGGER
+tidak dipasang di dalam rencana migrate: dilepas di pre_migrate dan dipasang
+di post_migrate (lihat apps.py) bila tabel FTS ada. Tabel & isinya tetap —
+pencarian jalan terus selama migrate dan deploy tidak mengindeks ulang
+riwayat bertahun-tahun; isi ulang penuh hanya bila tabelnya masih kosong.
+Perubahan data oleh migration itu sendiri tidak tersinkron; bila perlu
+jalankan `bangun_indeks_pencarian`.
+
+Di database tanpa FTS5 (atau bukan SQLite) tersedia() = False dan pemanggil
+kembali ke pencarian ORM biasa.
+"""
+import re
+from dataclasses import dataclass
+
+from django.db import connection, connections, transaction
+from django.db.models.expressions import RawSQL
+
+from .konkurensi import transaksi_tulis
+from .models import (
+    ArsipProsesProduksi, ArsipRiwayatProduksi, ItemDescription, Operator,
+    ProsesProduksi, RiwayatProduksi, Ruangan,
+)
+
+TABEL = "cari_batch_fts"
+KOLOM = ("nomor_batch", "produk", "barcode", "ruangan", "operator")
+# bobot bm25 per kolom (urutan KOLOM): nomor batch & barcode paling menentukan
+BOBOT = (10.0, 4.0, 8.0, 1.0, 1.0)
+MAKS_KATA = 8
+PER_HALAMAN = 20
+MAKS_PER_HALAMAN = 100
+
+JENIS_PROSES = "proses"
+JENIS_RIWAYAT = "riwayat"
+
+_P = ProsesProduksi._meta.db_table
+_R = RiwayatProduksi._meta.db_table
+_AP = ArsipProsesProduksi._meta.db_table
+_AR = ArsipRiwayatProduksi._meta.db_table
+_I = ItemDescription._meta.db_table
+_RU = Ruangan._meta.db_table
+_O = Operator._meta.db_table
+
+# (tabel sumber, kolom FK produk, offset rowid)
+_SUMBER = ((_P, "nama_id", 0), (_R, "nama_produk_id", 1), (_AP, "nama_id", 2), (_AR, "nama_produk_id", 3))
+KELIPATAN = 4
+
+
+def _nilai(alias, fk_produk):
+    """Ekspresi VALUES/SELECT untuk satu baris sumber (alias = new / t)."""
+    return (
+        f"{alias}.nomor_batch, "
+        f"(SELECT description FROM {_I} WHERE id = {alias}.{fk_produk}), "
+        f"(SELECT barcode FROM {_I} WHERE id = {alias}.{fk_produk}), "
+        f"(SELECT nama FROM {_RU} WHERE id = {alias}.ruangan_id), "
+        f"(SELECT nama FROM {_O} WHERE id = {alias}.operator_id)"
+    )
+
+
+def _sumber_ada(conn):
+    """Sumber yang tabelnya sudah ada (migrasi lama berjalan sebelum tabel arsip dibuat)."""
+    ada = set(conn.introspection.table_names())
+    return [s for s in _SUMBER if s[0] in ada]
+
+
+def _ddl(sumber):
+    kolom = ", ".join(KOLOM)
+    sql = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABEL} USING fts5("
+        f"{kolom}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    ]
+    for tabel, fk, off in sumber:
+        nama = f"{TABEL}_{tabel.rsplit('_', 1)[-1]}"
+        sisip = f"INSERT INTO {TABEL}(rowid, {kolom}) VALUES (new.id * {KELIPATAN} + {off}, {_nilai('new', fk)});"
+        berubah = " OR ".join(
+            f"old.{c} IS NOT new.{c}" for c in ("nomor_batch", fk, "ruangan_id", "operator_id")
+        )
+        sql += [
+            f"CREATE TRIGGER IF NOT EXISTS {nama}_ai AFTER INSERT ON {tabel} BEGIN {sisip} END",
+            f"CREATE TRIGGER IF NOT EXISTS {nama}_ad AFTER DELETE ON {tabel} BEGIN "
+            f"DELETE FROM {TABEL} WHERE rowid = old.id * {KELIPATAN} + {off}; END",
+            f"CREATE TRIGGER IF NOT EXISTS {nama}_au AFTER UPDATE ON {tabel} WHEN {berubah} BEGIN "
+            f"DELETE FROM {TABEL} WHERE rowid = old.id * {KELIPATAN} + {off}; {sisip} END",
+        ]
+
+    def rowid_terkait(fk_proses, fk_riwayat):
+        return " UNION ALL ".join(
+            f"SELECT id * {KELIPATAN} + {off} FROM {tabel} "
+            f"WHERE {fk_proses if off % 2 == 0 else fk_riwayat} = new.id"
+            for tabel, _, off in sumber
+        )
+
+    sql += [
+        f"CREATE TRIGGER IF NOT EXISTS {TABEL}_produk_au AFTER UPDATE ON {_I} "
+        f"WHEN old.description IS NOT new.description OR old.barcode IS NOT new.barcode BEGIN "
+        f"UPDATE {TABEL} SET produk = new.description, barcode = new.barcode "
+        f"WHERE rowid IN ({rowid_terkait('nama_id', 'nama_produk_id')}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {TABEL}_ruangan_au AFTER UPDATE ON {_RU} "
+        f"WHEN old.nama IS NOT new.nama BEGIN "
+        f"UPDATE {TABEL} SET ruangan = new.nama "
+        f"WHERE rowid IN ({rowid_terkait('ruangan_id', 'ruangan_id')}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {TABEL}_operator_au AFTER UPDATE ON {_O} "
+        f"WHEN old.nama IS NOT new.nama BEGIN "
+        f"UPDATE {TABEL} SET operator = new.nama "
+        f"WHERE rowid IN ({rowid_terkait('operator_id', 'operator_id')}); END",
+    ]
+    return sql
+
+
+def _nama_trigger():
+    nama = [f"{TABEL}_{t.rsplit('_', 1)[-1]}_{a}" for t, _, _ in _SUMBER for a in ("ai", "ad", "au")]
+    return nama + [f"{TABEL}_produk_au", f"{TABEL}_ruangan_au", f"{TABEL}_operator_au"]
+
+
+def fts5_didukung(conn=connection):
+    if conn.vendor != "sqlite":
+        return False
+    with conn.cursor() as c:
+        c.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(c.fetchone()[0])
+
+
+def pasang(conn=connection, trigger=True):
+    """Buat tabel FTS (+ trigger) secara idempoten. Return False bila FTS5 tidak ada."""
+    if not fts5_didukung(conn):
+        return False
+    ddl = _ddl(_sumber_ada(conn))
+    with conn.cursor() as c:
+        for sql in ddl if trigger else ddl[:1]:
+            c.execute(sql)
+    return True
+
+
+def lepas_trigger(conn=connection):
+    if conn.vendor != "sqlite":
+        return
+    with conn.cursor() as c:
+        for nama in _nama_trigger():
+            c.execute(f"DROP TRIGGER IF EXISTS {nama}")
+
+
+def lepas(conn=connection):
+    if conn.vendor != "sqlite":
+        return
+    lepas_trigger(conn)
+    with conn.cursor() as c:
+        c.execute(f"DROP TABLE IF EXISTS {TABEL}")
+
+
+def tabel_ada(conn=connection):
+    if conn.vendor != "sqlite":
+        return False
+    with conn.cursor() as c:
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [TABEL])
+        return c.fetchone() is not None
+
+
+def _kosong(conn):
+    with conn.cursor() as c:
+        c.execute(f"SELECT 1 FROM {TABEL} LIMIT 1")
+        return c.fetchone() is None
+
+
+def isi(conn=connection):
+    """Kosongkan lalu isi ulang index dari tabel sumber; return jumlah baris."""
+    kolom = ", ".join(KOLOM)
+    with conn.cursor() as c:
+        c.execute(f"DELETE FROM {TABEL}")
+        for tabel, fk, off in _sumber_ada(conn):
+            c.execute(
+                f"INSERT INTO {TABEL}(rowid, {kolom}) "
+                f"SELECT t.id * {KELIPATAN} + {off}, {_nilai('t', fk)} FROM {tabel} t"
+            )
+        # gabungkan segmen b-tree hasil insert massal → query lebih cepat
+        c.execute(f"INSERT INTO {TABEL}({TABEL}) VALUES ('optimize')")
+        c.execute(f"SELECT count(*) FROM {TABEL}")
+        return c.fetchone()[0]
+
+
+def bangun_ulang(ulang_skema=False):
+    """Muat awal / bangun ulang index. ulang_skema=True → drop & buat ulang trigger & tabel."""
+    with transaksi_tulis():
+        if ulang_skema:
+            lepas()
+        if not pasang():
+            return None
+        return isi()
+
+
+def lepas_sebelum_migrate(sender, using, plan=None, **kwargs):
+    """pre_migrate: lepas trigger FTS agar migration bebas mengubah tabel sumber; tabel & isinya tetap."""
+    if plan:
+        lepas_trigger(connections[using])
+
+
+def pasang_setelah_migrate(sender, using, plan=None, **kwargs):
+    """post_migrate: pasang lagi trigger bila tabel FTS ada (0057); isi ulang hanya bila kosong."""
+    conn = connections[using]
+    if not plan or not tabel_ada(conn) or not fts5_didukung(conn):
+        return
+    with transaction.atomic(using=using):
+        pasang(conn)
+        if _kosong(conn):
+            isi(conn)
+
+
+_tersedia = None
+
+
+def tersedia():
+    """Tabel FTS ada di database default (hasil positif di-cache per proses)."""
+    global _tersedia
+    if not _tersedia:
+        # "belum ada" tidak di-cache: tabel bisa dibuat migrate /
+        # bangun_indeks_pencarian tanpa proses ini di-restart
+        _tersedia = tabel_ada()
+    return _tersedia
+
+
+# --- query ------------------------------------------------------------------
+def ekspresi_match(q):
+    """
+    Teks bebas → ekspresi MATCH FTS5 yang aman: tiap kata jadi frasa
+    ber-prefix ("kata"*), antar kata AND. Sintaks FTS5 dari pengguna
+    (tanda kutip, NEAR, kolom:) tidak ikut ditafsirkan.
+    """
+    kata = [k for k in re.split(r"\s+", (q or "").strip()) if re.search(r"\w", k)][:MAKS_KATA]
+    return " ".join('"' + k.replace('"', '""') + '"*' for k in kata)
+
+
+@dataclass
+class Hit:
+    jenis: str
+    id: int
+    skor: float
+    nomor_batch: str
+    produk: str
+    barcode: str
+    ruangan: str
+    operator: str
+    arsip: bool = False
+
+    def as_dict(self):
+        return {
+            "jenis": self.jenis, "id": self.id, "arsip": self.arsip, "skor": round(self.skor, 4),
+            "nomor_batch": self.nomor_batch, "produk": self.produk, "barcode": self.barcode,
+            "ruangan": self.ruangan, "operator": self.operator,
+        }
+
+
+def _filter(jenis, arsip):
+    sql = ""
+    if jenis == JENIS_PROSES:
+        sql += " AND (rowid & 1) = 0"
+    elif jenis == JENIS_RIWAYAT:
+        sql += " AND (rowid & 1) = 1"
+    if arsip is not None:
+        sql += f" AND (rowid & 2) = {2 if arsip else 0}"
+    return sql
+
+
+def cari(q, jenis=None, offset=0, limit=PER_HALAMAN, arsip=None):
+    """
+    Hit terurut relevansi (bm25 berbobot, lebih kecil = lebih relevan).
+    Return (hits, total). jenis = None | "proses" | "riwayat";
+    arsip = None (hot + arsip) | False (hot saja) | True (arsip saja).
+    """
+    match = ekspresi_match(q)
+    if not match:
+        return [], 0
+    bobot = ", ".join(str(b) for b in BOBOT)
+    where = f"{TABEL} MATCH %s{_filter(jenis, arsip)}"
+    with connection.cursor() as c:
+        c.execute(f"SELECT count(*) FROM {TABEL} WHERE {where}", [match])
+        total = c.fetchone()[0]
+        if not total or offset >= total:
+            return [], total
+        c.execute(
+            f"SELECT rowid, bm25({TABEL}, {bobot}) AS skor, {', '.join(KOLOM)} "
+            f"FROM {TABEL} WHERE {where} ORDER BY skor LIMIT %s OFFSET %s",
+            [match, limit, offset],
+        )
+        baris = c.fetchall()
+    hits = [
+        Hit(JENIS_RIWAYAT if rowid & 1 else JENIS_PROSES, rowid // KELIPATAN, -skor, *kolom, arsip=bool(rowid & 2))
+        for rowid, skor, *kolom in baris
+    ]
+    return hits, total
+
+
+def subquery_id_proses(q):
+    """
+    Subquery id ProsesProduksi (hot) yang cocok dengan `q`, tanpa batas —
+    untuk `filter(id__in=...)` di admin changelist (count & paging tetap
+    benar, urutan mengikuti changelist). None bila `q` tanpa kata.
+    """
+    match = ekspresi_match(q)
+    if not match:
+        return None
+    return RawSQL(
+        f"SELECT rowid / {KELIPATAN} FROM {TABEL} WHERE {TABEL} MATCH %s{_filter(JENIS_PROSES, False)}",
+        [match],
+    )
@@ -0,0 +1,112 @@
+# produksi_monitoring/query_plan.py
+"""
+Registri query panas + verifikasi EXPLAIN QUERY PLAN (SQLite).
+
+Setiap entri membangun QuerySet yang sama bentuknya dengan query di kode
+produksi (papan ruangan, auto-start, riwayat). cek_semua() menjalankan
+EXPLAIN QUERY PLAN dan menandai query yang jatuh ke full scan tabel atau
+sort sementara (USE TEMP B-TREE) — tanda index komposit hilang/tidak cocok.
+Tambahkan entri baru di QUERY_PANAS saat menambah query di jalur panas.
+"""
+from dataclasses import dataclass, field
+from typing import Callable
+
+from django.db import connection
+from django.utils.timezone import now
+
+from .models import ProsesProduksi, RiwayatProduksi, Ruangan
+from .scheduler import batch_jatuh_tempo
+
+LIMIT_PAPAN = 10
+
+
+@dataclass
+class QueryPanas:
+    nama: str
+    queryset: Callable[[int], object]   # ruangan_id → QuerySet
+    keterangan: str = ""
+
+
+@dataclass
+class HasilPlan:
+    nama: str
+    sql: str
+    plan: list = field(default_factory=list)
+    masalah: list = field(default_factory=list)
+
+    @property
+    def lolos(self):
+        return not self.masalah
+
+
+QUERY_PANAS = [
+    QueryPanas(
+        "papan_menunggu",
+        lambda r: ProsesProduksi.objects.filter(ruangan_id=r, status="Menunggu")
+        .select_related("nama", "operator").order_by("waktu_mulai_produksi")[:LIMIT_PAPAN],
+        "views._render_papan",
+    ),
+    QueryPanas(
+        "papan_diproses",
+        lambda r: ProsesProduksi.objects.filter(ruangan_id=r, status="Sedang Diproses")
+        .select_related("nama", "operator").order_by("waktu_mulai_produksi")[:LIMIT_PAPAN],
+        "views._render_papan",
+    ),
+    QueryPanas(
+        "papan_siap_pindah",
+        lambda r: ProsesProduksi.objects.filter(ruangan_id=r, status="Siap Dipindahkan")
+        .select_related("nama", "operator").order_by("-waktu_selesai")[:LIMIT_PAPAN],
+        "views._render_papan",
+    ),
+    QueryPanas(
+        "papan_riwayat_labelling",
+        lambda r: ProsesProduksi.objects.filter(ruangan_id=r, status="Selesai Produksi")
+        .select_related("nama", "operator").order_by("-waktu_selesai")[:LIMIT_PAPAN],
+        "views._render_papan (Labelling)",
+    ),
+    QueryPanas(
+        "papan_riwayat",
+        lambda r: RiwayatProduksi.objects.filter(ruangan_id=r)
+        .select_related("ruangan", "nama_produk", "operator").order_by("-waktu_selesai")[:LIMIT_PAPAN],
+        "views._render_papan (non-Labelling)",
+    ),
+    QueryPanas(
+        "auto_start_jatuh_tempo",
+        lambda r: batch_jatuh_tempo(now()).order_by(),
+        "scheduler.batch_jatuh_tempo",
+    ),
+]
+
+
+def masalah_plan(detail):
+    """Baris detail EXPLAIN QUERY PLAN → deskripsi masalah, atau None bila aman."""
+    if "USE TEMP B-TREE" in detail:
+        return f"sort sementara: {detail}"
+    # "SCAN tabel" tanpa index = full scan; "SCAN CONSTANT ROW" dsb. tidak masalah
+    if detail.startswith("SCAN ") and " USING " not in detail and "CONSTANT ROW" not in detail:
+        return f"full scan: {detail}"
+    return None
+
+
+def jelaskan(qs):
+    sql, params = qs.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return sql % tuple(repr(p) for p in params), [baris[-1] for baris in cursor.fetchall()]
+
+
+def cek_semua(ruangan_id=None, hanya=None):
+    if connection.vendor != "sqlite":
+        raise ValueError("EXPLAIN QUERY PLAN hanya didukung untuk SQLite.")
+    if ruangan_id is None:
+        ruangan_id = Ruangan.objects.order_by("id").values_list("id", flat=True).first() or 1
+
+    hasil = []
+    for q in QUERY_PANAS:
+        if hanya and q.nama not in hanya:
+            continue
+        sql, plan = jelaskan(q.queryset(ruangan_id))
+        h = HasilPlan(nama=q.nama, sql=sql, plan=plan)
+        h.masalah = [m for m in map(masalah_plan, plan) if m]
+        hasil.append(h)
+    return hasil
@@ -0,0 +1,127 @@
+# produksi_monitoring/realtime.py
+"""
+Kirim perubahan baris (diff) ke papan monitoring per ruangan lewat Channels.
+Pemanggil cukup memanggil kirim_ke_ruangan(); pengiriman ditunda sampai commit.
+Titik yang sama juga mengganti versi cache render papan (papan_cache.py).
+"""
+import json
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from . import papan_cache
+from .topology import topologi
+
+logger = logging.getLogger(__name__)
+
+
+def nama_grup(slug: str) -> str:
+    """Nama grup Channels untuk satu ruangan (slug aman untuk nama grup)."""
+    return f"monitoring_{slug}"
+
+
+def _slug_ruangan(ruangan_ids):
+    ids = {i for i in ruangan_ids if i}
+    topo = topologi(*ids)
+    return [info.slug for info in (topo.ruangan(i) for i in ids) if info]
+
+
+def _kirim_sekarang(ruangan_ids, pesan):
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    # Normalisasi datetime dsb. agar aman dikirim sebagai JSON
+    pesan = json.loads(json.dumps(pesan, cls=DjangoJSONEncoder))
+    for slug in _slug_ruangan(ruangan_ids):
+        try:
+            async_to_sync(layer.group_send)(nama_grup(slug), {"type": "ruangan.update", "pesan": pesan})
+        except Exception:
+            # push realtime tidak boleh mengganggu alur tulis
+            logger.exception("Gagal mengirim update realtime ke ruangan %s", slug)
+
+
+def kirim_ke_ruangan(ruangan_ids, pesan):
+    """Jadwalkan push ke grup ruangan setelah transaksi berhasil di-commit."""
+    ruangan_ids = list(ruangan_ids)
+
+    def setelah_commit():
+        # versi dulu: reload yang dipicu push harus melihat versi baru
+        papan_cache.naikkan_versi(ruangan_ids)
+        _kirim_sekarang(ruangan_ids, pesan)
+
+    transaction.on_commit(setelah_commit)
+
+
+def layer_bersama():
+    """
+    Channel layer dipakai bersama antar proses (mis. channels_redis)?
+    InMemoryChannelLayer hanya terlihat di proses itu sendiri: pesan dari
+    proses lain (konsumsi_event, penjadwal) tidak pernah sampai ke klien ASGI.
+    """
+    layer = get_channel_layer()
+    return layer is not None and not isinstance(layer, InMemoryChannelLayer)
+
+
+def kirim_event(events):
+    """
+    Push event jurnal (EventBatch) SEKARANG, satu pesan per ruangan — tanpa
+    menunggu commit; dipanggil konsumen "push" (jurnal.py) di transaksinya.
+    Klien (monitoring_ruangan.html) membuang event yang id-nya sudah dilihat.
+    """
+    per_ruangan = {}
+    for e in events:
+        if e.ruangan_id:
+            per_ruangan.setdefault(e.ruangan_id, []).append({
+                "id": e.id, "jenis": e.jenis, "nomor_batch": e.nomor_batch,
+                "proses_id": e.proses_id, "data": e.data, "waktu": e.waktu,
+            })
+    for ruangan_id, daftar in per_ruangan.items():
+        _kirim_sekarang([ruangan_id], {"tipe": "event", "event": daftar})
+
+
+def segarkan_ruangan(ruangan_ids):
+    """Minta layar memuat ulang (dipakai setelah UPDATE massal tanpa diff per baris)."""
+    kirim_ke_ruangan(ruangan_ids, {"tipe": "segarkan"})
+
+
+_KOLOM_PROSES = {
+    "nomor_batch": lambda o: o.nomor_batch,
+    "status": lambda o: o.status,
+    "hasil_akhir": lambda o: o.hasil_akhir,
+    "produk": lambda o: str(o.nama) if o.nama_id else None,
+    "jumlah": lambda o: o.jumlah,
+    "satuan": lambda o: o.satuan,
+    "progress": lambda o: o.progress,
+    "progress_persen": lambda o: o.progress_percentage,
+    "estimasi_jumlah_kemasan": lambda o: o.estimasi_jumlah_kemasan,
+    "jumlah_kemasan": lambda o: o.jumlah_kemasan,
+    "satuan_kemasan": lambda o: o.get_satuan_kemasan_display() if o.satuan_kemasan else "",
+    "operator": lambda o: o.operator.nama if o.operator_id else None,
+    "waktu_mulai_produksi": lambda o: o.waktu_mulai_produksi,
+    "waktu_selesai": lambda o: o.waktu_selesai,
+}
+
+
+def data_proses(obj, fields=None):
+    """
+    Representasi ringkas ProsesProduksi untuk papan monitoring.
+    `fields` membatasi kolom (diff); FK hanya dibaca bila kolomnya diminta.
+    """
+    kolom = _KOLOM_PROSES if fields is None else [k for k in _KOLOM_PROSES if k in fields]
+    return {k: _KOLOM_PROSES[k](obj) for k in kolom}
+
+
+def data_riwayat(obj):
+    """Representasi ringkas RiwayatProduksi untuk tabel riwayat."""
+    return {
+        "nomor_batch": obj.nomor_batch,
+        "produk": str(obj.nama_produk) if obj.nama_produk_id else None,
+        "jumlah": obj.jumlah,
+        "satuan": obj.satuan,
+        "operator": str(obj.operator) if obj.operator_id else "",
+        "waktu_selesai": obj.waktu_selesai,
+        "hasil_akhir": obj.hasil_akhir,
+    }
@@ -0,0 +1,102 @@
+# produksi_monitoring/ringkasan.py
+"""
+Ringkasan WIP seluruh pabrik untuk supervisor.
+
+Satu query agregat ber-GROUP BY (ruangan, status, operator) atas
+ProsesProduksi; nama ruangan/tahap diambil dari topologi. Jumlah query tetap
+satu berapa pun banyaknya ruangan. Hasil di-cache sebentar (TTL pendek)
+karena halaman ini biasanya dibuka banyak supervisor sekaligus.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Min
+from django.utils.timezone import now
+
+from .models import ProsesProduksi
+from .topology import topologi
+
+# Status akhir tidak termasuk WIP (dan terus bertambah → jangan di-scan)
+STATUS_SELESAI = ("Selesai Produksi",)
+STATUS_AKTIF = "Sedang Diproses"
+STATUS_MENUNGGU = "Menunggu"
+
+KUNCI_CACHE = "ringkasan_pabrik"
+TTL_DETIK = 10
+
+
+def _agregat():
+    baris = (
+        ProsesProduksi.objects
+        .exclude(status__in=STATUS_SELESAI)
+        .values("ruangan_id", "status", "operator_id", "operator__nama")
+        .annotate(jumlah=Count("id"), tertua=Min("waktu_dibuat"))
+        .order_by()
+    )
+    return list(baris)
+
+
+def _susun(baris):
+    topo = topologi(*{b["ruangan_id"] for b in baris})
+    ruangan = {
+        info.id: {
+            "id": info.id,
+            "nama": info.nama,
+            "slug": info.slug,
+            "tahap": info.tahap,
+            "status": {},
+            "total": 0,
+            "menunggu_sejak": None,
+        }
+        for info in topo.per_id.values()
+    }
+    operator = {}
+
+    for b in baris:
+        r = ruangan.get(b["ruangan_id"])
+        if r is not None:
+            r["status"][b["status"]] = r["status"].get(b["status"], 0) + b["jumlah"]
+            r["total"] += b["jumlah"]
+            if b["status"] == STATUS_MENUNGGU and (
+                r["menunggu_sejak"] is None or b["tertua"] < r["menunggu_sejak"]
+            ):
+                r["menunggu_sejak"] = b["tertua"]
+
+        if b["operator_id"]:
+            op = operator.setdefault(b["operator_id"], {
+                "id": b["operator_id"], "nama": b["operator__nama"], "aktif": 0, "total": 0,
+            })
+            op["total"] += b["jumlah"]
+            if b["status"] == STATUS_AKTIF:
+                op["aktif"] += b["jumlah"]
+
+    return {
+        "ruangan": list(ruangan.values()),
+        "operator": sorted(operator.values(), key=lambda o: (-o["aktif"], -o["total"], o["nama"] or "")),
+        "dihitung_pada": now(),
+    }
+
+
+def ringkasan_pabrik(pakai_cache=True):
+    """
+    Dict berisi `ruangan` (hitungan per status + waktu_dibuat batch Menunggu
+    tertua) dan `operator` (beban aktif). Umur dihitung saat dibaca, bukan
+    saat di-cache, lihat umur_menunggu().
+    """
+    if pakai_cache:
+        data = cache.get(KUNCI_CACHE)
+        if data is not None:
+            return data
+    data = _susun(_agregat())
+    cache.set(KUNCI_CACHE, data, TTL_DETIK)
+    return data
+
+
+def umur_menunggu(data, waktu=None):
+    """Tambahkan `menunggu_tertua_detik` per ruangan (tanpa mengubah data cache)."""
+    waktu = waktu or now()
+    hasil = []
+    for r in data["ruangan"]:
+        r = dict(r)
+        sejak = r["menunggu_sejak"]
+        r["menunggu_tertua_detik"] = int((waktu - sejak).total_seconds()) if sejak else None
+        hasil.append(r)
+    return {**data, "ruangan": hasil}
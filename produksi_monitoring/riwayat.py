@@ -0,0 +1,135 @@
+# produksi_monitoring/riwayat.py
+"""
+Penulisan RiwayatProduksi.
+
+Satu baris riwayat per stint: (nomor_batch, ruangan, waktu_mulai_produksi)
+— dijaga constraint `uniq_riwayat_batch_ruangan_mulai`. Selesai ulang pada
+stint yang sama (mis. hasil akhir dipilih setelah progress penuh) memperbarui
+baris itu; batch yang kembali ke ruangan yang sama (rework, reject diproses
+ulang) dimulai dengan waktu mulai baru sehingga riwayat lamanya tetap ada.
+Penulisan memakai upsert satu statement (INSERT ... ON CONFLICT DO UPDATE),
+bukan get_or_create 9 kolom.
+"""
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.timezone import now
+
+from .models import RiwayatProduksi, RiwayatProduksiDuplikat
+from . import realtime
+
+KUNCI_RIWAYAT = ["nomor_batch", "ruangan", "waktu_mulai_produksi"]
+KOLOM_UPDATE_RIWAYAT = [
+    "nama_produk", "jumlah", "satuan", "operator",
+    "waktu_selesai", "hasil_akhir", "diperbarui_pada",
+]
+
+
+def _dari_produksi(produksi, hasil_akhir):
+    return RiwayatProduksi(
+        nomor_batch=produksi.nomor_batch,
+        nama_produk_id=produksi.nama_id,
+        jumlah=produksi.jumlah,
+        satuan=produksi.satuan,
+        ruangan_id=produksi.ruangan_id,
+        operator_id=produksi.operator_id,
+        waktu_mulai_produksi=produksi.waktu_mulai_produksi,
+        waktu_selesai=produksi.waktu_selesai,
+        hasil_akhir=hasil_akhir,
+    )
+
+
+def catat_riwayat_bulk(daftar, push=True):
+    """
+    Upsert banyak riwayat sekaligus. `daftar` = iterable (produksi, hasil_akhir).
+    Return jumlah baris yang ditulis.
+    """
+    objs = [_dari_produksi(p, hasil) for p, hasil in daftar]
+    if not objs:
+        return 0
+
+    RiwayatProduksi.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        unique_fields=KUNCI_RIWAYAT,
+        update_fields=KOLOM_UPDATE_RIWAYAT,
+        batch_size=500,
+    )
+
+    # bulk_create tidak memicu post_save → push realtime manual
+    if push:
+        if len(objs) == 1:
+            _push_satu(objs[0])
+        else:
+            realtime.segarkan_ruangan({o.ruangan_id for o in objs})
+    return len(objs)
+
+
+def catat_riwayat(produksi, hasil_akhir):
+    """Upsert riwayat satu batch (dipanggil saat batch selesai di suatu ruangan)."""
+    return catat_riwayat_bulk([(produksi, hasil_akhir)])
+
+
+def _push_satu(obj):
+    # id baris tidak dikembalikan oleh upsert di SQLite → ambil lewat kunci unik
+    baris = (
+        RiwayatProduksi.objects
+        .select_related("nama_produk", "operator")
+        .get(
+            nomor_batch=obj.nomor_batch, ruangan_id=obj.ruangan_id,
+            waktu_mulai_produksi=obj.waktu_mulai_produksi,
+        )
+    )
+    realtime.kirim_ke_ruangan([baris.ruangan_id], {
+        "tipe": "riwayat",
+        "aksi": "simpan",
+        "id": baris.pk,
+        "data": realtime.data_riwayat(baris),
+    })
+
+
+def sisihkan_duplikat_riwayat(chunk=500, dry_run=False):
+    """
+    Sisakan satu baris per stint (nomor_batch, ruangan, waktu_mulai_produksi):
+    yang id-nya terbesar (penulisan terakhir). Baris lain DIPINDAH ke
+    RiwayatProduksiDuplikat (bukan dihapus), per `chunk` grup dalam transaksi
+    pendek. Dipakai `dedup_riwayat`; migration 0053 punya SQL-nya sendiri.
+    Return (jumlah_grup_duplikat, jumlah_baris_disisihkan).
+    """
+    kunci = ("nomor_batch", "ruangan_id", "waktu_mulai_produksi")
+    riwayat, duplikat = RiwayatProduksi, RiwayatProduksiDuplikat
+    kolom = [f.attname for f in duplikat._meta.concrete_fields if f.attname != "disisihkan_pada"]
+    grup = (
+        riwayat.objects.values(*kunci)
+        .annotate(n=Count("id"), simpan=Max("id"))
+        .filter(n__gt=1)
+        .order_by()
+    )
+    if dry_run:
+        semua = list(grup)
+        return len(semua), sum(g["n"] - 1 for g in semua)
+
+    total_grup = 0
+    total_pindah = 0
+    while True:
+        potong = list(grup[:chunk])
+        if not potong:
+            break
+        total_grup += len(potong)
+        sebelum = total_pindah
+        with transaction.atomic():
+            for g in potong:
+                ganda = (
+                    riwayat.objects
+                    .filter(**{k: g[k] for k in kunci})
+                    .exclude(id=g["simpan"])
+                )
+                waktu = now()
+                duplikat.objects.bulk_create(
+                    [duplikat(disisihkan_pada=waktu, **b) for b in ganda.values(*kolom)]
+                )
+                total_pindah += ganda.delete()[0]
+        if total_pindah == sebelum:
+            # kunci grup tidak cocok lagi saat difilter (mis. format waktu
+            # tersimpan tidak standar) → hentikan, jangan berputar selamanya
+            break
+    return total_grup, total_pindah
@@ -0,0 +1,214 @@
+# produksi_monitoring/rollup.py
+"""
+Rollup produksi per jam & per hari (tabel RollupProduksi).
+
+Refresh inkremental berbasis watermark `RiwayatProduksi.diperbarui_pada`:
+hanya riwayat yang baru/berubah sejak refresh terakhir yang dilihat, lalu
+HARI yang tersentuh dihitung ulang utuh dari riwayat (hapus + bulk_create).
+Menghitung ulang per hari — bukan menambah delta — membuat refresh aman
+diulang dan benar untuk riwayat yang di-upsert (id sama, nilai berubah).
+
+Hari dihitung dari riwayat hot + arsip (arsip.gabungan), jadi pengarsipan
+tidak mengubah angka rollup dan `--penuh` tetap mencakup riwayat lama.
+
+Batasan: riwayat yang DIHAPUS, atau yang waktu_selesai-nya dipindah ke hari
+lain, tidak terdeteksi dari watermark → jalankan `refresh_rollup --penuh`.
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from .arsip import gabungan
+from .models import RiwayatProduksi, RollupProduksi, Watermark
+
+NAMA_WATERMARK = "rollup_produksi"
+# Riwayat yang commit sedikit terlambat (diperbarui_pada < watermark) tetap
+# terambil; hitung ulang per hari idempotent sehingga tumpang-tindih aman.
+TUMPANG_TINDIH = timedelta(minutes=2)
+HARI_PER_QUERY = 31
+
+
+@dataclass
+class HasilRollup:
+    hari_dihitung: int = 0
+    baris_jam: int = 0
+    baris_hari: int = 0
+    durasi_ms: float = 0.0
+
+    def __str__(self):
+        return (
+            f"{self.hari_dihitung} hari dihitung ulang → {self.baris_jam} baris per jam, "
+            f"{self.baris_hari} baris per hari ({self.durasi_ms:.1f} ms)"
+        )
+
+
+def _awal_hari(tanggal):
+    return timezone.make_aware(datetime.combine(tanggal, datetime.min.time()))
+
+
+def _hitung_hari(daftar_tanggal, ruangan_ids=None):
+    """Bangun ulang baris RollupProduksi untuk hari-hari tersebut (opsional: hanya ruangan tertentu)."""
+    filter_hari = Q()
+    for tgl in daftar_tanggal:
+        awal = _awal_hari(tgl)
+        filter_hari |= Q(waktu_selesai__gte=awal, waktu_selesai__lt=awal + timedelta(days=1))
+    if ruangan_ids is not None:
+        filter_hari &= Q(ruangan_id__in=ruangan_ids)
+
+    agregat = (
+        gabungan(RiwayatProduksi).filter(filter_hari)
+        .annotate(jam=TruncHour("waktu_selesai"))
+        .values("jam", "ruangan_id", "nama_produk_id", "satuan")
+        .annotate(
+            total=Sum("jumlah"),
+            batch=Count("id"),
+            release=Count("id", filter=Q(hasil_akhir="Release")),
+            reject=Count("id", filter=Q(hasil_akhir="Reject")),
+        )
+        .order_by()
+    )
+
+    # satu jam bisa muncul dari arsip dan hot sekaligus → dijumlah per kunci
+    per_jam, per_hari = {}, {}
+    for a in agregat:
+        jam = timezone.localtime(a["jam"])
+        bucket = per_jam.setdefault((jam, a["ruangan_id"], a["nama_produk_id"], a["satuan"]), RollupProduksi(
+            periode=RollupProduksi.PERIODE_JAM,
+            awal=jam,
+            ruangan_id=a["ruangan_id"],
+            nama_produk_id=a["nama_produk_id"],
+            satuan=a["satuan"],
+        ))
+        bucket.jumlah += a["total"] or 0
+        bucket.jumlah_batch += a["batch"]
+        bucket.jumlah_release += a["release"]
+        bucket.jumlah_reject += a["reject"]
+        # Rollup harian dijumlah dari rollup jam (tanpa query kedua)
+        kunci = (jam.date(), a["ruangan_id"], a["nama_produk_id"], a["satuan"])
+        hari = per_hari.setdefault(kunci, RollupProduksi(
+            periode=RollupProduksi.PERIODE_HARI,
+            awal=_awal_hari(jam.date()),
+            ruangan_id=a["ruangan_id"],
+            nama_produk_id=a["nama_produk_id"],
+            satuan=a["satuan"],
+        ))
+        hari.jumlah += a["total"] or 0
+        hari.jumlah_batch += a["batch"]
+        hari.jumlah_release += a["release"]
+        hari.jumlah_reject += a["reject"]
+
+    # Hapus bucket lama hari-hari ini (termasuk yang kini kosong), lalu tulis ulang
+    filter_rollup = Q()
+    for tgl in daftar_tanggal:
+        awal = _awal_hari(tgl)
+        filter_rollup |= Q(awal__gte=awal, awal__lt=awal + timedelta(days=1))
+    if ruangan_ids is not None:
+        filter_rollup &= Q(ruangan_id__in=ruangan_ids)
+    RollupProduksi.objects.filter(filter_rollup).delete()
+    RollupProduksi.objects.bulk_create(per_jam.values(), batch_size=500)
+    RollupProduksi.objects.bulk_create(per_hari.values(), batch_size=500)
+    return len(per_jam), len(per_hari)
+
+
+def hitung_ulang_kunci(kunci) -> HasilRollup:
+    """
+    Hitung ulang rollup hanya untuk pasangan (tanggal, ruangan_id) tertentu —
+    dipakai konsumen jurnal (jurnal.py) di dalam transaksinya sendiri.
+    """
+    mulai = time.perf_counter()
+    hasil = HasilRollup()
+    per_tanggal = {}
+    for tgl, ruangan_id in kunci:
+        per_tanggal.setdefault(tgl, set()).add(ruangan_id)
+    for tgl, ruangan_ids in sorted(per_tanggal.items()):
+        jam, harian = _hitung_hari([tgl], ruangan_ids=ruangan_ids)
+        hasil.baris_jam += jam
+        hasil.baris_hari += harian
+    hasil.hari_dihitung = len(per_tanggal)
+    hasil.durasi_ms = (time.perf_counter() - mulai) * 1000
+    return hasil
+
+
+def refresh_rollup(penuh=False) -> HasilRollup:
+    """
+    Perbarui RollupProduksi dari riwayat yang berubah sejak watermark.
+    `penuh=True` menghitung ulang seluruh riwayat (setelah hapus massal, dsb.).
+    """
+    mulai = time.perf_counter()
+    hasil = HasilRollup()
+
+    with transaction.atomic():
+        wm, _ = Watermark.objects.select_for_update().get_or_create(nama=NAMA_WATERMARK)
+
+        # arsip tidak pernah berubah → hanya ikut dibaca saat hitung penuh
+        berubah = gabungan(RiwayatProduksi, arsip=penuh)
+        if wm.nilai and not penuh:
+            berubah = berubah.filter(diperbarui_pada__gt=wm.nilai - TUMPANG_TINDIH)
+
+        nilai_baru = RiwayatProduksi.objects.aggregate(m=Max("diperbarui_pada"))["m"]
+        hari = sorted(set(
+            berubah.annotate(hari=TruncDate("waktu_selesai"))
+            .values_list("hari", flat=True)
+            .distinct()
+        ))
+
+        if penuh:
+            RollupProduksi.objects.all().delete()
+
+        for i in range(0, len(hari), HARI_PER_QUERY):
+            jam, harian = _hitung_hari(hari[i:i + HARI_PER_QUERY])
+            hasil.baris_jam += jam
+            hasil.baris_hari += harian
+        hasil.hari_dihitung = len(hari)
+
+        if nilai_baru and (wm.nilai is None or nilai_baru > wm.nilai):
+            wm.nilai = nilai_baru
+        wm.save()
+
+    hasil.durasi_ms = (time.perf_counter() - mulai) * 1000
+    return hasil
+
+
+def seri_grafik(periode, dari, sampai, ruangan_ids=None, produk_ids=None, kelompok=None):
+    """
+    Deret waktu dari RollupProduksi untuk grafik.
+    `kelompok` = None (total), "ruangan" atau "produk" → satu seri per kelompok.
+    Satuan tidak pernah dijumlah lintas (kg + pcs) → seri juga dipisah per satuan.
+    """
+    qs = RollupProduksi.objects.filter(periode=periode, awal__gte=dari, awal__lt=sampai)
+    if ruangan_ids:
+        qs = qs.filter(ruangan_id__in=ruangan_ids)
+    if produk_ids:
+        qs = qs.filter(nama_produk_id__in=produk_ids)
+
+    kolom_kelompok = {"ruangan": "ruangan_id", "produk": "nama_produk_id"}.get(kelompok)
+    nilai = ["awal"] + ([kolom_kelompok] if kolom_kelompok else []) + ["satuan"]
+    baris = (
+        qs.values(*nilai)
+        .annotate(
+            jumlah=Sum("jumlah"),
+            batch=Sum("jumlah_batch"),
+            release=Sum("jumlah_release"),
+            reject=Sum("jumlah_reject"),
+        )
+        .order_by(*nilai)
+    )
+
+    seri = {}
+    for b in baris:
+        id_kelompok = b[kolom_kelompok] if kolom_kelompok else None
+        s = seri.setdefault((id_kelompok, b["satuan"]), {
+            "kelompok": id_kelompok, "satuan": b["satuan"],
+            "awal": [], "jumlah": [], "batch": [], "release": [], "reject": [],
+        })
+        s["awal"].append(timezone.localtime(b["awal"]))
+        s["jumlah"].append(b["jumlah"])
+        s["batch"].append(b["batch"])
+        s["release"].append(b["release"])
+        s["reject"].append(b["reject"])
+    return list(seri.values())
@@ -0,0 +1,164 @@
+# produksi_monitoring/scanner.py
+"""
+Progress massal dari scanner genggam (ruangan non-Labelling).
+
+Satu unggahan = daftar entri {produksi_id, jumlah_terproses, rid}. Semua
+entri diproses dalam satu transaksi tulis:
+
+1. rid yang sudah pernah diterapkan → "duplikat" (satu query IdempotencyKey)
+2. baris ProsesProduksi terkait dikunci & dibaca sekaligus (satu query)
+3. tiap entri divalidasi berurutan terhadap sisa target (entri berikutnya
+   untuk batch yang sama melihat progress setelah entri sebelumnya)
+4. tulis: satu bulk_update, riwayat batch yang selesai di-upsert bulk,
+   shadow Labelling bulk, event jurnal + IdempotencyKey bulk
+
+Aturan selesai sama dengan views.update_progress: Penimbangan/Filling
+otomatis "Selesai Diproses di …", ruangan yang butuh hasil akhir menunggu
+operator memilih Release/Reject.
+"""
+from dataclasses import dataclass, field
+
+from django.utils.timezone import now
+
+from . import idempotency, jurnal
+from .helpers import ensure_labelling_shadow_bulk
+from .konkurensi import transaksi_tulis
+from .models import ProsesProduksi
+from .realtime import segarkan_ruangan
+from .riwayat import catat_riwayat_bulk
+from .topology import topologi, TAHAP_FILLING, TAHAP_PENIMBANGAN
+
+AKSI_IDEMPOTENSI = "scanner_progress"
+MAKS_ENTRI = 500
+KOLOM_UPDATE = ["progress", "waktu_mulai_produksi", "status", "waktu_selesai"]
+
+
+class EntriTidakValid(ValueError):
+    pass
+
+
+@dataclass
+class HasilScanner:
+    hasil: list = field(default_factory=list)
+
+    @property
+    def ringkasan(self):
+        hitung = {"diterapkan": 0, "duplikat": 0, "ditolak": 0}
+        for h in self.hasil:
+            hitung[h["status"]] += 1
+        return hitung
+
+
+def _parse(entri):
+    """Validasi bentuk entri; return (produksi_id, jumlah, rid) atau raise EntriTidakValid."""
+    if not isinstance(entri, dict):
+        raise EntriTidakValid("entri harus objek")
+    rid = str(entri.get("rid") or "").strip()
+    if not rid or len(rid) > 64:
+        raise EntriTidakValid("rid wajib diisi (maks 64 karakter)")
+    try:
+        produksi_id = int(entri.get("produksi_id"))
+        jumlah = int(entri.get("jumlah_terproses"))
+    except (TypeError, ValueError):
+        raise EntriTidakValid("produksi_id dan jumlah_terproses harus bilangan bulat")
+    if jumlah <= 0:
+        raise EntriTidakValid("jumlah_terproses harus > 0")
+    return produksi_id, jumlah, rid
+
+
+def terapkan_progress_bulk(daftar_entri) -> HasilScanner:
+    if not isinstance(daftar_entri, list):
+        raise EntriTidakValid("entri harus berupa array")
+    if len(daftar_entri) > MAKS_ENTRI:
+        raise EntriTidakValid(f"maksimal {MAKS_ENTRI} entri per unggahan")
+
+    hasil = HasilScanner()
+    valid = []   # (index hasil, produksi_id, jumlah, rid)
+    for entri in daftar_entri:
+        try:
+            produksi_id, jumlah, rid = _parse(entri)
+        except EntriTidakValid as e:
+            hasil.hasil.append({
+                "rid": entri.get("rid") if isinstance(entri, dict) else None,
+                "status": "ditolak", "message": str(e),
+            })
+            continue
+        hasil.hasil.append({"rid": rid, "produksi_id": produksi_id})
+        valid.append((len(hasil.hasil) - 1, produksi_id, jumlah, rid))
+
+    if not valid:
+        return hasil
+
+    with transaksi_tulis():
+        duplikat = idempotency.duplikat_dari({v[3] for v in valid})
+        proses = ProsesProduksi.objects.select_for_update().in_bulk({v[1] for v in valid})
+        topo = topologi(*{p.ruangan_id for p in proses.values()})
+
+        berubah, selesai, sumber_filling, rid_baru = {}, [], {}, set()
+        waktu = now()
+        for idx, produksi_id, jumlah, rid in valid:
+            h = hasil.hasil[idx]
+            if rid in duplikat or rid in rid_baru:
+                h.update(status="duplikat")
+                continue
+            p = proses.get(produksi_id)
+            alasan = _alasan_tolak(p, topo, jumlah)
+            if alasan:
+                h.update(status="ditolak", message=alasan)
+                continue
+
+            p.progress += jumlah
+            p.waktu_mulai_produksi = p.waktu_mulai_produksi or waktu
+            info = topo.ruangan(p.ruangan_id)
+            if info.tahap == TAHAP_FILLING:
+                sumber_filling[p.pk] = p
+
+            butuh_hasil_akhir = False
+            if p.progress >= p.jumlah:
+                p.progress = p.jumlah
+                if topo.butuh_hasil_akhir(p.ruangan_id):
+                    butuh_hasil_akhir = True
+                elif info.tahap in (TAHAP_FILLING, TAHAP_PENIMBANGAN):
+                    p.status = f"Selesai Diproses di {info.nama}"
+                    p.waktu_selesai = waktu
+                    selesai.append(p)
+
+            berubah[p.pk] = p
+            rid_baru.add(rid)
+            h.update(
+                status="diterapkan",
+                progress=p.progress,
+                jumlah=p.jumlah,
+                sisa=p.jumlah - p.progress,
+                selesai=p.status.startswith("Selesai"),
+                butuh_hasil_akhir=butuh_hasil_akhir,
+            )
+
+        if berubah:
+            objs = list(berubah.values())
+            ProsesProduksi.objects.bulk_update(objs, KOLOM_UPDATE, batch_size=500)
+            # bulk_update tidak memicu signal → jurnal, riwayat & papan manual
+            jurnal.catat([
+                e for p in objs
+                for e in jurnal.event_dari_perubahan(p, getattr(p, "_nilai_awal", None), False)
+            ])
+            catat_riwayat_bulk([(p, "Release") for p in selesai], push=False)
+            if sumber_filling:
+                ensure_labelling_shadow_bulk(list(sumber_filling.values()))
+            idempotency.simpan_bulk(rid_baru, AKSI_IDEMPOTENSI)
+            segarkan_ruangan({p.ruangan_id for p in objs})
+
+    return hasil
+
+
+def _alasan_tolak(p, topo, jumlah):
+    if p is None:
+        return "batch tidak ditemukan"
+    if topo.is_labelling(p.ruangan_id):
+        return "ruang Labelling memakai input jumlah kemasan"
+    if p.status.startswith("Selesai") or p.status == "Menunggu Verifikasi Admin":
+        return "batch sudah selesai di ruangan ini"
+    sisa = p.jumlah - p.progress
+    if jumlah > sisa:
+        return f"jumlah terproses ({jumlah}) melebihi sisa target produksi ({sisa})"
+    return None
@@ -0,0 +1,181 @@
+# produksi_monitoring/scheduler.py
+import heapq
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import OperationalError
+from django.utils.timezone import now
+
+from . import jurnal, papan_cache
+from .konkurensi import error_terkunci, retry_terkunci, transaksi_tulis
+from .models import EventBatch, ProsesProduksi
+from .helpers import ensure_labelling_shadow_bulk
+from .realtime import segarkan_ruangan
+from .topology import topologi, TAHAP_FILLING, TAHAP_LABELLING
+
+
+@dataclass
+class HasilAutoStart:
+    dipromosikan: int = 0
+    shadow_dibuat: int = 0
+    durasi_ms: float = 0.0
+
+    def __str__(self):
+        return (
+            f"{self.dipromosikan} batch dimulai, "
+            f"{self.shadow_dibuat} shadow Labelling dibuat ({self.durasi_ms:.1f} ms)"
+        )
+
+
+def batch_jatuh_tempo(waktu=None):
+    """Batch 'Menunggu' yang waktu_mulai_produksi-nya sudah lewat (di luar Labelling)."""
+    return (
+        ProsesProduksi.objects
+        .filter(status="Menunggu", waktu_mulai_produksi__lte=waktu or now())
+        .exclude(ruangan_id__in=topologi().ids(TAHAP_LABELLING))
+    )
+
+
+def jalankan_auto_start(waktu=None) -> HasilAutoStart:
+    """
+    Promosikan semua batch jatuh tempo: Menunggu → Sedang Diproses.
+
+    - Satu UPDATE berbasis set (tanpa save() per baris)
+    - Shadow Labelling untuk batch dari Filling dibuat sekaligus (bulk)
+    Dijalankan dari management command / penjadwal, BUKAN dari request halaman.
+    """
+    mulai = time.perf_counter()
+    waktu = waktu or now()
+    hasil = HasilAutoStart()
+
+    with transaksi_tulis():
+        qs = batch_jatuh_tempo(waktu)
+
+        # Kandidat shadow diambil sebelum UPDATE (hanya baris dari Filling)
+        sumber_filling = list(
+            qs.filter(ruangan_id__in=topologi().ids(TAHAP_FILLING))
+            .only(
+                "nomor_batch", "nama", "jumlah", "satuan",
+                "estimasi_jumlah_kemasan", "satuan_kemasan", "ruangan",
+            )
+        )
+
+        # transaksi tulis (BEGIN IMMEDIATE) → daftar ini = baris yang di-UPDATE
+        dipromosikan = list(qs.values_list("id", "nomor_batch", "ruangan_id"))
+        ruangan_terdampak = {r[2] for r in dipromosikan}
+
+        # waktu_mulai_produksi sudah terisi (filter __lte), cukup ganti status
+        hasil.dipromosikan = qs.update(status="Sedang Diproses")
+        jurnal.catat_bulk(
+            EventBatch.MULAI, dipromosikan,
+            data={"dari": "Menunggu", "ke": "Sedang Diproses", "otomatis": True},
+        )
+
+        # UPDATE massal tidak memicu signal → minta papan ruangan terkait memuat ulang
+        if hasil.dipromosikan:
+            segarkan_ruangan(ruangan_terdampak)
+
+        if sumber_filling:
+            hasil.shadow_dibuat = ensure_labelling_shadow_bulk(sumber_filling)
+
+    hasil.durasi_ms = (time.perf_counter() - mulai) * 1000
+    return hasil
+
+
+# --- penjadwal (daemon) -------------------------------------------------------
+# Min-heap waktu mulai terjadwal batch 'Menunggu'; tidur sampai waktu terdekat
+# lalu jalankan_auto_start() (satu UPDATE untuk semua ruangan). Perubahan batch
+# dari proses lain terlihat lewat versi papan per ruangan (papan_cache) yang
+# diganti setelah commit setiap tulis → jadwal dibaca ulang hanya bila berubah.
+CEK_DETIK = 1.0
+BATAS_JADWAL = 1000
+
+
+def jadwal_menunggu(batas=BATAS_JADWAL):
+    """Waktu mulai unik (terurut) batch 'Menunggu' yang terjadwal, termasuk yang sudah lewat."""
+    return list(
+        ProsesProduksi.objects
+        .filter(status="Menunggu", waktu_mulai_produksi__isnull=False)
+        .exclude(ruangan_id__in=topologi().ids(TAHAP_LABELLING))
+        .order_by("waktu_mulai_produksi")
+        .values_list("waktu_mulai_produksi", flat=True)
+        .distinct()[:batas]
+    )
+
+
+def sidik_perubahan():
+    """Versi papan semua ruangan; berubah setiap ada tulis batch yang ter-commit."""
+    return tuple(sorted((i, papan_cache.versi(i)) for i in topologi().per_id))
+
+
+class PenjadwalAutoStart:
+    """
+    Loop auto-start jangka panjang. `berhenti` (threading.Event) di-set dari
+    handler SIGTERM/SIGINT; tunggu() memakai Event.wait sehingga berhenti
+    seketika, di luar transaksi.
+    """
+
+    def __init__(self, cek_detik=CEK_DETIK, log=None):
+        self.cek_detik = cek_detik
+        self.log = log or (lambda pesan: None)
+        self.berhenti = threading.Event()
+        self.heap = []
+        self.sidik = None
+        self.siklus = 0
+        self.total_dipromosikan = 0
+
+    def muat_jadwal(self):
+        mulai = time.perf_counter()
+        self.sidik = sidik_perubahan()
+        self.heap = jadwal_menunggu()
+        heapq.heapify(self.heap)
+        terdekat = self.heap[0].isoformat() if self.heap else "-"
+        self.log(
+            f"jadwal dimuat: {len(self.heap)} waktu mulai, terdekat {terdekat} "
+            f"({(time.perf_counter() - mulai) * 1000:.1f} ms)"
+        )
+
+    @retry_terkunci()
+    def _promosikan(self, waktu):
+        return jalankan_auto_start(waktu)
+
+    def promosikan(self):
+        """Keluarkan semua waktu jatuh tempo dari heap lalu satu kali auto-start; False bila tertunda."""
+        waktu = now()
+        while self.heap and self.heap[0] <= waktu:
+            heapq.heappop(self.heap)
+        try:
+            hasil = self._promosikan(waktu)
+        except OperationalError as exc:
+            if not error_terkunci(exc):
+                raise
+            # tetap terkunci setelah retry → coba lagi di cek berikutnya
+            self.log(f"database terkunci, auto-start ditunda: {exc}")
+            heapq.heappush(self.heap, waktu + timedelta(seconds=self.cek_detik))
+            return False
+        self.siklus += 1
+        self.total_dipromosikan += hasil.dipromosikan
+        self.log(f"siklus {self.siklus}: {hasil}")
+        return True
+
+    def tunggu(self):
+        """Detik tidur sampai waktu terdekat, dibatasi interval cek perubahan."""
+        if not self.heap:
+            return self.cek_detik
+        return max(0.0, min(self.cek_detik, (self.heap[0] - now()).total_seconds()))
+
+    def jalankan(self):
+        self.muat_jadwal()
+        while not self.berhenti.is_set():
+            if self.heap and self.heap[0] <= now():
+                # UPDATE sendiri ikut mengganti versi papan (dan heap bisa
+                # terpotong BATAS_JADWAL) → jadwal dibaca ulang setelah promosi
+                if self.promosikan():
+                    self.muat_jadwal()
+                continue
+            if self.berhenti.wait(self.tunggu()):
+                break
+            if sidik_perubahan() != self.sidik:
+                self.muat_jadwal()
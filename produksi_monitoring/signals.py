@@ -0,0 +1,97 @@
+# produksi_monitoring/signals.py
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import ProsesProduksi, RiwayatProduksi, Ruangan, Operator, ItemDescription
+from . import jurnal, katalog, papan_cache, realtime, topology
+
+# field model → kunci di payload realtime.data_proses()
+_KUNCI_PAYLOAD = {
+    "progress": ("progress", "progress_persen"),
+    "jumlah": ("jumlah", "progress_persen"),
+    "operator_id": ("operator",),
+}
+
+
+def _nilai_sekarang(instance):
+    return {f: getattr(instance, f) for f in ProsesProduksi.FIELD_DIPANTAU}
+
+
+@receiver(post_save, sender=ProsesProduksi)
+def push_proses_disimpan(sender, instance, created, **kwargs):
+    awal = getattr(instance, "_nilai_awal", None)
+    sekarang = _nilai_sekarang(instance)
+    instance._nilai_awal = sekarang
+
+    # jurnal event: masih di dalam transaksi save() (lihat ProsesProduksi.save)
+    jurnal.catat(jurnal.event_dari_perubahan(instance, awal, created))
+
+    pesan = {"tipe": "proses", "aksi": "simpan", "id": instance.pk}
+
+    if created or not awal:
+        realtime.kirim_ke_ruangan([instance.ruangan_id], {**pesan, "data": realtime.data_proses(instance)})
+        return
+
+    berubah = [f for f, v in sekarang.items() if f in awal and awal[f] != v]
+    if not berubah:
+        return
+
+    ruangan_lama = awal.get("ruangan_id")
+    if ruangan_lama and ruangan_lama != instance.ruangan_id:
+        # Batch pindah ruangan → hilang dari papan lama, muncul utuh di papan baru
+        realtime.kirim_ke_ruangan([ruangan_lama], {"tipe": "proses", "aksi": "hapus", "id": instance.pk})
+        realtime.kirim_ke_ruangan([instance.ruangan_id], {**pesan, "data": realtime.data_proses(instance)})
+        return
+
+    if "status" in berubah:
+        # Pindah tabel (Menunggu → Diproses → ...) → kirim baris lengkap
+        data = realtime.data_proses(instance)
+    else:
+        kunci = set()
+        for f in berubah:
+            kunci.update(_KUNCI_PAYLOAD.get(f, (f,)))
+        data = realtime.data_proses(instance, fields=kunci)
+    realtime.kirim_ke_ruangan([instance.ruangan_id], {**pesan, "data": data})
+
+
+@receiver(post_delete, sender=ProsesProduksi)
+def push_proses_dihapus(sender, instance, **kwargs):
+    realtime.kirim_ke_ruangan([instance.ruangan_id], {"tipe": "proses", "aksi": "hapus", "id": instance.pk})
+
+
+@receiver(post_save, sender=RiwayatProduksi)
+def push_riwayat_disimpan(sender, instance, created, **kwargs):
+    realtime.kirim_ke_ruangan([instance.ruangan_id], {
+        "tipe": "riwayat",
+        "aksi": "simpan",
+        "id": instance.pk,
+        "data": realtime.data_riwayat(instance),
+    })
+
+
+@receiver(post_delete, sender=RiwayatProduksi)
+def push_riwayat_dihapus(sender, instance, **kwargs):
+    realtime.kirim_ke_ruangan([instance.ruangan_id], {"tipe": "riwayat", "aksi": "hapus", "id": instance.pk})
+
+
+@receiver(post_save, sender=Ruangan)
+@receiver(post_delete, sender=Ruangan)
+def invalidate_topologi(sender, **kwargs):
+    topology.invalidate()
+    transaction.on_commit(papan_cache.naikkan_semua)
+
+
+@receiver(post_save, sender=Operator)
+@receiver(post_delete, sender=Operator)
+@receiver(post_save, sender=ItemDescription)
+@receiver(post_delete, sender=ItemDescription)
+def segarkan_cache_papan(sender, **kwargs):
+    # nama operator / produk tampil di semua papan
+    transaction.on_commit(papan_cache.naikkan_semua)
+
+
+@receiver(post_save, sender=ItemDescription)
+@receiver(post_delete, sender=ItemDescription)
+def invalidate_katalog(sender, **kwargs):
+    katalog.invalidate()
@@ -0,0 +1,45 @@
+# produksi_monitoring/sqlite_produksi/base.py
+"""
+Backend SQLite untuk produksi (ENGINE = "produksi_monitoring.sqlite_produksi").
+
+- PRAGMA diset setiap koneksi baru dibuka: WAL (pembaca tidak memblokir
+  penulis), synchronous=NORMAL (aman di WAL), cache & mmap lebih besar.
+  Bisa ditimpa lewat kunci "PRAGMA" di settings DATABASES.
+- `begin_immediate`: bila True, transaksi berikutnya dibuka dengan
+  BEGIN IMMEDIATE → kunci tulis diambil di awal. SQLite mengabaikan
+  select_for_update, jadi inilah pengganti lock baris; sekaligus mencegah
+  deadlock "database is locked" saat transaksi DEFERRED naik dari baca ke
+  tulis. Dipakai lewat konkurensi.transaksi_tulis().
+- OPTIONS["transaction_mode"] (Django 5.1+) tetap dihormati untuk semua
+  transaksi lain; `begin_immediate` hanya menaikkan DEFERRED/bawaan ke
+  IMMEDIATE (EXCLUSIVE sudah lebih kuat dan dibiarkan).
+"""
+from django.db.backends.sqlite3 import base
+
+PRAGMA_BAWAAN = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -20000,           # KiB (negatif) → ±20 MB per koneksi
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.begin_immediate = False
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        pragma = {**PRAGMA_BAWAAN, **self.settings_dict.get("PRAGMA", {})}
+        for nama, nilai in pragma.items():
+            conn.execute(f"PRAGMA {nama} = {nilai}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        # Django < 5.1 tidak punya transaction_mode → selalu None
+        mode = getattr(self, "transaction_mode", None)
+        if self.begin_immediate and mode in (None, "DEFERRED"):
+            mode = "IMMEDIATE"
+        self.cursor().execute(f"BEGIN {mode}" if mode else "BEGIN")
@@ -0,0 +1,151 @@
+# produksi_monitoring/stress_sqlite.py
+"""
+Uji tekanan tulis konkuren SQLite: mode bawaan vs mode produksi.
+
+Setiap mode memakai file database sementara sendiri (alias koneksi
+terpisah) dengan beban yang meniru update_progress: baca progress →
+tulis progress+n → sisipkan baris riwayat, dalam satu transaksi, dari
+banyak thread sekaligus.
+
+- bawaan  : ENGINE django.db.backends.sqlite3, journal rollback, BEGIN
+            DEFERRED, timeout 5 s, tanpa retry
+- produksi: ENGINE sqlite_produksi (WAL + pragma), BEGIN IMMEDIATE,
+            timeout 20 s, retry_terkunci
+
+Dilaporkan: throughput, transaksi gagal "database is locked", update yang
+hilang (nilai akhir ≠ jumlah transaksi sukses) dan latensi p50/p95.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+from .instrumentasi import _persentil
+from .konkurensi import error_terkunci, retry_terkunci, transaksi_tulis
+
+MODE = {
+    "bawaan": {"ENGINE": "django.db.backends.sqlite3", "OPTIONS": {"timeout": 5}},
+    "produksi": {"ENGINE": "produksi_monitoring.sqlite_produksi", "OPTIONS": {"timeout": 20}},
+}
+
+
+@dataclass
+class HasilStress:
+    mode: str
+    thread: int
+    sukses: int = 0
+    gagal_terkunci: int = 0
+    update_hilang: int = 0
+    durasi_detik: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+
+    @property
+    def throughput(self):
+        return self.sukses / self.durasi_detik if self.durasi_detik else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.mode:<9} {self.thread} thread: {self.throughput:8.1f} trx/s, "
+            f"{self.sukses} sukses, {self.gagal_terkunci} gagal terkunci, "
+            f"{self.update_hilang} update hilang, p50 {self.p50_ms:.1f} ms, p95 {self.p95_ms:.1f} ms"
+        )
+
+
+def _daftarkan_alias(alias, mode, path):
+    cfg = {**MODE[mode], "NAME": path}
+    # configure_settings melengkapi default (ATOMIC_REQUESTS, TIME_ZONE, ...)
+    lengkap = connections.configure_settings({
+        DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS], alias: cfg,
+    })
+    connections.settings[alias] = lengkap[alias]
+
+
+def _siapkan_tabel(alias):
+    conn = connections[alias]
+    with conn.cursor() as cursor:
+        cursor.execute("CREATE TABLE stress_proses (id INTEGER PRIMARY KEY, progress INTEGER NOT NULL)")
+        cursor.execute(
+            "CREATE TABLE stress_riwayat (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "proses_id INTEGER NOT NULL, jumlah INTEGER NOT NULL, dicatat REAL NOT NULL)"
+        )
+        cursor.execute("INSERT INTO stress_proses (id, progress) VALUES (1, 0)")
+    conn.close()
+
+
+def _transaksi(alias, kerja_detik):
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT progress FROM stress_proses WHERE id = 1")
+        progress = cursor.fetchone()[0]
+        if kerja_detik:
+            time.sleep(kerja_detik)     # kerja Python di antara baca & tulis
+        cursor.execute("UPDATE stress_proses SET progress = %s WHERE id = 1", [progress + 1])
+        cursor.execute(
+            "INSERT INTO stress_riwayat (proses_id, jumlah, dicatat) VALUES (1, 1, %s)", [time.time()]
+        )
+
+
+def jalankan_mode(mode, thread=8, operasi=200, kerja_ms=1.0):
+    """Jalankan `operasi` transaksi per thread di mode tersebut. Return HasilStress."""
+    direktori = tempfile.mkdtemp(prefix="stress_sqlite_")
+    alias = f"stress_{mode}"
+    _daftarkan_alias(alias, mode, os.path.join(direktori, "stress.sqlite3"))
+    _siapkan_tabel(alias)
+
+    kerja = kerja_ms / 1000
+    if mode == "produksi":
+        @retry_terkunci(using=alias)
+        def satu():
+            with transaksi_tulis(using=alias):
+                _transaksi(alias, kerja)
+    else:
+        def satu():
+            with transaction.atomic(using=alias):
+                _transaksi(alias, kerja)
+
+    hasil = HasilStress(mode=mode, thread=thread)
+    latensi, kunci = [], threading.Lock()
+
+    def pekerja():
+        lokal_lat, sukses, gagal = [], 0, 0
+        try:
+            for _ in range(operasi):
+                t0 = time.perf_counter()
+                try:
+                    satu()
+                    sukses += 1
+                except OperationalError as exc:
+                    if not error_terkunci(exc):
+                        raise
+                    gagal += 1
+                lokal_lat.append((time.perf_counter() - t0) * 1000)
+        finally:
+            connections[alias].close()
+        with kunci:
+            latensi.extend(lokal_lat)
+            hasil.sukses += sukses
+            hasil.gagal_terkunci += gagal
+
+    try:
+        daftar = [threading.Thread(target=pekerja) for _ in range(thread)]
+        mulai = time.perf_counter()
+        for t in daftar:
+            t.start()
+        for t in daftar:
+            t.join()
+        hasil.durasi_detik = time.perf_counter() - mulai
+
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT progress FROM stress_proses WHERE id = 1")
+            hasil.update_hilang = hasil.sukses - cursor.fetchone()[0]
+        hasil.p50_ms = round(_persentil(latensi, 50) or 0, 2)
+        hasil.p95_ms = round(_persentil(latensi, 95) or 0, 2)
+    finally:
+        connections[alias].close()
+        del connections.settings[alias]
+        shutil.rmtree(direktori, ignore_errors=True)
+    return hasil
@@ -0,0 +1,204 @@
+# produksi_monitoring/topology.py
+"""
+Registry topologi ruangan/tahap (in-memory, satu per proses).
+
+Menggantikan pencocokan nama ruangan (`"labell" in nama`, `nama__icontains=...`)
+di jalur panas: slug → ruangan, ruangan → tahap, ruangan → tahap berikutnya
+semuanya O(1) dari dict. Ruangan disimpan/dihapus (signals.py) memanggil
+invalidate(): registry lokal dibuang dan token versi di cache bersama
+diganti setelah commit, sehingga worker lain ikut membangun ulang paling
+lambat CEK_VERSI_DETIK kemudian (pola yang sama dengan katalog.py).
+"""
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+
+# Tahap = nilai Ruangan.jenis_proses
+TAHAP_PENIMBANGAN = "weighing"
+TAHAP_PROSES = "processing"
+TAHAP_MIXING = "mixing"
+TAHAP_FILLING = "filling"
+TAHAP_LABELLING = "labelling"
+
+# Ruangan yang butuh keputusan Release/Reject (dulu: "proses" in nama)
+TAHAP_DENGAN_HASIL_AKHIR = (TAHAP_PROSES, TAHAP_MIXING)
+
+# Ruangan lama dibuat dengan jenis_proses default ('mixing') walau namanya
+# "Penimbangan"/"Filling"/dst. Untuk baris seperti itu tahap diturunkan dari
+# nama — sekali saat registry dibangun, bukan per request. Bila tidak ada
+# kata kunci yang cocok, ruangan TIDAK punya tahap (None): nilai default
+# bukan pilihan sadar, jadi tidak dianggap ruang proses (butuh_hasil_akhir)
+# seperti pencocokan nama lama.
+_JENIS_DEFAULT = TAHAP_MIXING
+_KATA_KUNCI_NAMA = (
+    ("labell", TAHAP_LABELLING),
+    ("fill", TAHAP_FILLING),
+    ("penimbangan", TAHAP_PENIMBANGAN),
+    ("timbang", TAHAP_PENIMBANGAN),
+    ("proses", TAHAP_PROSES),
+    ("mixing", TAHAP_MIXING),
+)
+
+KUNCI_VERSI = "topologi_ruangan:versi"
+CEK_VERSI_DETIK = 2
+
+
+@dataclass(frozen=True)
+class InfoRuangan:
+    id: int
+    nama: str
+    slug: str
+    tahap: Optional[str]
+    tahap_berikutnya_id: Optional[int]
+
+    def __str__(self):
+        return self.nama
+
+
+def _tahap_dari_baris(jenis_proses, nama):
+    if jenis_proses and jenis_proses != _JENIS_DEFAULT:
+        return jenis_proses
+    nama = (nama or "").lower()
+    for kata, tahap in _KATA_KUNCI_NAMA:
+        if kata in nama:
+            return tahap
+    return None
+
+
+class TopologiRuangan:
+    def __init__(self, baris, versi=None):
+        self.versi = versi
+        self.per_id = {}
+        self.per_slug = {}
+        self.per_tahap = {}
+        for r in baris:
+            info = InfoRuangan(
+                id=r["id"],
+                nama=r["nama"],
+                slug=r["slug"],
+                tahap=_tahap_dari_baris(r["jenis_proses"], r["nama"]),
+                tahap_berikutnya_id=r["tahap_berikutnya_id"],
+            )
+            self.per_id[info.id] = info
+            self.per_slug[info.slug] = info
+            if info.tahap:
+                self.per_tahap.setdefault(info.tahap, []).append(info)
+
+    # --- lookup dasar ---
+    def ruangan(self, ruangan_id) -> Optional[InfoRuangan]:
+        return self.per_id.get(ruangan_id)
+
+    def dari_slug(self, slug) -> Optional[InfoRuangan]:
+        return self.per_slug.get(slug)
+
+    def tahap(self, ruangan_id) -> Optional[str]:
+        info = self.per_id.get(ruangan_id)
+        return info.tahap if info else None
+
+    def berikutnya(self, ruangan_id) -> Optional[InfoRuangan]:
+        info = self.per_id.get(ruangan_id)
+        return self.per_id.get(info.tahap_berikutnya_id) if info else None
+
+    # --- lookup per tahap ---
+    def ruangan_tahap(self, *tahap):
+        return [info for t in tahap for info in self.per_tahap.get(t, [])]
+
+    def ids(self, *tahap):
+        return [info.id for info in self.ruangan_tahap(*tahap)]
+
+    def pertama(self, tahap) -> Optional[InfoRuangan]:
+        daftar = self.per_tahap.get(tahap)
+        return daftar[0] if daftar else None
+
+    # --- predikat yang dulu memakai string matching ---
+    def is_labelling(self, ruangan_id) -> bool:
+        return self.tahap(ruangan_id) == TAHAP_LABELLING
+
+    def is_filling(self, ruangan_id) -> bool:
+        return self.tahap(ruangan_id) == TAHAP_FILLING
+
+    def is_penimbangan(self, ruangan_id) -> bool:
+        return self.tahap(ruangan_id) == TAHAP_PENIMBANGAN
+
+    def butuh_hasil_akhir(self, ruangan_id) -> bool:
+        return self.tahap(ruangan_id) in TAHAP_DENGAN_HASIL_AKHIR
+
+    def ruangan_labelling_untuk(self, ruangan_id) -> Optional[InfoRuangan]:
+        """Tujuan shadow Labelling: tahap berikutnya bila Labelling, selain itu Labelling pertama."""
+        nxt = self.berikutnya(ruangan_id)
+        if nxt and nxt.tahap == TAHAP_LABELLING:
+            return nxt
+        return self.pertama(TAHAP_LABELLING)
+
+
+_lock = threading.Lock()
+_topologi = None
+_cek_terakhir = 0.0
+
+
+def _kenal(topo, ruangan_ids):
+    return all(i in topo.per_id for i in ruangan_ids if i)
+
+
+def _segar(topo, ruangan_ids):
+    """Registry lokal boleh dipakai tanpa membaca versi bersama."""
+    return (
+        topo is not None
+        and time.monotonic() - _cek_terakhir < CEK_VERSI_DETIK
+        and _kenal(topo, ruangan_ids)
+    )
+
+
+def _versi_bersama():
+    return cache.get(KUNCI_VERSI)
+
+
+def topologi(*ruangan_ids) -> TopologiRuangan:
+    """
+    Registry aktif; dibangun (1 query) saat pertama dipakai, setelah
+    invalidasi, atau bila versi bersama berubah. `ruangan_ids` opsional:
+    bila ada id yang belum dikenal (mis. ruangan baru dibuat di worker lain
+    sebelum versinya terbaca), registry dibangun ulang sekali.
+    """
+    global _topologi, _cek_terakhir
+    topo = _topologi
+    if _segar(topo, ruangan_ids):
+        return topo
+    versi = _versi_bersama()
+    with _lock:
+        _cek_terakhir = time.monotonic()
+        topo = _topologi
+        if topo is None or topo.versi != versi or not _kenal(topo, ruangan_ids):
+            from .models import Ruangan
+
+            baris = Ruangan.objects.order_by("id").values(
+                "id", "nama", "slug", "jenis_proses", "tahap_berikutnya_id"
+            )
+            _topologi = TopologiRuangan(baris, versi=versi)
+        return _topologi
+
+
+async def atopologi(*ruangan_ids) -> TopologiRuangan:
+    """Untuk view async: registry segar dikembalikan langsung, selain itu dicek/dibangun di thread sync."""
+    topo = _topologi
+    if _segar(topo, ruangan_ids):
+        return topo
+    return await sync_to_async(topologi)(*ruangan_ids)
+
+
+def _naikkan_versi():
+    cache.set(KUNCI_VERSI, uuid.uuid4().hex, None)
+
+
+def invalidate():
+    """Buang registry lokal; worker lain menyusul lewat versi bersama setelah commit."""
+    global _topologi
+    with _lock:
+        _topologi = None
+    transaction.on_commit(_naikkan_versi)
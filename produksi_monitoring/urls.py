@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, views_async
 from .views import (
     dashboard,
     monitoring_produksi_per_ruangan,
@@ -17,9 +17,26 @@ urlpatterns = [
     # Dashboard & data
     path("", dashboard, name="dashboard"),
     path("get_produksi_data/", views.get_produksi_data, name="get_produksi_data"),
+    path("api/status-batch/", views.api_status_batch, name="api_status_batch"),
+
+    # Versi async jalur baca (ASGI) — lihat views_async.py
+    path("async/", views_async.dashboard, name="dashboard_async"),
+    path("async/get_produksi_data/", views_async.get_produksi_data, name="get_produksi_data_async"),
+    path("async/api/status-batch/", views_async.api_status_batch, name="api_status_batch_async"),
+    path("async/monitoring/", views_async.monitoring_index, name="monitoring_index_async"),
 
     # Monitoring index (harus sebelum slug)
     path("monitoring/", views.monitoring_index, name="monitoring_index"),
+    path("ringkasan/", views.ringkasan_pabrik_view, name="ringkasan_pabrik"),
+    path("api/ringkasan-pabrik/", views.api_ringkasan_pabrik, name="api_ringkasan_pabrik"),
+    path("api/grafik/produksi/", views.api_grafik_produksi, name="api_grafik_produksi"),
+    path("api/analitik/siklus/", views.api_analitik_siklus, name="api_analitik_siklus"),
+    path("api/analitik/harian/", views.api_analitik_harian, name="api_analitik_harian"),
+    path("api/batch/<str:nomor_batch>/event/", views.api_event_batch, name="api_event_batch"),
+    path("api/scanner/progress/", views.api_progress_scanner, name="api_progress_scanner"),
+    path("api/produk/cari/", views.api_cari_produk, name="api_cari_produk"),
+    path("api/cari/", views.api_cari_batch, name="api_cari_batch"),
+    path("ekspor/", views.ekspor_produksi, name="ekspor_produksi"),
 
     # ---- STATIC SUBPATHS di bawah /monitoring/ (HARUS sebelum slug!) ----
     path(
@@ -64,4 +81,15 @@ urlpatterns = [
         views.update_progress_labelling,
         name="update_progress_labelling",
     ),
+    path(
+        "idempotency/statistik/",
+        views.idempotency_statistik,
+        name="idempotency_statistik",
+    ),
+    path(
+        "papan/statistik/",
+        views.papan_statistik,
+        name="papan_statistik",
+    ),
+    path("instrumentasi/", views.instrumentasi_view, name="instrumentasi"),
 ]
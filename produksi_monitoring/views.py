@@ -1,42 +1,86 @@
-from datetime import timedelta
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
 
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
-from django.utils.timezone import now
+from django.utils.timezone import now, make_aware, localtime
 from django.urls import reverse
-from django.utils.text import slugify
-from django.http import JsonResponse, HttpResponseRedirect
+from django.http import FileResponse, JsonResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.views.decorators.cache import cache_control
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.views.decorators.http import require_POST
-from django.db import transaction
+from django.views.decorators.http import require_POST, condition
 from django.db.models import F, Q
-from .models import Ruangan, ProsesProduksi, Operator, RiwayatProduksi, IdempotencyKey, Operator
+from .models import Ruangan, ProsesProduksi, Operator, RiwayatProduksi, RollupProduksi, ItemDescription
+from . import analitik, arsip, idempotency, instrumentasi, jurnal, katalog, papan_cache, pencarian
 import uuid
-from .helpers import ensure_labelling_shadow_from
+from .helpers import ensure_labelling_shadow_from, parse_waktu
+from .riwayat import catat_riwayat
+from .pemindahan import pindahkan_batch
+from .scanner import terapkan_progress_bulk, EntriTidakValid
+from .konkurensi import transaksi_tulis, retry_terkunci
+from .feed import FeedStatusBatch, FeedError
+from .ekspor import EksporProduksi, FilterEksporError, FORMAT_XLSX
+from .rollup import seri_grafik
+from .ringkasan import ringkasan_pabrik, umur_menunggu, STATUS_MENUNGGU, STATUS_AKTIF
+from .topology import topologi, TAHAP_PENIMBANGAN, TAHAP_PROSES, TAHAP_MIXING, TAHAP_FILLING, TAHAP_LABELLING
+
+
+def _redirect_ruangan(ruangan_id):
+    """Kembali ke halaman monitoring ruangan; slug diambil dari topologi (tanpa query)."""
+    return redirect(reverse("monitoring_per_ruangan", args=[topologi(ruangan_id).ruangan(ruangan_id).slug]))
+
+
+def _kirim_pesan(request, pesan):
+    """
+    Kirim pesan [(level, teks)] yang dikumpulkan di dalam transaksi tulis.
+    Dipanggil SETELAH transaksi: retry_terkunci mengulang seluruh view,
+    pesan yang sudah di-queue di percobaan gagal akan tampil dobel.
+    """
+    for level, teks in pesan:
+        messages.add_message(request, level, teks)
 
 def get_produksi_data(request):
-    qs = (
-        ProsesProduksi.objects
-        .filter(ruangan__nama__iexact="Penimbangan")
-        .select_related("nama", "operator")  # FK prefetch ke 1 query
-        .only(
-            "nomor_batch", "jumlah", "waktu_selesai", "hasil_akhir",
-            "nama__description", "operator__nama"
+    """
+    Feed lama (array JSON) — default Ruang Penimbangan, bisa ?ruangan=<slug>,...
+    Dibaca via values_list() dan di-stream, tidak lagi membangun list instance.
+    """
+    penimbangan = topologi().pertama(TAHAP_PENIMBANGAN)
+    try:
+        feed = FeedStatusBatch(
+            request.GET,
+            ruangan_default=[penimbangan.slug] if penimbangan else [],
+            kolom_default=("nomor_batch", "nama_produk", "jumlah", "waktu_selesai", "operator", "hasil_akhir"),
+            tanpa_batas=True,
         )
-    )
+    except FeedError as e:
+        return JsonResponse({"ok": False, "message": str(e)}, status=400)
+    if not feed.ruangan_ids:
+        return JsonResponse([], safe=False)
+    return StreamingHttpResponse(feed.stream_json_list(), content_type="application/json")
 
-    data = []
-    for p in qs:
-        data.append({
-            "nomor_batch": p.nomor_batch,
-            "nama_produk": p.nama.description if p.nama_id else None,
-            "jumlah": p.jumlah,
-            "waktu_selesai": p.waktu_selesai,          # JsonResponse pakai DjangoJSONEncoder → OK
-            "operator": p.operator.nama if p.operator_id else None,
-            "hasil_akhir": p.hasil_akhir,
-        })
 
-    return JsonResponse(data, safe=False)
+def api_status_batch(request):
+    """
+    Feed status batch multi-ruangan untuk MES.
+
+    Query: ruangan=<slug,..> status=<..,..> dari/sampai=<ISO> fields=<..,..>
+           limit=<n> cursor=<next_cursor> urutan=asc|desc format=json|ndjson
+    """
+    try:
+        feed = FeedStatusBatch(request.GET)
+    except FeedError as e:
+        return JsonResponse({"ok": False, "message": str(e)}, status=400)
+
+    if request.GET.get("format") == "ndjson":
+        return StreamingHttpResponse(feed.stream_ndjson(), content_type="application/x-ndjson")
+    return StreamingHttpResponse(feed.stream_json(), content_type="application/json")
 
 
 
@@ -51,46 +95,69 @@ from django.shortcuts import get_object_or_404, render
 from django.utils.timezone import now
 from datetime import timedelta
 
+def _peran(request):
+    """Peran yang menentukan tombol aksi di papan (bagian dari kunci cache)."""
+    if not hasattr(request, "_peran_papan"):
+        if request.user.is_superuser:
+            request._peran_papan = "superuser"
+        elif request.user.groups.filter(name__iexact='operator').exists():
+            request._peran_papan = "operator"
+        else:
+            request._peran_papan = "umum"
+    return request._peran_papan
+
+
+def _limit_riwayat(request):
+    limit = request.GET.get('limit', '10')
+    if limit == 'semua' or limit.isdigit():
+        return limit
+    return '10'
+
+
+def _etag_ruangan(request, ruangan_slug):
+    info = topologi().dari_slug(ruangan_slug)
+    if not info:
+        return None
+    versi = papan_cache.versi(info.id)
+    return f"{info.id}-{versi}-{_limit_riwayat(request)}-{_peran(request)}-{request.user.pk}"
+
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_etag_ruangan)
 def monitoring_produksi_per_ruangan(request, ruangan_slug):
     ruangan = get_object_or_404(Ruangan, slug=ruangan_slug)
-    is_operator = request.user.groups.filter(name__iexact='operator').exists()
+    topo = topologi(ruangan.id)
+    peran = _peran(request)
+    limit = _limit_riwayat(request)
 
-    auto_qs = (
-        ProsesProduksi.objects
-        .filter(status="Menunggu", waktu_mulai_produksi__lte=now())
-        .exclude(ruangan__nama__icontains="labell")
-        .select_related("ruangan")
-    )
+    # Auto-start "Menunggu → Sedang Diproses" TIDAK lagi dijalankan di sini;
+    # lihat scheduler.jalankan_auto_start() / daemon `penjadwal_auto_start`.
+    # Halaman ini hanya membaca.
 
-    for p in auto_qs:
-        p.status = "Sedang Diproses"
-        if not p.waktu_mulai_produksi:
-            p.waktu_mulai_produksi = now()
-        p.save(update_fields=["status", "waktu_mulai_produksi"])
+    # Versi dibaca SEBELUM data → fragmen tidak pernah lebih tua dari kuncinya
+    kunci = papan_cache.kunci_fragmen(ruangan.id, papan_cache.versi(ruangan.id), limit, peran)
+    html = papan_cache.ambil_fragmen(kunci, lambda: _render_papan(ruangan, topo, limit, peran))
+
+    return render(request, "produksi_monitoring/monitoring_ruangan.html", {
+        "ruangan": ruangan,
+        "tahap": topo.tahap(ruangan.id),
+        "papan_html": mark_safe(html.replace(papan_cache.CSRF_PLACEHOLDER, get_token(request))),
+    })
 
-        # jika sumbernya Filling → buat shadow di Labelling
-        if "fill" in (p.ruangan.nama or "").lower():
-            try:
-                ensure_labelling_shadow_from(p)
-            except Exception:
-                pass
+
+def _render_papan(ruangan, topo, limit, peran):
+    """Render fragmen tabel papan ruangan (dipanggil hanya saat cache miss)."""
+    tahap = topo.tahap(ruangan.id)
 
     # Dataset utama per ruangan
     proses_produksi = ProsesProduksi.objects.filter(ruangan=ruangan)
-    menunggu    = proses_produksi.filter(status="Menunggu").order_by('waktu_mulai_produksi')
-    diproses    = proses_produksi.filter(status="Sedang Diproses").order_by('waktu_mulai_produksi')
-    siap_pindah = proses_produksi.filter(status="Siap Dipindahkan").order_by('-waktu_selesai')
-
-    # Masih disiapkan seperti kode kamu (walau belum dipakai di template)
-    tujuh_hari_lalu = now() - timedelta(days=7)
-    batch_pernah_di_ruangan = ProsesProduksi.objects.filter(
-        nomor_batch__in=proses_produksi.values_list('nomor_batch', flat=True),
-        waktu_selesai__gte=tujuh_hari_lalu
-    ).values_list('nomor_batch', flat=True).distinct()
-
-    # Ambil & terapkan limit
-    limit = request.GET.get('limit', '10')
+    # produk & operator ditampilkan per baris → join sekaligus (hindari N+1)
+    tampil      = proses_produksi.select_related('nama', 'operator')
+    menunggu    = tampil.filter(status="Menunggu").order_by('waktu_mulai_produksi')
+    diproses    = tampil.filter(status="Sedang Diproses").order_by('waktu_mulai_produksi')
+    siap_pindah = tampil.filter(status="Siap Dipindahkan").order_by('-waktu_selesai')
+
     def apply_limit(qs):
         if limit == 'semua':
             return qs
@@ -106,15 +173,19 @@ def monitoring_produksi_per_ruangan(request, ruangan_slug):
         "proses_diproses": diproses,
         "proses_siap_pindah": siap_pindah,
         "limit": limit,
-        "is_operator": is_operator,
+        "is_operator": peran == "operator",
+        "peran": peran,
+        "csrf_token": papan_cache.CSRF_PLACEHOLDER,
+        "tahap": tahap,
+        "butuh_hasil_akhir": topo.butuh_hasil_akhir(ruangan.id),
     }
 
     # Cabang khusus Labelling
-    if "labelling" in (ruangan.nama or "").lower():
+    if tahap == TAHAP_LABELLING:
         riwayat_labelling = apply_limit(
             ProsesProduksi.objects.filter(
                 ruangan=ruangan, status="Selesai Produksi"
-            ).order_by('-waktu_selesai')
+            ).select_related('nama', 'operator').order_by('-waktu_selesai')
         )
 
         # hitung akurasi tampilan
@@ -143,7 +214,7 @@ def monitoring_produksi_per_ruangan(request, ruangan_slug):
         # Ruangan lain → pakai RiwayatProduksi
         riwayat_queryset = apply_limit(
             RiwayatProduksi.objects.filter(ruangan=ruangan)
-                                   .select_related('ruangan')
+                                   .select_related('ruangan', 'nama_produk', 'operator')
                                    .order_by('-waktu_selesai')
         )
 
@@ -153,66 +224,72 @@ def monitoring_produksi_per_ruangan(request, ruangan_slug):
             "operator_list": Operator.objects.none(),  # tidak dipakai di non-labelling
         })
 
-    return render(request, "produksi_monitoring/monitoring_ruangan.html", context)
+    return render_to_string("produksi_monitoring/_papan_ruangan.html", context)
         
 # ✅ OPERATOR MENANDAI SELESAI
 @login_required
+@retry_terkunci()
 def operator_tandai_selesai(request, produksi_id):
     """Operator menandai proses telah selesai dan menunggu verifikasi admin"""
-    produksi = get_object_or_404(ProsesProduksi, id=produksi_id)
+    with transaksi_tulis():
+        produksi = get_object_or_404(ProsesProduksi.objects.select_for_update(), id=produksi_id)
+        boleh = produksi.status == "Sedang Diproses"
+        if boleh:
+            produksi.status = "Menunggu Verifikasi Admin"
+            produksi.waktu_selesai = now()
+            produksi.save()
 
-    if produksi.status != "Sedang Diproses":
+    if boleh:
+        messages.success(request, f"Batch {produksi.nomor_batch} telah ditandai selesai dan menunggu verifikasi admin.")
+    else:
         messages.error(request, "Hanya proses dengan status 'Sedang Diproses' yang bisa ditandai selesai.")
-        return HttpResponseRedirect(request.META.get("HTTP_REFERER", "/"))
-
-    produksi.status = "Menunggu Verifikasi Admin"
-    produksi.waktu_selesai = now()
-    produksi.save()
-
-    messages.success(request, f"Batch {produksi.nomor_batch} telah ditandai selesai dan menunggu verifikasi admin.")
     return HttpResponseRedirect(request.META.get("HTTP_REFERER", "/"))
 
 @login_required
 @require_POST
+@retry_terkunci()
 def tandai_sedang_diproses(request, produksi_id):
     """
     Menandai proses jadi 'Sedang Diproses'.
     Jika sumbernya Filling, pastikan nomor batch muncul juga di Ruang Labelling (status 'Menunggu').
     """
-    with transaction.atomic():
+    with transaksi_tulis():
         # Lock row untuk hindari double-click / race
         produksi = get_object_or_404(
             ProsesProduksi.objects.select_for_update(),
             id=produksi_id
         )
 
-        if produksi.status != "Menunggu":
-            messages.error(request, "Batch ini tidak bisa ditandai sedang diproses.")
-            return redirect(reverse("monitoring_per_ruangan", args=[slugify(produksi.ruangan.nama)]))
-
-        # Update status & waktu mulai (jaga kalau sudah ada nilainya)
-        produksi.status = "Sedang Diproses"
-        if not produksi.waktu_mulai_produksi:
-            produksi.waktu_mulai_produksi = now()
+        boleh = produksi.status == "Menunggu"
+        if boleh:
+            # Update status & waktu mulai (jaga kalau sudah ada nilainya)
+            produksi.status = "Sedang Diproses"
+            if not produksi.waktu_mulai_produksi:
+                produksi.waktu_mulai_produksi = now()
 
-        # Amanin jika model punya field progress
-        if hasattr(produksi, "progress") and (produksi.progress is None or produksi.progress < 0):
-            produksi.progress = 0
+            # Amanin jika model punya field progress
+            if hasattr(produksi, "progress") and (produksi.progress is None or produksi.progress < 0):
+                produksi.progress = 0
 
-        produksi.save()
+            produksi.save()
 
-        # Jika dari Filling → buat/mastikan “shadow” di Labelling (status Menunggu)
-        try:
-            ensure_labelling_shadow_from(produksi)
-        except Exception:
-            # jangan ganggu alur utama kalau gagal bikin shadow
-            pass
+            # Jika dari Filling → buat/mastikan “shadow” di Labelling (status Menunggu)
+            try:
+                ensure_labelling_shadow_from(produksi)
+            except Exception:
+                # jangan ganggu alur utama kalau gagal bikin shadow
+                pass
 
-    messages.success(request, f"Batch {produksi.nomor_batch} sekarang sedang diproses.")
-    return redirect(reverse("monitoring_per_ruangan", args=[slugify(produksi.ruangan.nama)]))
+    # pesan setelah transaksi (lihat _kirim_pesan)
+    if boleh:
+        messages.success(request, f"Batch {produksi.nomor_batch} sekarang sedang diproses.")
+    else:
+        messages.error(request, "Batch ini tidak bisa ditandai sedang diproses.")
+    return _redirect_ruangan(produksi.ruangan_id)
 
 
 @login_required
+@retry_terkunci()
 def pindahkan_batch_ke_ruangan_form(request, nomor_batch):
     """Menampilkan halaman pindah batch dengan form pemilihan ruangan dan operator"""
     print(f"✅ DEBUG: Mencari produksi dengan Nomor Batch={nomor_batch}")
@@ -220,23 +297,26 @@ def pindahkan_batch_ke_ruangan_form(request, nomor_batch):
     produksi = get_object_or_404(ProsesProduksi, nomor_batch=nomor_batch)
     if produksi.hasil_akhir == "Reject":
         messages.error(request, "Batch ini telah ditandai 'Reject' dan tidak bisa dipindahkan ke ruangan lain.")
-        return redirect(reverse("monitoring_per_ruangan", args=[slugify(produksi.ruangan.nama)]))
+        return _redirect_ruangan(produksi.ruangan_id)
 
     
+    topo = topologi(produksi.ruangan_id)
+    info_ruangan = topo.ruangan(produksi.ruangan_id)
+
     # ✅ Cek apakah batch berasal dari Labelling
-    if produksi.ruangan.nama.lower() == "labelling":
+    if info_ruangan.tahap == TAHAP_LABELLING:
         messages.error(request, "Batch dari ruang Labelling tidak bisa dipindahkan ke ruangan sebelumnya.")
-        return redirect(reverse("monitoring_per_ruangan", args=[slugify(produksi.ruangan.nama)]))
+        return _redirect_ruangan(produksi.ruangan_id)
 
     # Validasi pemindahan berdasarkan jenis ruangan
-    if "proses" in produksi.ruangan.nama.lower():
+    if topo.butuh_hasil_akhir(produksi.ruangan_id):
         if produksi.hasil_akhir != "Release":
             messages.error(request, "Batch di ruang Proses hanya bisa dipindahkan jika hasil akhir adalah 'Release'.")
-            return redirect(reverse("monitoring_per_ruangan", args=[slugify(produksi.ruangan.nama)]))
+            return _redirect_ruangan(produksi.ruangan_id)
     else:
-        if produksi.status not in ["Selesai Produksi", f"Selesai Diproses di {produksi.ruangan.nama}"]:
+        if produksi.status not in ["Selesai Produksi", f"Selesai Diproses di {info_ruangan.nama}"]:
             messages.error(request, "Batch hanya bisa dipindahkan setelah selesai diproses.")
-            return redirect(reverse("monitoring_per_ruangan", args=[slugify(produksi.ruangan.nama)]))
+            return _redirect_ruangan(produksi.ruangan_id)
 
 
 
@@ -253,20 +333,22 @@ def pindahkan_batch_ke_ruangan_form(request, nomor_batch):
 
         print(f"✅ DEBUG: Memindahkan batch {produksi.nomor_batch} ke {ruangan_tujuan.nama} dengan operator {operator_tujuan.nama}")
 
-        # ✅ Update produksi
-        produksi.ruangan = ruangan_tujuan
-        produksi.operator = operator_tujuan
-        produksi.status = "Menunggu"
-        produksi.waktu_mulai_produksi = None
-        produksi.save()
+        # ✅ Update produksi (baca ulang di dalam transaksi tulis)
+        with transaksi_tulis():
+            produksi = ProsesProduksi.objects.select_for_update().get(id=produksi.id)
+            produksi.ruangan = ruangan_tujuan
+            produksi.operator = operator_tujuan
+            produksi.status = "Menunggu"
+            produksi.waktu_mulai_produksi = None
+            produksi.save()
 
         messages.success(request, f"Batch {produksi.nomor_batch} berhasil dipindahkan ke {ruangan_tujuan.nama}.")
-        return redirect("monitoring_per_ruangan", ruangan_nama=slugify(ruangan_tujuan.nama))
+        return _redirect_ruangan(ruangan_tujuan.id)
 
     
     return render(request, "produksi_monitoring/pindahkan_batch.html", {
         "produksi": produksi,
-        "ruangan_list": Ruangan.objects.exclude(id=produksi.ruangan.id),
+        "ruangan_list": Ruangan.objects.exclude(id=produksi.ruangan_id),
         "operator_list": Operator.objects.filter(
             Q(kategori__iexact='Labelling') | Q(kategori__icontains='label')
         ).order_by("nama"),
@@ -296,185 +378,184 @@ def pilih_ruangan_proses(request):
         ruangan_tujuan = get_object_or_404(Ruangan, id=ruangan_id)
         operator_tujuan = get_object_or_404(Operator, id=operator_id)
 
-        for produksi in batch_list:
-            produksi.ruangan = ruangan_tujuan
-            produksi.operator = operator_tujuan
-            produksi.status = "Menunggu"
-            produksi.waktu_mulai_produksi = None
-            produksi.save()
+        hasil = pindahkan_batch(batch_ids, ruangan_tujuan.id, operator_tujuan.id)
+        request.session.pop('batch_to_move', None)
 
-        messages.success(request, f"{len(batch_list)} batch berhasil dipindahkan ke {ruangan_tujuan.nama}.")
+        if hasil.dipindahkan:
+            messages.success(request, f"{len(hasil.dipindahkan)} batch berhasil dipindahkan ke {ruangan_tujuan.nama}.")
+        for nomor_batch, alasan in hasil.ditolak:
+            messages.error(request, f"Batch {nomor_batch} tidak dipindahkan: {alasan}.")
         return redirect("admin:produksi_monitoring_prosesproduksi_changelist")
 
     return render(request, "admin/pilih_ruangan.html", {
         "batch_list": batch_list,
-        "ruangan_list": Ruangan.objects.exclude(nama__icontains="penimbangan"),
+        "ruangan_list": Ruangan.objects.exclude(id__in=topologi().ids(TAHAP_PENIMBANGAN)),
         "operator_list": Operator.objects.filter(
             Q(kategori__iexact='Labelling') | Q(kategori__icontains='label')
         ).order_by("nama"),
     })
 @login_required
+@retry_terkunci()
 def update_progress(request, produksi_id):
     produksi = get_object_or_404(ProsesProduksi, id=produksi_id)
 
     if request.method == "POST":
-        nama_ruangan = produksi.ruangan.nama.lower()
-
-        # 💡 Ruang Labelling → input jumlah kemasan manual
-        if "jumlah_kemasan" in request.POST:
-            jumlah = int(request.POST.get("jumlah_kemasan", 0))
-            satuan = request.POST.get("satuan_kemasan", "")
-            if jumlah < 1:
-                messages.error(request, "Jumlah kemasan harus lebih dari 0.")
-                return redirect(reverse("monitoring_per_ruangan", args=[slugify(produksi.ruangan.nama)]))
-
-            produksi.jumlah_kemasan = (produksi.jumlah_kemasan or 0) + jumlah
-            produksi.satuan_kemasan = satuan
-            produksi.save()
-            messages.success(request, "Jumlah kemasan berhasil disimpan.")
-            return redirect(reverse("monitoring_per_ruangan", args=[slugify(produksi.ruangan.nama)]))
+        with transaksi_tulis():
+            # Baca ulang di dalam transaksi tulis: progress += … tidak boleh hilang
+            # saat dua terminal mengirim bersamaan
+            produksi = ProsesProduksi.objects.select_for_update().get(id=produksi.id)
+            pesan = _terapkan_update_progress(request, produksi)
+
+        _kirim_pesan(request, pesan)
+        return _redirect_ruangan(produksi.ruangan_id)
+
+
+def _terapkan_update_progress(request, produksi):
+    """Isi transaksi update_progress; return pesan [(level, teks)] untuk _kirim_pesan."""
+    topo = topologi(produksi.ruangan_id)
+    info_ruangan = topo.ruangan(produksi.ruangan_id)
+
+    # 💡 Ruang Labelling → input jumlah kemasan manual
+    if "jumlah_kemasan" in request.POST:
+        jumlah = int(request.POST.get("jumlah_kemasan", 0))
+        satuan = request.POST.get("satuan_kemasan", "")
+        if jumlah < 1:
+            return [(messages.ERROR, "Jumlah kemasan harus lebih dari 0.")]
+
+        produksi.jumlah_kemasan = (produksi.jumlah_kemasan or 0) + jumlah
+        produksi.satuan_kemasan = satuan
+        produksi.save()
+        return [(messages.SUCCESS, "Jumlah kemasan berhasil disimpan.")]
 
-        # 💡 Ruang lain → input jumlah_terproses
-        jumlah_terproses = int(request.POST.get("jumlah_terproses", 0))
+    # 💡 Ruang lain → input jumlah_terproses
+    pesan = []
+    jumlah_terproses = int(request.POST.get("jumlah_terproses", 0))
 
-        if jumlah_terproses > 0:
-            if produksi.progress + jumlah_terproses > produksi.jumlah:
-                sisa = produksi.jumlah - produksi.progress
-                messages.error(request, f"Jumlah terproses ({jumlah_terproses}) melebihi sisa target produksi ({sisa}).")
-                return redirect(reverse("monitoring_per_ruangan", args=[slugify(produksi.ruangan.nama)]))
+    if jumlah_terproses > 0:
+        if produksi.progress + jumlah_terproses > produksi.jumlah:
+            sisa = produksi.jumlah - produksi.progress
+            return [(messages.ERROR, f"Jumlah terproses ({jumlah_terproses}) melebihi sisa target produksi ({sisa}).")]
 
-            produksi.progress += jumlah_terproses
-            produksi.waktu_mulai_produksi = produksi.waktu_mulai_produksi or now()
-            try:
-                if "filling" in nama_ruangan:
-                    ensure_labelling_shadow_from(produksi)
-            except Exception:
-                pass
-        # ✅ Cek jika progress sudah selesai → otomatis update
-        if produksi.progress >= produksi.jumlah:
-            produksi.progress = produksi.jumlah  # pastikan pas
-            produksi.waktu_mulai_produksi = produksi.waktu_mulai_produksi or now()
-
-            if "proses" in nama_ruangan:
-                messages.info(request, "Produksi sudah mencapai jumlah maksimal. Silakan pilih hasil akhir (Release / Reject).")
-            elif "filling" in nama_ruangan or "penimbangan" in nama_ruangan:
-                produksi.status = f"Selesai Diproses di {produksi.ruangan.nama}"
-                produksi.waktu_selesai = now()
+        produksi.progress += jumlah_terproses
+        produksi.waktu_mulai_produksi = produksi.waktu_mulai_produksi or now()
+        try:
+            if info_ruangan.tahap == TAHAP_FILLING:
+                ensure_labelling_shadow_from(produksi)
+        except Exception:
+            pass
+    # ✅ Cek jika progress sudah selesai → otomatis update
+    if produksi.progress >= produksi.jumlah:
+        produksi.progress = produksi.jumlah  # pastikan pas
+        produksi.waktu_mulai_produksi = produksi.waktu_mulai_produksi or now()
+
+        if topo.butuh_hasil_akhir(produksi.ruangan_id):
+            pesan.append((messages.INFO, "Produksi sudah mencapai jumlah maksimal. Silakan pilih hasil akhir (Release / Reject)."))
+        elif info_ruangan.tahap in (TAHAP_FILLING, TAHAP_PENIMBANGAN):
+            produksi.status = f"Selesai Diproses di {info_ruangan.nama}"
+            produksi.waktu_selesai = now()
 
-                # ⏺️ Tambahkan ke riwayat jika belum ada
-                RiwayatProduksi.objects.get_or_create(
-                    nomor_batch=produksi.nomor_batch,
-                    nama_produk=produksi.nama,
-                    jumlah=produksi.jumlah,
-                    satuan=produksi.satuan,
-                    ruangan=produksi.ruangan,
-                    operator=produksi.operator,
-                    waktu_mulai_produksi=produksi.waktu_mulai_produksi,
-                    waktu_selesai=produksi.waktu_selesai,
-                    hasil_akhir="Release"
-                )
-                messages.success(request, f"Produksi di {produksi.ruangan.nama} telah selesai.")
-            else:
-                messages.warning(request, "Nama ruangan tidak dikenali. Status tidak diperbarui otomatis.")
+            # ⏺️ Catat ke riwayat (upsert per batch + ruangan)
+            catat_riwayat(produksi, "Release")
+            pesan.append((messages.SUCCESS, f"Produksi di {info_ruangan.nama} telah selesai."))
+        else:
+            pesan.append((messages.WARNING, "Nama ruangan tidak dikenali. Status tidak diperbarui otomatis."))
 
-        produksi.save()
-        messages.success(request, f"Batch {produksi.nomor_batch} berhasil diupdate.")
-        return redirect(reverse("monitoring_per_ruangan", args=[slugify(produksi.ruangan.nama)]))
+    produksi.save()
+    pesan.append((messages.SUCCESS, f"Batch {produksi.nomor_batch} berhasil diupdate."))
+    return pesan
 
 
 @login_required
+@retry_terkunci()
 def operator_tentukan_hasil_akhir(request, produksi_id):
     produksi = get_object_or_404(ProsesProduksi, id=produksi_id)
 
     if request.method == "POST":
         hasil = request.POST.get("hasil_akhir")
         if hasil in ["Release", "Reject"]:
-            produksi.hasil_akhir = hasil
-            produksi.status = f"Selesai Diproses di {produksi.ruangan.nama}"
-            produksi.waktu_selesai = now()
-            produksi.save()
-
-            # ⬇️ Catat ke riwayat
-            RiwayatProduksi.objects.get_or_create(
-                nomor_batch=produksi.nomor_batch,
-                nama_produk=produksi.nama,
-                jumlah=produksi.jumlah,
-                satuan=produksi.satuan,
-                ruangan=produksi.ruangan,
-                operator=produksi.operator,
-                waktu_mulai_produksi=produksi.waktu_mulai_produksi,
-                waktu_selesai=produksi.waktu_selesai,
-                hasil_akhir=produksi.hasil_akhir,
-            )
-
-            # ➕ Jika Release dan ada tahap selanjutnya, buat batch baru otomatis
-            if hasil == "Release" and produksi.ruangan.tahap_berikutnya:
-                ProsesProduksi.objects.create(
-                    nomor_batch=produksi.nomor_batch,
-                    nama=produksi.nama,
-                    jumlah=produksi.jumlah,
-                    satuan=produksi.satuan,
-                    ruangan=produksi.ruangan.tahap_berikutnya,
-                    status="Menunggu",
-                )
+            # status, riwayat & batch tahap berikutnya: satu transaksi tulis
+            with transaksi_tulis():
+                produksi = ProsesProduksi.objects.select_for_update().get(id=produksi.id)
+                info_ruangan = topologi(produksi.ruangan_id).ruangan(produksi.ruangan_id)
+                produksi.hasil_akhir = hasil
+                produksi.status = f"Selesai Diproses di {info_ruangan.nama}"
+                produksi.waktu_selesai = now()
+                produksi.save()
+
+                # ⬇️ Catat ke riwayat (upsert per batch + ruangan + stint)
+                catat_riwayat(produksi, produksi.hasil_akhir)
+
+                # ➕ Jika Release dan ada tahap selanjutnya, buat batch baru otomatis
+                tahap_berikutnya = topologi(produksi.ruangan_id).berikutnya(produksi.ruangan_id)
+                if hasil == "Release" and tahap_berikutnya:
+                    ProsesProduksi.objects.create(
+                        nomor_batch=produksi.nomor_batch,
+                        nama=produksi.nama,
+                        jumlah=produksi.jumlah,
+                        satuan=produksi.satuan,
+                        ruangan_id=tahap_berikutnya.id,
+                        status="Menunggu",
+                    )
 
             messages.success(request, f"Hasil akhir batch {produksi.nomor_batch} ditandai sebagai '{hasil}'.")
         else:
             messages.error(request, "Pilihan hasil akhir tidak valid.")
         
-        return redirect(reverse("monitoring_per_ruangan", args=[slugify(produksi.ruangan.nama)]))
+        return _redirect_ruangan(produksi.ruangan_id)
 
 
 @login_required
+@retry_terkunci()
 def tandai_siap_dipindahkan(request, produksi_id):
     """Menandai batch sedang diproses menjadi siap dipindahkan (tidak digunakan jika pakai Release)."""
-    produksi = get_object_or_404(ProsesProduksi, id=produksi_id)
+    with transaksi_tulis():
+        produksi = get_object_or_404(ProsesProduksi.objects.select_for_update(), id=produksi_id)
 
-    if produksi.status == "Sedang Diproses":
-        produksi.status = "Siap Dipindahkan"
-        produksi.waktu_selesai = now()
-        produksi.save()
-        print(f"DEBUG: {produksi.nomor_batch} sekarang 'Siap Dipindahkan'.")
-    else:
-        print(f"DEBUG: {produksi.nomor_batch} tidak bisa ditandai siap dipindahkan.")
+        if produksi.status == "Sedang Diproses":
+            produksi.status = "Siap Dipindahkan"
+            produksi.waktu_selesai = now()
+            produksi.save()
+            print(f"DEBUG: {produksi.nomor_batch} sekarang 'Siap Dipindahkan'.")
+        else:
+            print(f"DEBUG: {produksi.nomor_batch} tidak bisa ditandai siap dipindahkan.")
 
-    return redirect(reverse("monitoring_per_ruangan", args=[slugify(produksi.ruangan.nama)]))
+    return _redirect_ruangan(produksi.ruangan_id)
 
 
 @login_required
+@retry_terkunci()
 def tandai_selesai_labelling(request, nomor_batch):
     """Operator ruang labelling menandai batch selesai produksi."""
-    produksi = get_object_or_404(ProsesProduksi, nomor_batch=nomor_batch, ruangan__nama__icontains='labell',)
-
-    if produksi.jumlah_kemasan is None or produksi.jumlah_kemasan <= 0:
-        messages.error(request, "Silakan input jumlah kemasan sebelum menandai selesai!")
-        return redirect(reverse("monitoring_per_ruangan", args=[slugify(produksi.ruangan.nama)]))
+    with transaksi_tulis():
+        produksi = get_object_or_404(
+            ProsesProduksi.objects.select_for_update(),
+            nomor_batch=nomor_batch,
+            ruangan_id__in=topologi().ids(TAHAP_LABELLING),
+        )
 
-    produksi.status = "Selesai Produksi"
-    produksi.waktu_selesai = now()
-    produksi.save()
+        boleh = bool(produksi.jumlah_kemasan and produksi.jumlah_kemasan > 0)
+        if boleh:
+            produksi.status = "Selesai Produksi"
+            produksi.waktu_selesai = now()
+            produksi.save()
 
-    # Tambah ke RiwayatProduksi jika belum ada
-    RiwayatProduksi.objects.get_or_create(
-        nomor_batch=produksi.nomor_batch,
-        nama_produk=produksi.nama,
-        jumlah=produksi.jumlah,
-        satuan=produksi.satuan,
-        ruangan=produksi.ruangan,
-        operator=produksi.operator,
-        waktu_mulai_produksi=produksi.waktu_mulai_produksi,
-        waktu_selesai=produksi.waktu_selesai,
-        hasil_akhir="Release"  # Default untuk labelling dianggap berhasil
-    )
+            # Catat ke riwayat (upsert per batch + ruangan + stint)
+            catat_riwayat(produksi, "Release")  # Default untuk labelling dianggap berhasil
 
-    messages.success(request, f"Batch {produksi.nomor_batch} telah ditandai selesai produksi.")
-    return redirect(reverse("monitoring_per_ruangan", args=[slugify(produksi.ruangan.nama)]))
+    # pesan setelah transaksi (lihat _kirim_pesan)
+    if boleh:
+        messages.success(request, f"Batch {produksi.nomor_batch} telah ditandai selesai produksi.")
+    else:
+        messages.error(request, "Silakan input jumlah kemasan sebelum menandai selesai!")
+    return _redirect_ruangan(produksi.ruangan_id)
 
 def monitoring_index(request):
-    ruangan_penimbangan = Ruangan.objects.filter(nama__icontains='Penimbangan').first()
-    ruang_proses = Ruangan.objects.filter(nama__icontains='Proses')
-    ruang_filling = Ruangan.objects.filter(nama__icontains='Filling')
-    ruang_labelling = Ruangan.objects.filter(nama__icontains='Labelling')
+    # Dikelompokkan per tahap dari registry topologi (tanpa query LIKE)
+    topo = topologi()
+    ruangan_penimbangan = topo.pertama(TAHAP_PENIMBANGAN)
+    ruang_proses = topo.ruangan_tahap(TAHAP_PROSES, TAHAP_MIXING)
+    ruang_filling = topo.ruangan_tahap(TAHAP_FILLING)
+    ruang_labelling = topo.ruangan_tahap(TAHAP_LABELLING)
 
     context = {
         'ruangan_penimbangan': ruangan_penimbangan,
@@ -482,10 +563,264 @@ def monitoring_index(request):
         'ruang_filling': ruang_filling,
         'ruang_labelling': ruang_labelling,
     }
-    return render(request, 'monitoring/index.html', context)
+    return render(request, 'produksi_monitoring/index.html', context)
+
+@login_required
+def api_ringkasan_pabrik(request):
+    """WIP per ruangan/status + beban operator (1 query agregat, cache TTL pendek)."""
+    return JsonResponse(umur_menunggu(ringkasan_pabrik()))
+
+
+@login_required
+def ringkasan_pabrik_view(request):
+    data = ringkasan_pabrik()
+    ruangan = []
+    for r in data["ruangan"]:
+        menunggu = r["status"].get(STATUS_MENUNGGU, 0)
+        diproses = r["status"].get(STATUS_AKTIF, 0)
+        ruangan.append({
+            **r,
+            "menunggu": menunggu,
+            "diproses": diproses,
+            "lainnya": r["total"] - menunggu - diproses,
+        })
+    return render(request, "produksi_monitoring/ringkasan_pabrik.html", {
+        "ringkasan": {**data, "ruangan": ruangan},
+    })
+
+@login_required
+def api_grafik_produksi(request):
+    """
+    Data grafik throughput dari RollupProduksi (bukan scan riwayat mentah).
+
+    Query: periode=jam|hari dari/sampai=<tanggal|ISO> ruangan=<slug,..>
+           produk=<id,..> kelompok=ruangan|produk
+    """
+    periode = request.GET.get("periode", RollupProduksi.PERIODE_HARI)
+    if periode not in (RollupProduksi.PERIODE_JAM, RollupProduksi.PERIODE_HARI):
+        return JsonResponse({"ok": False, "message": "periode harus 'jam' atau 'hari'"}, status=400)
+    kelompok = request.GET.get("kelompok") or None
+    if kelompok not in (None, "ruangan", "produk"):
+        return JsonResponse({"ok": False, "message": "kelompok harus 'ruangan' atau 'produk'"}, status=400)
+
+    try:
+        sampai = parse_waktu(request.GET.get("sampai"), now())
+        dari = parse_waktu(request.GET.get("dari"), sampai - timedelta(days=30))
+    except ValueError as e:
+        return JsonResponse({"ok": False, "message": f"waktu tidak valid: {e}"}, status=400)
+
+    topo = topologi()
+    ruangan_ids = []
+    for slug in filter(None, request.GET.get("ruangan", "").split(",")):
+        info = topo.dari_slug(slug.strip())
+        if not info:
+            return JsonResponse({"ok": False, "message": f"ruangan tidak dikenal: {slug}"}, status=400)
+        ruangan_ids.append(info.id)
+    try:
+        produk_ids = [int(p) for p in request.GET.get("produk", "").split(",") if p.strip()]
+    except ValueError:
+        return JsonResponse({"ok": False, "message": "produk harus id angka"}, status=400)
+
+    seri = seri_grafik(periode, dari, sampai, ruangan_ids, produk_ids, kelompok)
+
+    # Label kelompok: ruangan dari topologi, produk satu query
+    if kelompok == "ruangan":
+        nama = {i: info.nama for i, info in topo.per_id.items()}
+    elif kelompok == "produk":
+        nama = dict(ItemDescription.objects.filter(
+            id__in={s["kelompok"] for s in seri}
+        ).values_list("id", "description"))
+    else:
+        nama = {}
+    for s in seri:
+        s["nama"] = nama.get(s["kelompok"], "Total")
+
+    return JsonResponse({"periode": periode, "dari": dari, "sampai": sampai, "seri": seri})
+
 
 @login_required
 @require_POST
+@retry_terkunci()
+def api_progress_scanner(request):
+    """
+    Progress massal dari scanner (non-Labelling).
+    Body JSON: {"entri": [{"produksi_id", "jumlah_terproses", "rid"}, ...]} atau array langsung.
+    """
+    try:
+        body = json.loads(request.body or b"null")
+    except ValueError:
+        return JsonResponse({"ok": False, "message": "Body harus JSON"}, status=400)
+    entri = body.get("entri") if isinstance(body, dict) else body
+    try:
+        hasil = terapkan_progress_bulk(entri)
+    except EntriTidakValid as e:
+        return JsonResponse({"ok": False, "message": str(e)}, status=400)
+    return JsonResponse({"ok": True, "ringkasan": hasil.ringkasan, "hasil": hasil.hasil})
+
+
+@login_required
+def api_cari_produk(request):
+    """
+    Lookup master item dari index in-memory (katalog.py).
+    ?barcode=<kode> → satu item persis; ?q=<teks>&limit=<n> → top-N autocomplete.
+    """
+    mulai = time.perf_counter()
+    kode = request.GET.get("barcode")
+    if kode is not None:
+        produk = katalog.dari_barcode(kode)
+        hasil = [produk.as_dict()] if produk else []
+    else:
+        try:
+            limit = max(1, min(int(request.GET.get("limit", katalog.LIMIT_DEFAULT)), 100))
+        except ValueError:
+            limit = katalog.LIMIT_DEFAULT
+        hasil = [p.as_dict() for p in katalog.cari(request.GET.get("q", ""), limit)]
+    return JsonResponse({
+        "hasil": hasil,
+        "durasi_ms": round((time.perf_counter() - mulai) * 1000, 3),
+    })
+
+
+@login_required
+def api_cari_batch(request):
+    """
+    Cari batch aktif & riwayat, termasuk arsip (nomor batch, produk, barcode,
+    ruangan, operator) lewat index FTS5, urut relevansi.
+    Query: q=<teks> jenis=proses|riwayat arsip=0|1 halaman=<n> per_halaman=<n, maks 100>
+    """
+    if not pencarian.tersedia():
+        return JsonResponse({"ok": False, "message": "Index pencarian belum dibangun"}, status=503)
+    jenis = request.GET.get("jenis") or None
+    if jenis not in (None, pencarian.JENIS_PROSES, pencarian.JENIS_RIWAYAT):
+        return JsonResponse({"ok": False, "message": "jenis harus 'proses' atau 'riwayat'"}, status=400)
+    pilih_arsip = {"0": False, "1": True}.get(request.GET.get("arsip"))
+    try:
+        halaman = max(1, int(request.GET.get("halaman", 1)))
+        per_halaman = max(1, min(int(request.GET.get("per_halaman", pencarian.PER_HALAMAN)), pencarian.MAKS_PER_HALAMAN))
+    except ValueError:
+        return JsonResponse({"ok": False, "message": "halaman/per_halaman harus angka"}, status=400)
+
+    mulai = time.perf_counter()
+    hits, total = pencarian.cari(
+        request.GET.get("q", ""), jenis=jenis, offset=(halaman - 1) * per_halaman, limit=per_halaman, arsip=pilih_arsip,
+    )
+
+    # lengkapi status / waktu dari tabel sumber (satu query per jenis, hot / arsip)
+    detail = {}
+    for jenis_hit, model in ((pencarian.JENIS_PROSES, ProsesProduksi), (pencarian.JENIS_RIWAYAT, RiwayatProduksi)):
+        for di_arsip, sumber in ((False, model), (True, arsip.PASANGAN[model])):
+            ids = [h.id for h in hits if h.jenis == jenis_hit and h.arsip == di_arsip]
+            detail[jenis_hit, di_arsip] = sumber.objects.in_bulk(ids) if ids else {}
+    hasil = []
+    for h in hits:
+        obj = detail[h.jenis, h.arsip].get(h.id)
+        baris = h.as_dict()
+        if h.jenis == pencarian.JENIS_PROSES and obj:
+            baris.update(status=obj.status, waktu=obj.waktu_dibuat)
+        elif obj:
+            baris.update(status=obj.hasil_akhir or "Selesai", waktu=obj.waktu_selesai)
+        hasil.append(baris)
+
+    return JsonResponse({
+        "q": request.GET.get("q", ""),
+        "total": total,
+        "halaman": halaman,
+        "per_halaman": per_halaman,
+        "jumlah_halaman": (total + per_halaman - 1) // per_halaman,
+        "hasil": hasil,
+        "durasi_ms": round((time.perf_counter() - mulai) * 1000, 3),
+    })
+
+
+@login_required
+def ekspor_produksi(request):
+    """
+    Unduh riwayat produksi / batch selesai (ekspor.py).
+
+    Query: sumber=riwayat|proses format=csv|xlsx bulan=YYYY-MM | dari/sampai=<tanggal|ISO>
+           ruangan=<slug,..> produk=<id,..> hasil=Release,Reject arsip=0 (tanpa arsip)
+    CSV di-stream langsung dari query; XLSX ditulis ke file sementara lalu dikirim.
+    """
+    try:
+        ekspor = EksporProduksi(request.GET)
+    except FilterEksporError as e:
+        return JsonResponse({"ok": False, "message": str(e)}, status=400)
+
+    if ekspor.format == FORMAT_XLSX:
+        berkas = tempfile.TemporaryFile()
+        ekspor.tulis_xlsx(berkas)
+        berkas.seek(0)
+        return FileResponse(berkas, as_attachment=True, filename=ekspor.nama_file)
+
+    response = StreamingHttpResponse(ekspor.stream_csv(), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{ekspor.nama_file}"'
+    return response
+
+
+@login_required
+def api_event_batch(request, nomor_batch):
+    """Jurnal siklus hidup satu batch (EventBatch), urut kejadian."""
+    events = jurnal.riwayat_batch(nomor_batch).values(
+        "id", "jenis", "proses_id", "ruangan_id", "data", "waktu",
+    )
+    nama_ruangan = {i: info.nama for i, info in topologi().per_id.items()}
+    return JsonResponse({
+        "nomor_batch": nomor_batch,
+        "event": [{**e, "ruangan": nama_ruangan.get(e["ruangan_id"])} for e in events],
+    })
+
+
+@login_required
+def api_analitik_siklus(request):
+    """
+    Persentil & histogram waktu antrian / proses per ruangan/produk + lead time.
+
+    Query: dari/sampai=<tanggal|ISO> (default 90 hari terakhir, dibulatkan ke hari)
+           ruangan=<slug,..> kelompok=ruangan|produk|ruangan_produk
+    """
+    hari_ini = make_aware(datetime.combine(now().date(), datetime.min.time()))
+    try:
+        dari = parse_waktu(request.GET.get("dari"), hari_ini - timedelta(days=90))
+        sampai = parse_waktu(request.GET.get("sampai"), None)
+    except ValueError as e:
+        return JsonResponse({"ok": False, "message": f"waktu tidak valid: {e}"}, status=400)
+
+    topo = topologi()
+    ruangan_ids = []
+    for slug in filter(None, request.GET.get("ruangan", "").split(",")):
+        info = topo.dari_slug(slug.strip())
+        if not info:
+            return JsonResponse({"ok": False, "message": f"ruangan tidak dikenal: {slug}"}, status=400)
+        ruangan_ids.append(info.id)
+
+    try:
+        data = analitik.analitik_siklus(dari, sampai, ruangan_ids, request.GET.get("kelompok", "ruangan"))
+    except ValueError as e:
+        return JsonResponse({"ok": False, "message": str(e)}, status=400)
+    return JsonResponse(data)
+
+
+@login_required
+def api_analitik_harian(request):
+    """
+    Ringkasan analitik satu hari untuk satu ruangan, dijaga konsumen jurnal
+    "analitik" (dihitung saat itu juga bila belum ada di cache).
+
+    Query: ruangan=<slug> tanggal=<YYYY-MM-DD> (default hari ini)
+    """
+    info = topologi().dari_slug(request.GET.get("ruangan", ""))
+    if not info:
+        return JsonResponse({"ok": False, "message": "ruangan tidak dikenal"}, status=400)
+    try:
+        waktu = parse_waktu(request.GET.get("tanggal"), now())
+    except ValueError as e:
+        return JsonResponse({"ok": False, "message": f"waktu tidak valid: {e}"}, status=400)
+    return JsonResponse(analitik.analitik_harian(localtime(waktu).date(), info.id))
+
+
+@login_required
+@require_POST
+@retry_terkunci()
 def update_progress_labelling(request, pk):
     """
     Tambah jumlah_kemasan untuk batch di Ruang Labelling.
@@ -507,20 +842,20 @@ def update_progress_labelling(request, pk):
     estimasi = 0
     tambah = 0
 
-    with transaction.atomic():
-        # --- Idempotensi ---
-        _, created = IdempotencyKey.objects.get_or_create(
-            key=rid, defaults={"action": "labelling_update"}
-        )
-        if not created:
+    # --- Idempotensi: rid yang sudah dikenal (LRU / DB) ditolak tanpa BEGIN IMMEDIATE ---
+    if idempotency.dikenal(rid):
+        return JsonResponse({"ok": True, "duplicate": True, "rid": rid})
+
+    with transaksi_tulis():
+        # klaim di dalam transaksi tetap menangani dua request rid sama yang balapan
+        if not idempotency.klaim(rid, "labelling_update"):
             return JsonResponse({"ok": True, "duplicate": True, "rid": rid})
 
         # --- Lock row & validasi ruangan ---
         proses = get_object_or_404(
             ProsesProduksi.objects.select_for_update(), pk=pk
         )
-        nama_ruang = (proses.ruangan.nama or "").lower()
-        if "labell" not in nama_ruang:
+        if not topologi(proses.ruangan_id).is_labelling(proses.ruangan_id):
             return JsonResponse(
                 {"ok": False, "message": "Hanya untuk Ruang Labelling", "rid": rid},
                 status=400,
@@ -595,3 +930,28 @@ def update_progress_labelling(request, pk):
             "allowed_tambahan": allowed_tambahan,   # sisa ruang sampai 150% SESUDAH update
         }
     )
+
+
+@staff_member_required
+def papan_statistik(request):
+    """Hit/miss cache render papan ruangan (dibagi semua worker)."""
+    return JsonResponse(papan_cache.statistik())
+
+
+@staff_member_required
+def instrumentasi_view(request):
+    """Agregat bergulir per view dari middleware instrumentasi (semua worker)."""
+    data = instrumentasi.ringkasan_view()
+    if request.GET.get("format") == "json":
+        return JsonResponse({"aktif": settings.INSTRUMENTASI_AKTIF, "view": data})
+    return render(request, "produksi_monitoring/instrumentasi.html", {
+        "aktif": settings.INSTRUMENTASI_AKTIF,
+        "ambang_ms": settings.INSTRUMENTASI_AMBANG_MS,
+        "baris": data,
+    })
+
+
+@staff_member_required
+def idempotency_statistik(request):
+    """Counter front cache idempotensi (per proses worker) untuk sizing."""
+    return JsonResponse(idempotency.cache_idempotensi.statistik())
@@ -0,0 +1,84 @@
+# produksi_monitoring/views_async.py
+"""
+Versi async jalur baca (dipakai di bawah ASGI / daphne) untuk polling kiosk.
+
+Isi dan bentuk respons sama dengan view sync di views.py; bedanya query
+dibaca tanpa memblok event loop — feed status batch lewat
+feed._aiter_potongan (sync_to_async atas .iterator() per potongan, bukan
+aiterator()), daftar ruangan lewat `async for` QuerySet — dan topologi
+diambil lewat atopologi(), sehingga request yang menunggu database tidak
+memegang thread worker. Tidak ada tulis di sini — semua tulis tetap lewat view sync dengan
+transaksi_tulis().
+
+Catatan Django 4.2: ORM async masih menjalankan query di thread lewat
+sync_to_async, dan middleware sync-only (InstrumentasiORMMiddleware saat
+aktif) memaksa Django mengadaptasi view async ke sync. Bandingkan dengan
+`python manage.py benchmark_async`.
+"""
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import render
+
+from .feed import FeedStatusBatch, FeedError
+from .models import Ruangan
+from .topology import atopologi, TAHAP_PENIMBANGAN, TAHAP_PROSES, TAHAP_MIXING, TAHAP_FILLING, TAHAP_LABELLING
+
+
+async def _muat_user(request):
+    """
+    request.user lazy (session + auth = query). Template memakai
+    request.user.is_authenticated → dievaluasi dulu di thread sync agar
+    render() tidak menyentuh database dari event loop.
+    """
+    await sync_to_async(lambda: request.user.is_authenticated)()
+
+
+async def get_produksi_data(request):
+    """Sama dengan views.get_produksi_data (array JSON, default Ruang Penimbangan)."""
+    topo = await atopologi()
+    penimbangan = topo.pertama(TAHAP_PENIMBANGAN)
+    try:
+        feed = FeedStatusBatch(
+            request.GET,
+            ruangan_default=[penimbangan.slug] if penimbangan else [],
+            kolom_default=("nomor_batch", "nama_produk", "jumlah", "waktu_selesai", "operator", "hasil_akhir"),
+            tanpa_batas=True,
+            topo=topo,
+        )
+    except FeedError as e:
+        return JsonResponse({"ok": False, "message": str(e)}, status=400)
+    if not feed.ruangan_ids:
+        return JsonResponse([], safe=False)
+    return StreamingHttpResponse(feed.astream_json_list(), content_type="application/json")
+
+
+async def api_status_batch(request):
+    """Sama dengan views.api_status_batch (feed MES per ruangan, keyset cursor)."""
+    try:
+        feed = FeedStatusBatch(request.GET, topo=await atopologi())
+    except FeedError as e:
+        return JsonResponse({"ok": False, "message": str(e)}, status=400)
+
+    if request.GET.get("format") == "ndjson":
+        return StreamingHttpResponse(feed.astream_ndjson(), content_type="application/x-ndjson")
+    return StreamingHttpResponse(feed.astream_json(), content_type="application/json")
+
+
+async def dashboard(request):
+    """Daftar ruangan produksi (views.dashboard)."""
+    ruangan_list = [r async for r in Ruangan.objects.all()]
+    await _muat_user(request)
+    return render(request, 'produksi_monitoring/dashboard.html', {"ruangan_list": ruangan_list})
+
+
+async def monitoring_index(request):
+    """Indeks monitoring per tahap (views.monitoring_index)."""
+    topo = await atopologi()
+    await _muat_user(request)
+    context = {
+        'ruangan_penimbangan': topo.pertama(TAHAP_PENIMBANGAN),
+        'ruang_proses': topo.ruangan_tahap(TAHAP_PROSES, TAHAP_MIXING),
+        'ruang_filling': topo.ruangan_tahap(TAHAP_FILLING),
+        'ruang_labelling': topo.ruangan_tahap(TAHAP_LABELLING),
+    }
+    return render(request, 'produksi_monitoring/index.html', context)